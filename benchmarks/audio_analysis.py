@@ -0,0 +1,112 @@
+"""
+Measures how much faster than real time analyze_audio() runs on a voiceover.
+
+A synthetic speech-like WAV file (noise in bursts, with regular pauses) of
+the given length is written to a temporary directory and analysed through
+the memory-mapped WAV source. The pauses found are checked against the ones
+written, and the peak memory traced during the analysis is reported.
+
+Usage:
+    python benchmarks/audio_analysis.py [--minutes 60] [--channels 2] [--bits 16] [--repeat 3] [--json out.json]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from xml_video_project_lib.analysis import analyze_audio  # noqa: E402
+
+SAMPLERATE = 48000
+PAUSE_EVERY = 9.0   # Seconds from the start of one pause to the next
+PAUSE_LENGTH = 0.8
+
+
+def write_voiceover(path, minutes, channels, bits):
+    """
+    Writes the synthetic voiceover one minute at a time and returns the
+    (start, end) seconds of its pauses.
+    """
+    rng = np.random.default_rng(0)
+    dtype = '<i2' if bits == 16 else '<i4'
+    pauses = []
+    with wave.open(str(path), 'wb') as file:
+        file.setnchannels(channels)
+        file.setsampwidth(bits // 8)
+        file.setframerate(SAMPLERATE)
+        for minute in range(minutes):
+            offset = minute * 60
+            t = np.arange(60 * SAMPLERATE) / SAMPLERATE
+            envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)  # Syllable-rate modulation
+            samples = rng.standard_normal((len(t), channels)) * envelope[:, None] * 0.08
+            start = (-offset) % PAUSE_EVERY
+            while start + PAUSE_LENGTH <= 60:
+                samples[round(start * SAMPLERATE):round((start + PAUSE_LENGTH) * SAMPLERATE)] = 0
+                pauses.append((offset + start, offset + start + PAUSE_LENGTH))
+                start += PAUSE_EVERY
+            file.writeframes((samples * (2 ** (bits - 1) - 1)).astype(dtype).tobytes())
+    return pauses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark voiceover analysis.")
+    parser.add_argument('--minutes', type=int, default=60, help="Length of the voiceover")
+    parser.add_argument('--channels', type=int, default=2, choices=(1, 2))
+    parser.add_argument('--bits', type=int, default=16, choices=(16, 32))
+    parser.add_argument('--repeat', type=int, default=3, help="Runs; the fastest is kept")
+    parser.add_argument('--json', type=str, default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "voiceover.wav"
+        pauses = write_voiceover(path, args.minutes, args.channels, args.bits)
+
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            analysis = analyze_audio(path)
+            seconds = time.perf_counter() - started
+            best = seconds if best is None else min(best, seconds)
+
+        tracemalloc.start()
+        analyze_audio(path)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    found = len(analysis.silences)
+    matched = sum(
+        1 for start, end in pauses
+        if any(abs(start - s) <= analysis.window and abs(end - e) <= analysis.window for s, e in analysis.silences)
+    )
+    duration = analysis.duration
+    print(f"{duration / 60:.0f} min in {best:.2f} s: {duration / best:.0f}x real time, "
+          f"peak traced memory {peak / 2**20:.1f} MiB")
+    print(f"{analysis.loudness:.2f} LUFS, peak {analysis.peak_db:.2f} dBFS, "
+          f"{found} pauses found, {matched} of {len(pauses)} written")
+
+    if args.json:
+        report = {
+            "params": vars(args),
+            "seconds": best,
+            "realtime_factor": duration / best,
+            "peak_traced_bytes": peak,
+            "loudness": analysis.loudness,
+            "pauses_written": len(pauses),
+            "pauses_matched": matched,
+            "pauses_found": found,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if matched != len(pauses) or found != len(pauses):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
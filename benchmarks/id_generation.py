@@ -0,0 +1,98 @@
+"""
+Measures the cost of one element ID with each way the package can produce it.
+
+  uuid4      IDGenerator.generate_id(), a random UUID per element
+  sequential IDAllocator.allocate() with the per-type counters
+  derived    IDAllocator.allocate() in reproducible mode, hashed from a key
+  threads    sequential IDs drawn by several threads from one allocator; also
+             checks that no ID was handed out twice
+
+Usage:
+    python benchmarks/id_generation.py [--count 200000] [--repeat 5] [--threads 4] [--json out.json]
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from xml_video_project_lib.utils import IDAllocator, IDGenerator  # noqa: E402
+
+
+def time_uuid4(count):
+    generate = IDGenerator.generate_id
+    started = time.perf_counter()
+    for _ in range(count):
+        generate("clipitem")
+    return time.perf_counter() - started
+
+
+def time_sequential(count):
+    allocate = IDAllocator().allocate
+    started = time.perf_counter()
+    for _ in range(count):
+        allocate("clipitem")
+    return time.perf_counter() - started
+
+
+def time_derived(count):
+    allocate = IDAllocator(reproducible=True, namespace="benchmark").allocate
+    started = time.perf_counter()
+    for position in range(count):
+        allocate("clipitem", "video", 1, position)
+    return time.perf_counter() - started
+
+
+def time_threads(count, threads):
+    allocator = IDAllocator()
+    per_thread = count // threads
+    results = [None] * threads
+
+    def work(index):
+        allocate = allocator.allocate
+        results[index] = [allocate("clipitem") for _ in range(per_thread)]
+
+    workers = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    issued = [unique_id for result in results for unique_id in result]
+    if len(set(issued)) != len(issued):
+        raise AssertionError("IDAllocator handed out the same ID twice")
+    return elapsed * count / len(issued)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-ID cost of the ID generators.")
+    parser.add_argument('--count', type=int, default=200000, help="IDs generated per run")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per method; the fastest is reported")
+    parser.add_argument('--threads', type=int, default=4, help="Threads sharing one allocator")
+    parser.add_argument('--json', type=str, default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    methods = {
+        "uuid4": time_uuid4,
+        "sequential": time_sequential,
+        "derived": time_derived,
+        "threads": lambda count: time_threads(count, args.threads),
+    }
+    report = {}
+    for name, method in methods.items():
+        best = min(method(args.count) for _ in range(args.repeat))
+        report[name] = {"ns_per_id": best / args.count * 1e9}
+        print(f"{name:>10}: {report[name]['ns_per_id']:8.0f} ns per ID")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
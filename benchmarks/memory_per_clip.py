@@ -0,0 +1,133 @@
+"""
+Reports the memory held per ClipItem for a large generated timeline, next to
+the dict-based layout the models had before they were slotted.
+
+Builds one track of clipitems shaped like the ones generate_video.py creates,
+each with its own audio-level Filter, Parameter and Link and a File shared by
+every hundredth clip, and measures the memory the models hold, either as the
+growth of the process's resident set (rss, Linux) or as the memory allocated
+according to tracemalloc. tracemalloc adds a record to every allocation, so
+only rss fits a million dict-based clips in a few GB.
+
+The dict-based layout no longer exists in this tree. Its figures come from a
+baseline recorded with --source pointing at a checkout of the commit before the
+models got __slots__ (see "commit" in the baseline), e.g.:
+
+    git worktree add /tmp/dict-layout 99cc99d
+    python benchmarks/memory_per_clip.py --source /tmp/dict-layout --save-baseline dict_layout
+
+Usage:
+    python benchmarks/memory_per_clip.py [--clips 1000000] [--files 10000] [--method rss]
+        [--baseline benchmarks/baselines/memory_per_clip.json] [--source DIR]
+        [--save-baseline {dict_layout,slots_layout}]
+"""
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).resolve().parent / "baselines" / "memory_per_clip.json"
+
+
+def build_track(n_clips, n_files):
+    from xml_video_project_lib.models import ClipItem, File, Filter, Link, Parameter, Track
+
+    files = [
+        File(id=f"file-{i}", name=f"clip{i}.mp3", pathurl=f"file://localhost/D%3a/audio/clip{i}.mp3",
+             samplerate=48000, channelcount=2, mediatype="audio")
+        for i in range(n_files)
+    ]
+    track = Track(MZ_TrackTargeted="1", premiereTrackType="Stereo", outputchannelindex="1")
+    for i in range(n_clips):
+        start = i * 120
+        track.add_clipitem(ClipItem(
+            id=f"clipitem-{i}", premiereChannelType="stereo", masterclipid=f"masterclip-{i % n_files}",
+            name=f"clip{i % n_files}.mp3", enabled="TRUE", duration=120, rate_timebase="30", rate_ntsc="TRUE",
+            start=str(start), end=str(start + 120), in_point="0", out_point="120", pproTicksIn="0",
+            pproTicksOut="30481920000000", file=files[i % n_files], sourcetrack_mediatype="audio",
+            sourcetrack_trackindex=1, label2="Caribbean", alphatype="none",
+            filters=[Filter(name="Audio Levels", effectid="audiolevels", effectcategory="audiolevels",
+                            effecttype="audiolevels", mediatype="audio", pproBypass="false", parameters=[
+                                Parameter(parameterid="level", name="Level", valuemin="0", valuemax="3.98109",
+                                          value="1")])],
+            links=[Link(linkclipref=f"clipitem-{i}", mediatype="audio", trackindex=1, clipindex=i + 1,
+                        groupindex=1)],
+        ))
+    return track
+
+
+def _rss():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * 4096
+
+
+def measure(n_clips, n_files, method):
+    """
+    Builds the track and returns the bytes it holds.
+    """
+    # Imported up front so the modules are not counted as clip memory
+    import xml_video_project_lib.models.clipitem  # noqa: F401
+
+    gc.collect()
+    if method == 'tracemalloc':
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+    else:
+        before = _rss()
+    track = build_track(n_clips, n_files)
+    gc.collect()
+    used = (tracemalloc.get_traced_memory()[0] if method == 'tracemalloc' else _rss()) - before
+    tracemalloc.stop()
+    assert len(track.clipitems) == n_clips
+    return used
+
+
+def _commit(source):
+    try:
+        return subprocess.run(['git', '-C', str(source), 'rev-parse', '--short', 'HEAD'], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure model memory per clipitem.")
+    parser.add_argument('--clips', type=int, default=1_000_000, help="Number of clipitems to build")
+    parser.add_argument('--files', type=int, default=10_000, help="Number of distinct media files")
+    parser.add_argument('--method', choices=('rss', 'tracemalloc'), default='rss', help="How memory is measured")
+    parser.add_argument('--baseline', type=str, default=str(BASELINE), help="Recorded layouts to report alongside")
+    parser.add_argument('--source', type=str, default=str(ROOT), help="Checkout whose models are measured")
+    parser.add_argument('--save-baseline', choices=('dict_layout', 'slots_layout'), default=None,
+                        help="Record this measurement in the baseline under that layout")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(args.source).resolve()))
+    used = measure(args.clips, args.files, args.method)
+    current = {
+        "commit": _commit(args.source), "clips": args.clips, "files": args.files, "method": args.method,
+        "bytes": used, "bytes_per_clip": round(used / args.clips),
+    }
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    if args.save_baseline:
+        baseline[args.save_baseline] = current
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+    rows = [(f"{name} (recorded)", entry) for name, entry in baseline.items()]
+    rows.append(("measured", current))
+    print(f"{'layout':<26} {'commit':<9} {'method':<12} {'clips':>9} {'total':>11} {'bytes/clip':>11}")
+    for name, entry in rows:
+        print(f"{name:<26} {entry['commit'] or '-':<9} {entry['method']:<12} {entry['clips']:>9} "
+              f"{entry['bytes'] / 2**20:>7.1f} MiB {entry['bytes_per_clip']:>11}")
+    dict_layout = baseline.get("dict_layout")
+    if dict_layout and dict_layout["method"] == args.method:
+        print(f"measured / dict layout: {current['bytes_per_clip'] / dict_layout['bytes_per_clip']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Times Project.write() of a many-sequence project serially and with worker pools.
+
+Each run writes a freshly built project, so no sequence is answered from the
+incremental caches, and checks that every parallel output is byte-identical
+to the serial one. Wall time should fall with the number of workers up to the
+number of CPUs; past that the pool only adds start-up and transfer costs.
+
+Usage:
+    python benchmarks/parallel_serialization.py [--sequences 24] [--clips 200]
+        [--workers 2 --workers 4] [--repeat 3] [--json out.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import build_project  # noqa: E402
+
+
+class _Discard:
+    """Collects the document in memory, so the timings leave out disk writes."""
+
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+def time_write(params, workers, repeat):
+    """
+    Returns the fastest wall time of writing a fresh project, and its output.
+    """
+    best = None
+    for _ in range(repeat):
+        project = build_project(**params)
+        sink = _Discard()
+        started = time.perf_counter()
+        project.write(sink, workers=workers)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return best, sink.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel serialization of sequences.")
+    parser.add_argument('--sequences', type=int, default=24, help="Sequences in the project")
+    parser.add_argument('--tracks', type=int, default=2, help="Video tracks per sequence")
+    parser.add_argument('--clips', type=int, default=200, help="Clips per track")
+    parser.add_argument('--workers', type=int, action='append', default=None,
+                        help="Worker count to time; may be repeated. Default: 2, 4 and one per CPU")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per setting; the fastest is kept")
+    parser.add_argument('--json', type=str, default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    params = dict(sequences=args.sequences, tracks=args.tracks, clips=args.clips, filters=1, file_reuse=0.5)
+    serial, expected = time_write(params, None, args.repeat)
+    print(f"{'serial':>10}: {serial * 1000:8.1f} ms  {len(expected) / 2**20:6.1f} MiB")
+
+    results = {"serial": serial}
+    mismatched = []
+    for workers in args.workers or sorted({2, 4, os.cpu_count() or 1}):
+        seconds, output = time_write(params, workers, args.repeat)
+        results[f"workers_{workers}"] = seconds
+        if output != expected:
+            mismatched.append(workers)
+        print(f"{workers:>2} workers: {seconds * 1000:8.1f} ms  x{serial / seconds:5.2f}"
+              f"{'' if output == expected else '  OUTPUT DIFFERS'}")
+
+    if args.json:
+        report = {
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "params": params,
+            "seconds": results,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if mismatched:
+        print(f"Output differs from the serial write with {', '.join(map(str, mismatched))} workers")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
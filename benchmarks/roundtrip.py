@@ -0,0 +1,101 @@
+"""
+Checks that an imported XMEML document survives loading and saving.
+
+The document is loaded with load_project() and saved:
+
+  untouched    without materializing anything; must be byte-identical
+  <tags>       after materializing every element with those tags, e.g. every
+               clipitem or every sequence; must be the same document once
+               both are canonicalized (C14N, indentation ignored)
+
+Every tag is checked on its own and all of them together, so an element
+that loses a child, an attribute or its place among its siblings when it
+goes through the models fails the run. The time each save takes is reported.
+
+Usage:
+    python benchmarks/roundtrip.py [in.xml] [--tags clipitem file track sequence]
+"""
+import argparse
+import difflib
+import io
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from lxml import etree as ET  # noqa: E402
+
+from xml_video_project_lib.models import load_project  # noqa: E402
+
+TAGS = ('clipitem', 'file', 'track', 'sequence')
+
+
+def canonical(data):
+    """
+    Returns the C14N form of a document without its indentation.
+    """
+    root = ET.fromstring(data, ET.XMLParser(remove_blank_text=True))
+    for element in root.iter():
+        # Whitespace-only text before the first child is indentation as well
+        if len(element) and element.text is not None and not element.text.strip():
+            element.text = None
+    return ET.tostring(root, method='c14n')
+
+
+def save(path, tags):
+    """
+    Loads the document, materializes the given tags and returns the saved bytes
+    and the seconds the save took.
+    """
+    project = load_project(path)
+    for tag in tags:
+        for raw in list(project.iter(tag)):
+            raw.materialize()
+    output = io.BytesIO()
+    started = time.perf_counter()
+    project.write(output)
+    return output.getvalue(), time.perf_counter() - started
+
+
+def difference(expected, actual, lines=40):
+    def pretty(data):
+        return ET.tostring(ET.fromstring(data), pretty_print=True).decode('utf-8').splitlines()
+
+    return '\n'.join(list(difflib.unified_diff(pretty(expected), pretty(actual), lineterm=''))[:lines])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that imported documents are saved unchanged.")
+    parser.add_argument('path', nargs='?', default=str(ROOT / 'in.xml'), help="XMEML document to load")
+    parser.add_argument('--tags', nargs='+', default=list(TAGS), help="Tags to materialize")
+    args = parser.parse_args()
+
+    source = Path(args.path).read_bytes()
+    expected = canonical(source)
+    failures = 0
+
+    output, seconds = save(args.path, ())
+    same = output == source
+    failures += not same
+    print(f"{'untouched':<30} {seconds * 1000:8.1f} ms  {'identical' if same else 'CHANGED'}")
+
+    checks = [(tag,) for tag in args.tags]
+    if len(args.tags) > 1:
+        checks.append(tuple(args.tags))
+    for tags in checks:
+        output, seconds = save(args.path, tags)
+        actual = canonical(output)
+        same = actual == expected
+        failures += not same
+        print(f"{' '.join(tags):<30} {seconds * 1000:8.1f} ms  {'equivalent' if same else 'CHANGED'}")
+        if not same:
+            print(difference(expected, actual))
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
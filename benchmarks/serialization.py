@@ -0,0 +1,185 @@
+"""
+Times serialization of synthetic projects and checks the output against baselines.
+
+For every scenario a project is built with benchmarks/synthetic.py and the
+following are measured, keeping the fastest of several runs:
+
+  build        constructing the models
+  to_xml       Project.to_xml()
+  tostring     ET.tostring() of that tree
+  save_cold    Project.save_to_file() of a freshly built project
+  save_warm    save_to_file(incremental=True) again after a first incremental
+               save, answered from the fragments that one kept
+
+plus the peak memory traced while building the tree and while saving. Each run
+also checks that save_to_file() writes the same bytes as to_xml() + tostring(),
+and records a SHA-256 of the output.
+
+With --compare, times and memory more than --threshold above the baseline
+fail the run, and so does any output that differs from the baseline's digest,
+so a faster serializer has to produce identical bytes. Times are only
+comparable on the machine that recorded the baseline; digests everywhere.
+
+Usage:
+    python benchmarks/serialization.py [--scenario long] [--repeat 3]
+        [--compare benchmarks/baselines/serialization.json] [--threshold 0.25]
+        [--save-baseline benchmarks/baselines/serialization.json] [--json out.json]
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from lxml import etree as ET  # noqa: E402
+from synthetic import build_project  # noqa: E402
+
+from xml_video_project_lib.serializers.xml_writer import XML_DECLARATION  # noqa: E402
+
+# name -> build_project() arguments
+SCENARIOS = {
+    "small": dict(sequences=1, tracks=2, clips=100, filters=1, file_reuse=0.5),
+    "long": dict(sequences=1, tracks=2, clips=2000, filters=2, file_reuse=0.95),
+    "wide": dict(sequences=6, tracks=3, clips=100, filters=1, file_reuse=0.9),
+    "filter_heavy": dict(sequences=1, tracks=2, clips=500, filters=8, file_reuse=0.5),
+    "unique_files": dict(sequences=1, tracks=4, clips=500, filters=1, file_reuse=0.0),
+}
+
+TIME_METRICS = ("build", "to_xml", "tostring", "save_cold", "save_warm")
+MEMORY_METRICS = ("peak_tree_bytes", "peak_save_bytes")
+MIN_DELTA_SECONDS = 0.002  # Differences below this are timer noise, whatever the ratio
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+def _peak(function):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        function()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def run_scenario(params, repeat, directory):
+    """
+    Measures one scenario.
+
+    Returns:
+        dict: Seconds per TIME_METRICS entry, peak bytes per MEMORY_METRICS entry,
+        the output size and digest, and whether the streamed and tree output match.
+    """
+    output = Path(directory) / "project.xml"
+    times = {name: [] for name in TIME_METRICS}
+    for _ in range(repeat):
+        seconds, project = _timed(lambda: build_project(**params))
+        times["build"].append(seconds)
+        seconds, tree = _timed(project.to_xml)
+        times["to_xml"].append(seconds)
+        seconds, text = _timed(lambda: ET.tostring(tree, pretty_print=True, encoding='UTF-8'))
+        times["tostring"].append(seconds)
+        del tree
+
+        project = build_project(**params)
+        times["save_cold"].append(_timed(lambda: project.save_to_file(output))[0])
+        project.save_to_file(output, incremental=True)
+        times["save_warm"].append(_timed(lambda: project.save_to_file(output, incremental=True))[0])
+        del project
+
+    streamed = output.read_bytes()
+    result = {name: min(values) for name, values in times.items()}
+    result["peak_tree_bytes"] = _peak(
+        lambda: ET.tostring(build_project(**params).to_xml(), pretty_print=True, encoding='UTF-8')
+    )
+    project = build_project(**params)
+    result["peak_save_bytes"] = _peak(lambda: project.save_to_file(output))
+    result["output_bytes"] = len(streamed)
+    result["sha256"] = hashlib.sha256(streamed).hexdigest()
+    result["streamed_matches_tree"] = streamed == XML_DECLARATION + b"<!DOCTYPE xmeml>\n" + text
+    return result
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns the problems found comparing results with a baseline.
+    """
+    problems = []
+    for name, result in results.items():
+        if not result["streamed_matches_tree"]:
+            problems.append(f"{name}: save_to_file() output differs from to_xml() + tostring()")
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if base["params"] != result["params"]:
+            problems.append(f"{name}: scenario parameters differ from the baseline, record a new one")
+            continue
+        if base["sha256"] != result["sha256"]:
+            problems.append(f"{name}: output differs from the baseline ({result['sha256'][:12]} != {base['sha256'][:12]})")
+        for metric in TIME_METRICS:
+            limit = max(base[metric] * (1 + threshold), base[metric] + MIN_DELTA_SECONDS)
+            if result[metric] > limit:
+                problems.append(f"{name}: {metric} {result[metric] * 1000:.1f} ms, baseline {base[metric] * 1000:.1f} ms")
+        for metric in MEMORY_METRICS:
+            if result[metric] > base[metric] * (1 + threshold):
+                problems.append(
+                    f"{name}: {metric} {result[metric] / 2**20:.1f} MiB, baseline {base[metric] / 2**20:.1f} MiB"
+                )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serialization of synthetic projects.")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), default=None,
+                        help="Scenario to run; may be repeated. Default: all")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per scenario; the fastest is kept")
+    parser.add_argument('--compare', type=str, default=None, help="Baseline JSON to check the results against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed slowdown or memory growth over the baseline, as a fraction")
+    parser.add_argument('--save-baseline', type=str, default=None, help="Write the results as a new baseline")
+    parser.add_argument('--json', type=str, default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.scenario or SCENARIOS:
+            params = SCENARIOS[name]
+            result = run_scenario(params, args.repeat, directory)
+            result["params"] = params
+            results[name] = result
+            timings = "  ".join(f"{metric} {result[metric] * 1000:8.1f} ms" for metric in TIME_METRICS)
+            print(f"{name:>13}: {timings}  peak tree {result['peak_tree_bytes'] / 2**20:6.1f} MiB"
+                  f"  peak save {result['peak_save_bytes'] / 2**20:6.1f} MiB  {result['output_bytes'] / 2**20:6.1f} MiB out")
+
+    report = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "scenarios": results,
+    }
+    for path in (args.json, args.save_baseline):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            Path(path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else {}
+    problems = compare(results, baseline, args.threshold)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
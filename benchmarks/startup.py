@@ -0,0 +1,101 @@
+"""
+Reports the import cost of the package and the generate_video CLI.
+
+Each target is imported in a fresh interpreter under ``python -X importtime``,
+several times, and the median cumulative import time is reported together
+with the modules that cost the most on their own. Heavy optional dependencies
+(NumPy, python-docx, ffmpeg-python) that a plain import pulls in are flagged,
+since they should only load when their feature is used.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--top 10] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+TARGETS = [
+    "xml_video_project_lib.models",
+    "xml_video_project_lib.probe",
+    "xml_video_project_lib.models.project",
+    "generate_video",
+]
+
+# Optional dependencies that no plain import should load
+HEAVY_MODULES = ("numpy", "docx", "ffmpeg")
+
+
+def measure_import(target):
+    """
+    Imports target in a new interpreter.
+
+    Returns:
+        tuple: (cumulative microseconds of target, {module: self microseconds},
+        heavy optional modules that were imported)
+    """
+    code = (
+        f"import sys, {target}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    self_times = {}
+    total = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header line
+        name = name.strip()
+        self_times[name] = int(self_us)
+        if name == target:
+            total = int(cumulative_us)
+    heavy = [module for module in result.stdout.strip().split(",") if module]
+    return total, self_times, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of the package and CLI.")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument('--top', type=int, default=10, help="Most expensive modules to list per target")
+    parser.add_argument('--json', type=str, default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    report = {}
+    for target in TARGETS:
+        totals = []
+        self_times = {}
+        heavy = []
+        for _ in range(args.runs):
+            total, times, heavy = measure_import(target)
+            totals.append(total)
+            for name, value in times.items():
+                self_times.setdefault(name, []).append(value)
+        slowest = sorted(((statistics.median(values), name) for name, values in self_times.items()), reverse=True)
+        report[target] = {
+            "median_ms": statistics.median(totals) / 1000,
+            "min_ms": min(totals) / 1000,
+            "heavy_modules": heavy,
+            "slowest": [{"module": name, "self_ms": value / 1000} for value, name in slowest[:args.top]],
+        }
+
+        print(f"{target}: {report[target]['median_ms']:.1f} ms median, {report[target]['min_ms']:.1f} ms min")
+        if heavy:
+            print(f"  loads optional dependencies: {', '.join(heavy)}")
+        for entry in report[target]["slowest"]:
+            print(f"  {entry['self_ms']:7.2f} ms  {entry['module']}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Builds synthetic projects of any size for the benchmarks.
+
+Projects are fully deterministic: the same parameters always give the same
+models and therefore the same serialized bytes. They are built against the
+built-in configuration defaults rather than config.ini, so editing config.ini
+does not change the output either.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from xml_video_project_lib.config import DEFAULTS, ConfigSnapshot  # noqa: E402
+from xml_video_project_lib.models import (  # noqa: E402
+    Audio, ClipItem, File, Filter, Link, Parameter, Project, Sequence, Track, Video,
+)
+
+CLIP_FRAMES = 150
+CLIP_TICKS = 1270523827200  # 150 frames at 29.97 fps
+
+SETTINGS = ConfigSnapshot(DEFAULTS)
+
+
+def _filters(count):
+    filters = []
+    for index in range(count):
+        if index % 2 == 0:
+            filters.append(Filter(
+                name="Basic Motion", effectid="basic", effectcategory="motion", effecttype="motion",
+                mediatype="video", pproBypass="false", parameters=[
+                    Parameter(parameterid="scale", name="Scale", valuemin="0", valuemax="1000", value="66.6667"),
+                    Parameter(parameterid="rotation", name="Rotation", valuemin="-8640", valuemax="8640", value="0"),
+                    Parameter(parameterid="center", name="Center", value=None),
+                ],
+            ))
+        else:
+            filters.append(Filter(
+                name="Opacity", effectid="opacity", effectcategory="motion", effecttype="motion",
+                mediatype="video", pproBypass="false", parameters=[
+                    Parameter(parameterid="opacity", name="Opacity", valuemin="0", valuemax="100", value="100"),
+                ],
+            ))
+    return filters
+
+
+def build_project(sequences=1, tracks=2, clips=100, filters=1, file_reuse=0.5):
+    """
+    Builds a project of video clips laid end to end on every track.
+
+    Args:
+        sequences (int): Number of sequences.
+        tracks (int): Video tracks per sequence, each with one linked audio track.
+        clips (int): Clips per video track.
+        filters (int): Filters per video clip.
+        file_reuse (float): Fraction of clips that reuse a File already used by
+            another clip of the sequence, from 0 (every clip has its own) to 1.
+
+    Returns:
+        Project: The project, ready to be serialized.
+    """
+    project = Project()
+    clips_per_sequence = tracks * clips
+    n_files = max(1, round(clips_per_sequence * (1.0 - file_reuse)))
+    for s in range(sequences):
+        sequence = Sequence(id=f"sequence-{s + 1}", uuid=f"00000000-0000-4000-8000-{s + 1:012d}",
+                            name=f"Sequence {s + 1:02d}", settings=SETTINGS)
+        files = [
+            File(id=f"file-{s + 1}-{i + 1}", name=f"clip{i + 1}.mp4",
+                 pathurl=f"file://localhost/D%3a/footage/clip{i + 1}.mp4", samplerate=48000, channelcount=2,
+                 mediatype="video", width=1920, height=1080)
+            for i in range(n_files)
+        ]
+        video = Video(settings=SETTINGS)
+        audio = Audio()
+        for t in range(tracks):
+            video_track = Track(MZ_TrackTargeted="1", premiereTrackType="Mono", outputchannelindex="1",
+                                settings=SETTINGS)
+            audio_track = Track(MZ_TrackTargeted="1", premiereTrackType="Stereo", outputchannelindex="1",
+                                settings=SETTINGS)
+            for c in range(clips):
+                number = t * clips + c
+                file = files[number % n_files]
+                start = c * CLIP_FRAMES
+                video_id = f"clipitem-{s + 1}-v{number + 1}"
+                audio_id = f"clipitem-{s + 1}-a{number + 1}"
+                links = [
+                    Link(linkclipref=video_id, mediatype="video", trackindex=t + 1, clipindex=c + 1, groupindex=1),
+                    Link(linkclipref=audio_id, mediatype="audio", trackindex=t + 1, clipindex=c + 1, groupindex=1),
+                ]
+                common = dict(
+                    premiereChannelType="stereo", masterclipid=f"masterclip-{file.id}", name=file.name,
+                    enabled="TRUE", duration=CLIP_FRAMES, rate_timebase=30, rate_ntsc=True, start=start,
+                    end=start + CLIP_FRAMES, in_point=0, out_point=CLIP_FRAMES, pproTicksIn=0,
+                    pproTicksOut=CLIP_TICKS, file=file, sourcetrack_trackindex=1, alphatype="none",
+                )
+                video_track.add_clipitem(ClipItem(
+                    id=video_id, sourcetrack_mediatype="video", label2="Iris", filters=_filters(filters),
+                    links=links, **common,
+                ))
+                audio_track.add_clipitem(ClipItem(
+                    id=audio_id, sourcetrack_mediatype="audio", label2="Caribbean", links=list(links), **common,
+                ))
+            video.add_track(video_track)
+            audio.add_track(audio_track)
+        sequence.add_video(video)
+        sequence.add_audio(audio)
+        project.add_sequence(sequence)
+    return project
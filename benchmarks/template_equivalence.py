@@ -0,0 +1,130 @@
+"""
+Checks that template rendering writes the same bytes as lxml.
+
+Clips, files, filters, parameters and links are built with values that need
+escaping (&, <, >, quotes, carriage returns, tabs and newlines, in text and in
+attributes), with None fields and with non-ASCII text, and every one is
+serialized twice:
+
+  fragment     render_fragment(), through the compiled templates
+  tree         ET.tostring(to_xml())
+
+in pretty and compact mode, at the top level and nested, and with and
+without a file registry. Any difference fails the run and is printed.
+
+Usage:
+    python benchmarks/template_equivalence.py
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from lxml import etree as ET  # noqa: E402
+
+from xml_video_project_lib.models import ClipItem, File, Filter, Link, Parameter  # noqa: E402
+from xml_video_project_lib.serializers import FileRegistry  # noqa: E402
+from xml_video_project_lib.serializers.xml_writer import INDENT  # noqa: E402
+
+NASTY = 'a & b < c > d "e" \'f\'\r\n\tg ]]> é€😀'
+
+
+def elements():
+    """
+    Yields (label, element) for every case checked.
+    """
+    parameters = [
+        Parameter(parameterid="scale", name="Scale", valuemin="0", valuemax="1000", value="66.6667"),
+        Parameter(parameterid="center", name="Center", value=None),
+        Parameter(parameterid=NASTY, name=NASTY, valuemin=NASTY, valuemax=None, value=NASTY, authoringApp=NASTY),
+    ]
+    filters = [
+        Filter(name="Opacity", effectid="opacity", effectcategory="motion", effecttype="motion",
+               mediatype="video", pproBypass="false", parameters=parameters[:1]),
+        Filter(name=NASTY, effectid=NASTY, effectcategory=None, effecttype=NASTY, mediatype="video",
+               pproBypass=None, parameters=parameters),
+        Filter(name="Empty", effectid="empty", effectcategory="motion", effecttype="motion",
+               mediatype="audio", pproBypass="false", parameters=[]),
+    ]
+    links = [
+        Link(linkclipref="clipitem-1", mediatype="video", trackindex=1, clipindex=1, groupindex=None),
+        Link(linkclipref=NASTY, mediatype=NASTY, trackindex=2, clipindex=3, groupindex=1),
+    ]
+    files = [
+        File(id="file-1", name="clip.mp4", pathurl="file://localhost/D%3a/clip.mp4", samplerate=48000,
+             channelcount=2, mediatype="video", width=1920, height=1080),
+        File(id=NASTY, name=NASTY, pathurl=NASTY, samplerate=None, channelcount=None, mediatype="audio"),
+        File(id="file-3", name=None, pathurl=None, samplerate=44100, channelcount=1, mediatype="video"),
+    ]
+    yield from (("parameter", parameter) for parameter in parameters)
+    yield from (("filter", filter_) for filter_ in filters)
+    yield from (("link", link) for link in links)
+    yield from (("file", file) for file in files)
+
+    def clip(id, premiereChannelType, value, file, **fields):
+        return ClipItem(id=id, premiereChannelType=premiereChannelType, masterclipid=value, name=value,
+                        enabled=True, duration=150, rate_timebase=30, rate_ntsc=True, start=0, end=150,
+                        in_point=0, out_point=150, pproTicksIn=None, pproTicksOut=None, file=file,
+                        sourcetrack_mediatype="video", sourcetrack_trackindex=1, label2=value,
+                        alphatype="none", **fields)
+
+    yield "clipitem", clip("clipitem-1", None, "clip.mp4", files[0])
+    yield "clipitem", clip(NASTY, NASTY, NASTY, files[1], filters=filters, links=links)
+    yield "clipitem", clip("clipitem-3", "stereo", None, None)
+
+
+def tree(element, pretty_print, level, file_registry):
+    """
+    Serializes the element with lxml, nested in as many parents as its level, and
+    returns it without the parents, its leading indentation and trailing newline.
+    """
+    child = element.to_xml(file_registry)
+    for depth in range(level):
+        parent = ET.Element(f'level{depth}')
+        parent.append(child)
+        child = parent
+    text = ET.tostring(child, pretty_print=pretty_print, encoding='unicode')
+    if not pretty_print:
+        return text
+    lines = text.split('\n')
+    return '\n'.join(lines[level:len(lines) - 1 - level])[len(INDENT) * level:]
+
+
+def check(label, element, pretty_print, level, share_files):
+    """
+    Returns a description of the difference, or None when both agree.
+    """
+    registries = (FileRegistry(), FileRegistry()) if share_files else (None, None)
+    # Twice, so a file is compared both as its definition and as a reference
+    for _ in range(2):
+        expected = tree(element, pretty_print, level, registries[0])
+        actual = element.render_fragment(level, pretty_print, registries[1])
+        if actual != expected:
+            mode = 'pretty' if pretty_print else 'compact'
+            files = 'shared files' if share_files else 'no registry'
+            return f"{label} ({mode}, level {level}, {files}):\n  tree:     {expected!r}\n  fragment: {actual!r}"
+    return None
+
+
+def main():
+    failures = []
+    checked = 0
+    for label, element in elements():
+        for pretty_print in (True, False):
+            for level in ((0, 3) if pretty_print else (0,)):
+                for share_files in (False, True):
+                    checked += 1
+                    failure = check(label, element, pretty_print, level, share_files)
+                    if failure:
+                        failures.append(failure)
+
+    for failure in failures:
+        print(failure)
+    print(f"{checked} cases, {len(failures)} different")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
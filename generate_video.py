@@ -1,417 +1,915 @@
 import argparse
+import glob
+import json
+import os
 import sys
-import logging
-import uuid
+import time
+from contextlib import nullcontext
 from pathlib import Path
 
-from xml_video_project_lib.utils import *
-from xml_video_project_lib.models import *
-from xml_video_project_lib.logging import logger
-from docx import Document
-import ffmpeg
-
-def get_video_dimensions(video_path):
-    """
-    Extracts the width and height of a video file using ffmpeg.
-
-    Args:
-        video_path (str or Path): Path to the video file.
-
-    Returns:
-        tuple: (width, height) of the video.
-
-    Raises:
-        ffmpeg.Error: If ffprobe fails to retrieve metadata.
-    """
-    try:
-        probe = ffmpeg.probe(str(video_path))
-        video_stream = next(
-            (stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None
-        )
-        if video_stream is None:
-            raise ValueError(f"No video stream found in file: {video_path}")
-
-        width = int(video_stream['width'])
-        height = int(video_stream['height'])
-        return width, height
-
-    except ffmpeg.Error as e:
-        print(f"An error occurred while probing video file: {video_path}")
-        print(e.stderr.decode())
-        raise
-    except KeyError as e:
-        print(f"Missing expected metadata in video file: {video_path}")
-        raise
+from xml_video_project_lib.utils import IDAllocator, StageProfiler, frames_to_ticks, seconds_to_frames
+from xml_video_project_lib.models import Audio, ClipItem, File, Filter, Parameter, Project, Sequence, Track, Video
+from xml_video_project_lib.logging import EventCounts, configure_logging, flush_logging, logger
+from xml_video_project_lib.config import config, load_config
+from xml_video_project_lib.probe import ProbeCache, probe_media
+from xml_video_project_lib.layout import FootageAsset, layout_footage, STILL
+from xml_video_project_lib.script import SCRIPT_NAMES, find_script
+
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi', '.mkv']
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff']
+AUDIO_EXTENSIONS = ['.mp3', '.wav']  # Voiceover formats, in order of preference
+DEFAULT_DURATION = 4526  # Voiceover length in frames when its duration cannot be probed
+DEFAULT_SAMPLERATE = 44100  # Voiceover sample rate and channel count when they cannot be probed
+DEFAULT_CHANNELS = 2
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Generate XML video project files based on provided assets.")
     parser.add_argument(
         'project_path',
         type=str,
-        help='Path to the project directory containing footage, audio, and script files.'
+        nargs='+',
+        help='Path to the project directory containing footage, audio, and script files. '
+             'Several directories or glob patterns run in batch mode.'
     )
     parser.add_argument(
         '--output',
         type=str,
         default='sequence_with_video_image_audio.xml',
-        help='Output XML file name. Default is sequence_with_video_image_audio.xml'
+        help='Output XML file name. Default is sequence_with_video_image_audio.xml. A .gz or .xz suffix compresses it.'
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Run in batch mode even for a single project: --output is written inside each project '
+             'directory, the probe cache is shared, and a failing project does not stop the others.'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=None,
+        help='Number of worker processes in batch mode. Default is the number of CPU cores.'
+    )
+    parser.add_argument(
+        '--summary',
+        type=str,
+        default='batch_summary.json',
+        help='Where batch mode writes its JSON result summary, "-" for stdout. Default is batch_summary.json.'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and regenerate the project whenever footage, audio or the script change.'
+    )
+    parser.add_argument(
+        '--watch-debounce',
+        type=float,
+        default=0.2,
+        help='Seconds without further changes before watch mode regenerates. Default is 0.2.'
+    )
+    parser.add_argument(
+        '--probe-workers',
+        type=int,
+        default=None,
+        help='Maximum number of media files probed concurrently. Default comes from config.ini [Probe].'
+    )
+    parser.add_argument(
+        '--probe-cache',
+        type=str,
+        default=None,
+        help='Path of the persistent probe cache. Default comes from config.ini [Probe], relative to the project directory '
+             '(to the current directory in batch mode).'
+    )
+    parser.add_argument(
+        '--no-probe-cache',
+        action='store_true',
+        help='Bypass the probe cache and probe every media file again.'
+    )
+    parser.add_argument(
+        '--prune-probe-cache',
+        action='store_true',
+        help='Remove cache entries for deleted or modified files before probing.'
+    )
+    parser.add_argument(
+        '--layout-seed',
+        type=int,
+        default=None,
+        help='Seed for the order of the footage on the timeline; the same seed gives the same layout. '
+             'Default comes from config.ini [Layout]; without one the footage is used in file name order.'
+    )
+    parser.add_argument(
+        '--still-hold',
+        type=float,
+        default=None,
+        help='Seconds each still image is held on the timeline. Default comes from config.ini [Layout].'
+    )
+    parser.add_argument(
+        '--video-tracks',
+        type=int,
+        default=None,
+        help='Number of video tracks the footage clips alternate between. Default comes from config.ini [Layout].'
+    )
+    parser.add_argument(
+        '--analyze-audio',
+        action='store_true',
+        help='Measure the loudness and pauses of the voiceover, set its Audio Levels from the loudness and '
+             'end footage clips in pauses. Same as [Audio Analysis] enabled in config.ini.'
+    )
+    parser.add_argument(
+        '--reproducible',
+        action='store_true',
+        help='Derive element IDs and the sequence UUID from the inputs instead of numbering them and '
+             'picking a random UUID, so identical inputs give byte-identical XML. Same as [IDs] reproducible in config.ini.'
+    )
+    parser.add_argument(
+        '--log-level',
+        type=str,
+        default=None,
+        help='Logging level, e.g. DEBUG to log every file and clip created. Default comes from config.ini [Logging].'
+    )
+    parser.add_argument(
+        '--log-format',
+        choices=['text', 'json'],
+        default=None,
+        help='Write log records as text or as one JSON object per line. Default comes from config.ini [Logging].'
+    )
+    parser.add_argument(
+        '--log-queue',
+        action='store_true',
+        default=None,
+        help='Format and write log records on a background thread. Default comes from config.ini [Logging].'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Write the XML without indentation. An output name ending in .gz or .xz is compressed.'
+    )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        metavar='OUT.json',
+        help='Write the wall time, CPU time and peak memory of every stage, and the number of elements '
+             'created, to this JSON file ("-" for stdout). In batch mode the file holds one report per project.'
+    )
+    parser.add_argument(
+        '--set',
+        type=parse_override,
+        action='append',
+        default=[],
+        metavar='SECTION.OPTION=VALUE',
+        help='Overrides a config.ini value for this run, e.g. --set "Sequence Rate.rate_timebase=25". '
+             'Settings are layered: built-in defaults, the global config.ini, a config.ini in the project '
+             'directory, then these overrides.'
     )
     return parser.parse_args()
 
+def parse_override(text):
+    """
+    Parses a --set argument into (section, option, value).
+    """
+    key, separator, value = text.partition('=')
+    section, dot, option = key.partition('.')
+    if not separator or not dot or not section.strip() or not option.strip():
+        raise argparse.ArgumentTypeError(f"expected SECTION.OPTION=VALUE, got '{text}'")
+    return section.strip(), option.strip(), value
+
+def config_overrides(args):
+    """
+    Collects the config values given on the command line as an override layer.
+    """
+    overrides = {}
+    for section, option, value in args.set:
+        overrides.setdefault(section, {})[option] = value
+    layout = overrides.setdefault('Layout', {})
+    if args.layout_seed is not None:
+        layout['seed'] = args.layout_seed
+    if args.still_hold is not None:
+        layout['still_hold_seconds'] = args.still_hold
+    if args.video_tracks is not None:
+        layout['video_tracks'] = args.video_tracks
+    if args.reproducible:
+        overrides.setdefault('IDs', {})['reproducible'] = 'TRUE'
+    if args.analyze_audio:
+        overrides.setdefault('Audio Analysis', {})['enabled'] = 'TRUE'
+    return overrides
+
+def project_settings(args, project_dir=None):
+    """
+    Returns the ConfigSnapshot for a project: the global config, the project's
+    own config.ini if it has one, and the command line overrides.
+    """
+    return load_config(project_dir, config_overrides(args))
+
+def open_probe_cache(args, project_dir, settings=config):
+    """
+    Opens the persistent probe cache selected by the command line and config.
+
+    Returns:
+        ProbeCache or None: None when the cache is bypassed.
+    """
+    if args.no_probe_cache:
+        return None
+    cache_path = Path(args.probe_cache or settings.get('Probe', 'cache_file', fallback='.probe_cache.sqlite3'))
+    if not cache_path.is_absolute():
+        cache_path = project_dir / cache_path
+    cache = ProbeCache(cache_path)
+    if args.prune_probe_cache:
+        cache.prune()
+    return cache
+
+def build_video(layout, rate_timebase, rate_ntsc, settings=None, ids=None):
+    """
+    Builds the video section for a footage layout. Every asset gets one File,
+    shared by all of its clips, and each placement becomes a ClipItem on its track.
+
+    Args:
+        layout (TimelineLayout): Placements from layout_footage().
+        rate_timebase (int): The sequence frame rate the layout is counted in.
+        rate_ntsc (bool): Whether that rate is NTSC.
+        settings (ConfigSnapshot, optional): The project's configuration.
+        ids (IDAllocator, optional): The project's ID allocator. Files are keyed by
+            name and clips by track and start, for reproducible IDs.
+
+    Returns:
+        Video: The video section with one track per layout track.
+    """
+    ids = ids or IDAllocator()
+    video = Video(settings=settings)
+    tracks = [
+        Track(MZ_TrackTargeted="1", premiereTrackType="Mono", outputchannelindex="1", settings=settings)
+        for _ in range(layout.tracks)
+    ]
+    files = {}
+    events = EventCounts()  # One summary line instead of a line per file and clip
+
+    for placement in layout.placements:
+        asset = placement.asset
+        file_obj = files.get(asset.path)
+        if file_obj is None:
+            file_obj = File(
+                id=ids.allocate("file", "footage", asset.path.name),
+                name=asset.path.name,
+                pathurl=f"file://localhost/{asset.path.as_posix()}",
+                samplerate=48000,   # Typically irrelevant for video, but provided
+                channelcount=2,
+                mediatype="video",  # Images are treated as video media in editing software
+                width=asset.width,
+                height=asset.height
+            )
+            files[asset.path] = file_obj
+            events.record("footage files", "Created File object for footage: %s", asset.path.name)
+
+        still = asset.kind == STILL
+        # Fit the footage inside the sequence frame, as Premiere's "Scale to Frame Size" does
+        scale = 100.0
+        if asset.width and asset.height:
+            scale *= min(video.width / asset.width, video.height / asset.height)
+        clipitem = ClipItem(
+            id=ids.allocate("clipitem", "video", placement.track, placement.start),
+            premiereChannelType="stereo",
+            masterclipid=f"masterclip-{file_obj.id}",
+            name=asset.path.name,
+            enabled="TRUE",
+            duration=placement.frames if still else asset.frames,
+            rate_timebase=rate_timebase,
+            rate_ntsc=rate_ntsc,
+            start=placement.start,
+            end=placement.end,
+            in_point=placement.in_point,
+            out_point=placement.out_point,
+            pproTicksIn=frames_to_ticks(placement.in_point, rate_timebase, rate_ntsc),
+            pproTicksOut=frames_to_ticks(placement.out_point, rate_timebase, rate_ntsc),
+            file=file_obj,
+            sourcetrack_mediatype="video",
+            sourcetrack_trackindex=1,
+            label2="Lavender" if still else "Iris",
+            alphatype="straight" if still else "none",
+            filters=[
+                Filter(
+                    name="Basic Motion",
+                    effectid="basic",
+                    effectcategory="motion",
+                    effecttype="motion",
+                    mediatype="video",
+                    pproBypass="false",
+                    parameters=[
+                        Parameter(parameterid="scale", name="Scale", valuemin="0", valuemax="1000", value=f"{scale:.6g}"),
+                        Parameter(parameterid="rotation", name="Rotation", valuemin="-8640", valuemax="8640", value="0"),
+                        Parameter(parameterid="center", name="Center", value=None),
+                        Parameter(parameterid="centerOffset", name="Anchor Point", value=None),
+                        Parameter(parameterid="antiflicker", name="Anti-flicker Filter", valuemin="0.0", valuemax="1.0", value="0")
+                    ]
+                )
+            ]
+        )
+        tracks[placement.track].add_clipitem(clipitem)
+        events.record("footage clips", "Created ClipItem %s for %s", clipitem.id, asset.path.name)
+
+    for track in tracks:
+        video.add_track(track)
+    logger.info("Created %s.", events)
+    return video
+
 def process_script(script_path, logger):
     try:
-        doc = Document(script_path)
-        script_text = '\n'.join([para.text for para in doc.paragraphs])
-        logger.info(f"Extracted script from {script_path.name}")
+        from xml_video_project_lib.script import SCENE_BREAK, iter_script
+
+        events = EventCounts()
+        lines = []
+        for block in iter_script(script_path):
+            events.record(block.kind.replace('_', ' ') + 's')
+            if block.kind != SCENE_BREAK:
+                lines.append(block.text)
+        script_text = '\n'.join(lines)
+        logger.info("Extracted script from %s: %s.", script_path.name, events)
         # Implement further processing as needed
         return script_text
     except Exception as e:
-        logger.error(f"Failed to process script file: {e}")
+        logger.error("Failed to process script file: %s", e)
         return ""
 
-def main():
-    args = parse_arguments()
-    project_dir = Path(args.project_path).resolve()
-
-    # Setup logger with DEBUG level to capture detailed logs
-    # logger = setup_logger("XMLProjectLib", level=logging.DEBUG)
+def analyze_voiceover(audio_path, settings):
+    """
+    Measures the voiceover as configured in the [Audio Analysis] section.
 
+    Returns:
+        AudioAnalysis or None: None if the audio could not be decoded.
+    """
     try:
-        # Validate project directory
-        if not project_dir.exists() or not project_dir.is_dir():
-            logger.error(f"The specified project path does not exist or is not a directory: {project_dir}")
-            sys.exit(1)
+        from xml_video_project_lib.analysis import analyze_audio
+
+        analysis = analyze_audio(
+            audio_path,
+            window=settings.get('Audio Analysis', 'window_seconds', fallback=0.05, type_cast=float),
+            silence_threshold_db=settings.get('Audio Analysis', 'silence_threshold_db', fallback=-45.0,
+                                              type_cast=float),
+            min_silence=settings.get('Audio Analysis', 'min_silence_seconds', fallback=0.4, type_cast=float),
+        )
+        logger.info("Analyzed %s: %.1f LUFS, peak %.1f dBFS, %s pauses.",
+                    audio_path.name, analysis.loudness, analysis.peak_db, len(analysis.silences))
+        return analysis
+    except Exception as e:
+        logger.error("Failed to analyze audio file %s: %s", audio_path.name, e)
+        return None
 
-        # Define paths
-        footage_dir = project_dir / 'footage'
-        audio_dir = project_dir / 'audio'
-        script_file = project_dir / 'script.docx'
+class ProjectError(Exception):
+    """
+    Raised when a project directory lacks the footage, audio or script it needs.
+    """
 
-        # Validate presence of required directories and files
-        if not footage_dir.exists() or not footage_dir.is_dir():
-            logger.error(f"'footage' directory not found in the project path: {footage_dir}")
-            sys.exit(1)
+def build_audio(mp3_file_path, mp3_info, rate_timebase, rate_ntsc, ids=None, level=None, settings=None):
+    """
+    Builds the audio section holding the voiceover on a single stereo track.
 
-        if not audio_dir.exists() or not audio_dir.is_dir():
-            logger.error(f"'audio' directory not found in the project path: {audio_dir}")
-            sys.exit(1)
+    Args:
+        mp3_file_path (Path): The voiceover.
+        mp3_info (MediaInfo or None): Its probe result; without a duration the
+            clip is DEFAULT_DURATION frames long, and without a sample rate or
+            channel count the file is described as DEFAULT_SAMPLERATE and
+            DEFAULT_CHANNELS.
+        rate_timebase (int): The sequence frame rate.
+        rate_ntsc (bool): Whether that rate is NTSC.
+        ids (IDAllocator, optional): The project's ID allocator.
+        level (float, optional): Linear gain of the Audio Levels filter; 1 when not given.
+        settings (ConfigSnapshot, optional): The project's configuration.
 
-        if not script_file.exists() or not script_file.is_file():
-            logger.error(f"'script.docx' file not found in the project path: {script_file}")
-            sys.exit(1)
+    Returns:
+        tuple: (Audio, the voiceover's length in frames)
+    """
+    ids = ids or IDAllocator()
+    file_id = ids.allocate("file", "audio", mp3_file_path.name)
+    clipitem_id = ids.allocate("clipitem", "audio", 0, 0)
+
+    # Create File object for mp3, described from the same probe result as its duration
+    samplerate = mp3_info.samplerate if mp3_info is not None else None
+    channels = mp3_info.channels if mp3_info is not None else None
+    file_obj = File(
+        id=file_id,
+        name=mp3_file_path.name,
+        pathurl=f"file://localhost/{mp3_file_path.as_posix()}",
+        samplerate=samplerate if samplerate is not None else DEFAULT_SAMPLERATE,
+        channelcount=channels if channels is not None else DEFAULT_CHANNELS,
+        mediatype="audio"
+    )
+    logger.info("Created File object for audio: %s", mp3_file_path.name)
+
+    if mp3_info is not None and mp3_info.duration is not None:
+        duration = seconds_to_frames(mp3_info.duration, rate_timebase, rate_ntsc)
+        logger.debug("Extracted duration for audio %s: %s frames", mp3_file_path.name, duration)
+    else:
+        logger.error("Failed to extract duration for audio: %s. Setting default duration.", mp3_file_path.name)
+        duration = DEFAULT_DURATION
+
+    # Create Audio ClipItem
+    audio_clipitem = ClipItem(
+        id=clipitem_id,
+        premiereChannelType="stereo",
+        masterclipid=f"masterclip-{file_id}",
+        name=mp3_file_path.name,
+        enabled="TRUE",
+        duration=duration,  # Optionally, derive from audio metadata
+        rate_timebase=rate_timebase,
+        rate_ntsc=rate_ntsc,
+        start=0,
+        end=duration,
+        in_point=0,
+        out_point=duration,
+        pproTicksIn=0,
+        pproTicksOut=frames_to_ticks(duration, rate_timebase, rate_ntsc),
+        file=file_obj,
+        sourcetrack_mediatype="audio",
+        sourcetrack_trackindex=1,
+        label2="Caribbean",
+        alphatype="none",
+        filters=[
+            Filter(
+                name="Audio Levels",
+                effectid="audiolevels",
+                effectcategory="audiolevels",
+                effecttype="audiolevels",
+                mediatype="audio",
+                pproBypass="false",
+                parameters=[
+                    Parameter(parameterid="level", name="Level", valuemin="0", valuemax="3.98109",
+                              value="1" if level is None else f"{level:g}")
+                ]
+            )
+        ],
+    )
+    logger.info("Created Audio ClipItem: %s", clipitem_id)
+
+    # Add the audio clipitem to the first audio track
+    atrack = Track(
+        MZ_TrackTargeted="1",
+        premiereTrackType="Stereo",
+        outputchannelindex="1",
+        settings=settings
+    )
+    atrack.add_clipitem(audio_clipitem)
+    logger.info("Added Audio ClipItem to audio track: %s", clipitem_id)
 
-        # Proceed with project creation
-        project = Project()
+    # Add the audio tracks to the audio section
+    audio = Audio(settings=settings)
+    audio.add_track(atrack)
+    logger.info("Added audio tracks to audio media.")
+    return audio, duration
 
-        # Create Sequence
-        sequence = Sequence(
-            id=IDGenerator.generate_id("sequence"),
-            uuid=str(uuid.uuid4()),
-            name="Sequence 01",
-            duration=4526,  # You might want to make this dynamic based on content
-        )
-        project.add_sequence(sequence)
-        logger.info("Added sequence to project.")
+def generate_project(project_dir, output, args, probe_cache=None, timings=None, settings=None, profiler=None):
+    """
+    Generates the XML project for one project directory.
 
-        # ---------------- AUDIO SECTION ----------------
-        # Find the first mp3 file in the audio directory
-        mp3_files = list(audio_dir.glob('*.mp3'))
+    Args:
+        project_dir (Path): Directory containing footage, audio and a script
+            (script.docx, script.md or script.txt).
+        output (str or Path): Where to write the XML file.
+        args (argparse.Namespace): Parsed command line options (probing and layout).
+        probe_cache (ProbeCache, optional): Cache consulted before probing media.
+        timings (dict, optional): Filled with the seconds spent probing, building
+            and writing the project.
+        settings (ConfigSnapshot, optional): The project's configuration; built
+            with project_settings() when not given.
+        profiler (StageProfiler, optional): Records the scan, probe, analyze, build, script,
+            validate and save stages of the run, for callers that want the full measurements.
 
+    Returns:
+        Path: The written XML file.
+
+    Raises:
+        ProjectError: If the project directory is incomplete.
+    """
+    timings = {} if timings is None else timings
+
+    # Validate project directory
+    if not project_dir.exists() or not project_dir.is_dir():
+        raise ProjectError(f"The specified project path does not exist or is not a directory: {project_dir}")
+
+    # Define paths
+    footage_dir = project_dir / 'footage'
+    audio_dir = project_dir / 'audio'
+    script_file = find_script(project_dir)
+
+    # Validate presence of required directories and files
+    if not footage_dir.exists() or not footage_dir.is_dir():
+        raise ProjectError(f"'footage' directory not found in the project path: {footage_dir}")
+
+    if not audio_dir.exists() or not audio_dir.is_dir():
+        raise ProjectError(f"'audio' directory not found in the project path: {audio_dir}")
+
+    if script_file is None:
+        raise ProjectError(f"No script ({', '.join(SCRIPT_NAMES)}) found in the project path: {project_dir}")
+
+    # Proceed with project creation
+    profiler = profiler or StageProfiler(trace_memory=False, count_elements=False)
+    before = profiler.wall_times()
+    project = Project()
+    if settings is None:
+        settings = project_settings(args, project_dir)
+    ids = IDAllocator(
+        reproducible=settings.get('IDs', 'reproducible', fallback=False, type_cast=bool),
+        namespace=project_dir.name,
+    )
+    rate_timebase = settings.get('Sequence Rate', 'rate_timebase', type_cast=int)
+    rate_ntsc = settings.get('Sequence Rate', 'rate_ntsc', type_cast=bool)
+
+    # Create Sequence
+    sequence = Sequence(
+        id=ids.allocate("sequence", "Sequence 01"),
+        uuid=ids.uuid("sequence", "Sequence 01"),
+        name="Sequence 01",
+        settings=settings,
+    )
+    project.add_sequence(sequence)
+    logger.info("Added sequence to project.")
+
+    # ---------------- PROBING ----------------
+    with profiler.stage('scan'):
+        # Find the voiceover: the first mp3 file in the audio directory, or failing that the first wav
+        mp3_files = [f for extension in AUDIO_EXTENSIONS for f in audio_dir.glob(f'*{extension}')]
+        footage_files = [
+            f for f in footage_dir.glob('*') if f.suffix.lower() in VIDEO_EXTENSIONS + IMAGE_EXTENSIONS
+        ]
+
+    # Probe every media file once, concurrently, and reuse the results below.
+    media_paths = mp3_files[:1] + footage_files
+    with profiler.stage('probe'):
+        media_info = probe_media(media_paths, max_workers=args.probe_workers, cache=probe_cache,
+                                 settings=settings)
+    profiler.count('media_files', len(media_paths))
+    logger.info("Probed %s media files.", len(media_info))
+    if probe_cache is not None:
+        stats = probe_cache.stats()
+        logger.info("Probe cache: %s hits, %s misses.", stats['hits'], stats['misses'])
+
+    analysis = None
+    if mp3_files and settings.get('Audio Analysis', 'enabled', fallback=False, type_cast=bool):
+        with profiler.stage('analyze'):
+            analysis = analyze_voiceover(mp3_files[0], settings)
+
+    with profiler.stage('build'):
+        # ---------------- AUDIO SECTION ----------------
+        voiceover_frames = None  # Length the footage has to cover; None lays out all footage once
         if not mp3_files:
-            logger.warning(f"No mp3 files found in 'audio' directory: {audio_dir}")
+            logger.warning("No mp3 or wav files found in 'audio' directory: %s", audio_dir)
 
         else:
             mp3_file_path = mp3_files[0]  # Assuming the first mp3 is the voiceover
-            logger.info(f"Using MP3 file for audio: {mp3_file_path.name}")
+            logger.info("Using audio file for the voiceover: %s", mp3_file_path.name)
+            level = None
+            if analysis is not None:
+                level = analysis.level(settings.get('Audio Analysis', 'target_loudness', fallback=-16.0,
+                                                    type_cast=float))
+            audio, voiceover_frames = build_audio(
+                mp3_file_path, media_info.get(mp3_file_path), rate_timebase, rate_ntsc, ids, level, settings
+            )
 
-            file_id = IDGenerator.generate_id("file")
-            clipitem_id = IDGenerator.generate_id("clipitem")
+            # Add audio to the sequence
+            sequence.add_audio(audio)
+            logger.info("Added audio media to sequence.")
 
-            # Create File object for mp3
-            file_obj = File(
-                id=file_id,
-                name=mp3_file_path.name,
-                pathurl=f"file://localhost/{mp3_file_path.as_posix()}",
-                samplerate=44100,
-                channelcount=2,
-                mediatype="audio"
+        # ---------------- VIDEO SECTION ----------------
+        assets = []
+        for footage_file in footage_files:
+            asset = FootageAsset.from_media_info(footage_file, media_info.get(footage_file), rate_timebase, rate_ntsc)
+            if asset is None:
+                logger.warning("Skipping footage without a picture: %s", footage_file.name)
+                continue
+            assets.append(asset)
+
+        if not assets:
+            logger.warning("No usable video or image files found in 'footage' directory: %s", footage_dir)
+
+        else:
+            seed = None
+            if settings.get('Layout', 'seed', fallback=''):
+                seed = settings.get('Layout', 'seed', type_cast=int)
+            still_hold = settings.get('Layout', 'still_hold_seconds', fallback=5.0, type_cast=float)
+            cut_points = None
+            if analysis is not None and settings.get('Audio Analysis', 'cut_on_pauses', fallback=True,
+                                                     type_cast=bool):
+                cut_points = [seconds_to_frames(point, rate_timebase, rate_ntsc) for point in analysis.cut_points()]
+            layout = layout_footage(
+                assets,
+                total_frames=voiceover_frames,
+                still_frames=seconds_to_frames(still_hold, rate_timebase, rate_ntsc),
+                seed=seed,
+                tracks=settings.get('Layout', 'video_tracks', fallback=1, type_cast=int),
+                cut_points=cut_points,
             )
-            logger.info(f"Created File object for audio: {mp3_file_path.name}")
+            sequence.add_video(build_video(layout, rate_timebase, rate_ntsc, settings, ids))
+            logger.info("Laid out %s footage clips on %s video tracks.", len(layout.placements), layout.tracks)
+
+    # ---------------- SCRIPT SECTION ----------------
+    # The script is streamed, so long scripts cost little here
+    # You might want to integrate script_content with the voiceover timings or elsewhere
+    # For now, it's just extracted and logged
+    with profiler.stage('script'):
+        script_content = process_script(script_file, logger)
+
+    # The sequence duration is derived from the clips, so check them first
+    with profiler.stage('validate'):
+        problems = project.validate()
+    for problem in problems:
+        logger.warning(problem)
+
+    # Serialize and Save XML
+    project.save_to_file(output, atomic=True, profiler=profiler, pretty_print=not args.compact)
+    logger.info("Project XML generated and saved successfully at %s", output)
+
+    after = profiler.wall_times()
+    for name, stage in (('probe', 'probe'), ('build', 'build'), ('write', 'save')):
+        timings[name] = after.get(stage, 0.0) - before.get(stage, 0.0)
+    return Path(output)
+
+def is_project_input(path, project_dir):
+    """
+    Whether a changed path is one generate_project() reads, as opposed to e.g.
+    the output file or an editor's temporary file.
+    """
+    if path.parent == project_dir / 'footage':
+        return path.suffix.lower() in VIDEO_EXTENSIONS + IMAGE_EXTENSIONS
+    if path.parent == project_dir / 'audio':
+        return path.suffix.lower() in AUDIO_EXTENSIONS
+    return path.parent == project_dir and path.name in SCRIPT_NAMES + ('config.ini',)
+
+def watch_project(project_dir, args):
+    """
+    Generates the project, then regenerates it after every burst of changes to
+    its footage, audio or script until interrupted.
 
+    Unchanged media files are answered from the probe cache, keyed on size and
+    modification time, so only the changed files are probed again. When the
+    persistent cache is disabled an in-memory one is used for the session.
+    """
+    from xml_video_project_lib.utils.file_watcher import create_watcher
+
+    probe_cache = open_probe_cache(args, project_dir, project_settings(args, project_dir)) or ProbeCache(':memory:')
+    watcher = None
+    try:
+        generate_profiled(project_dir, args, probe_cache)
+        watcher = create_watcher([
+            project_dir / 'footage', project_dir / 'audio', project_dir / 'config.ini',
+            *(project_dir / name for name in SCRIPT_NAMES)
+        ])
+        logger.info("Watching %s for changes. Press Ctrl+C to stop.", project_dir)
+        for changed in watcher.batches(debounce=args.watch_debounce):
+            changed = sorted(path for path in changed if is_project_input(path, project_dir))
+            if not changed:
+                continue
+            logger.info("Changed: %s", ', '.join(path.name for path in changed))
+            started = time.perf_counter()
             try:
-                probe = ffmpeg.probe(str(mp3_file_path))
-                video_stream = next(
-                    (stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None
-                )
-                duration = int(float(probe['format']['duration']))
-                logger.debug(f"Extracted duration for video {mp3_file_path.name}: {duration} seconds")
+                generate_profiled(project_dir, args, probe_cache)
             except Exception as e:
-                logger.error(f"Failed to extract duration for video: {mp3_file_path.name}. Setting default duration.")
-                duration = 4526  # Default duration if extraction fails
-
-
-            # Create Audio ClipItem
-            audio_clipitem = ClipItem(
-                id=clipitem_id,
-                premiereChannelType="stereo",
-                masterclipid=f"masterclip-{file_id}",
-                name=mp3_file_path.name,
-                enabled="TRUE",
-                duration=duration,  # Optionally, derive from audio metadata
-                rate_timebase="30",
-                rate_ntsc="TRUE",
-                start="0",
-                end=str(duration),
-                in_point="0",
-                out_point=str(duration),
-                pproTicksIn="0",
-                pproTicksOut="38360869747200",
-                file=file_obj,
-                sourcetrack_mediatype="audio",
-                sourcetrack_trackindex=1,
-                label2="Caribbean",
-                alphatype="none",
-                filters=[
-                    Filter(
-                        name="Audio Levels",
-                        effectid="audiolevels",
-                        effectcategory="audiolevels",
-                        effecttype="audiolevels",
-                        mediatype="audio",
-                        pproBypass="false",
-                        parameters=[
-                            Parameter(parameterid="level", name="Level", valuemin="0", valuemax="3.98109", value="1")
-                        ]
-                    )
-                ],
-            )
-            logger.info(f"Created Audio ClipItem: {clipitem_id}")
+                # Keep watching; the next change may fix the project
+                logger.error("An error occurred: %s", e)
+                continue
+            logger.info("Regenerated %s in %.2fs", args.output, time.perf_counter() - started)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
+    finally:
+        if watcher is not None:
+            watcher.close()
+        probe_cache.close()
+
+def expand_project_paths(patterns):
+    """
+    Resolves the project paths given on the command line. Glob patterns are
+    expanded here as well, for shells that do not expand them.
 
-            # Add the audio clipitem to the first audio track
-            atrack = Track(
-                MZ_TrackTargeted="1",
-                premiereTrackType="Stereo",
-                outputchannelindex="1"
-            )
-            atrack.add_clipitem(audio_clipitem)
-            logger.info(f"Added Audio ClipItem to audio track: {clipitem_id}")
+    Returns:
+        list: Resolved Paths in the order given, without duplicates.
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            logger.warning("No project directories match '%s'", pattern)
+        paths.extend(Path(match).resolve() for match in matches)
+    return list(dict.fromkeys(paths))
+
+def shared_probe_cache_path(args):
+    """
+    Returns the probe cache all batch workers share, relative to the current
+    directory unless absolute, or None when the cache is bypassed.
+    """
+    if args.no_probe_cache:
+        return None
+    settings = project_settings(args)
+    return Path(args.probe_cache or settings.get('Probe', 'cache_file', fallback='.probe_cache.sqlite3')).resolve()
+
+_worker_probe_cache = None
+_worker_started = None
+
+def _init_batch_worker(cache_path, started=None):
+    # Opened once per worker process and kept warm for every project it handles
+    global _worker_probe_cache, _worker_started
+    if cache_path is not None:
+        _worker_probe_cache = ProbeCache(cache_path)
+    _worker_started = started
+
+def _generate_in_worker(project_dir, args):
+    """
+    Generates one project of a batch and reports the outcome instead of raising,
+    so a broken project does not stop the others.
+    """
+    if _worker_started is not None:
+        # Tells run_batch() which projects were in flight if the process dies
+        _worker_started[str(project_dir)] = True
+    timings = {}
+    profiler = StageProfiler() if args.profile else None
+    started = time.perf_counter()
+    result = {"project": str(project_dir), "status": "ok", "output": None, "error": None}
+    try:
+        with profiler or nullcontext():
+            output = generate_project(project_dir, project_dir / args.output, args, _worker_probe_cache, timings,
+                                      profiler=profiler)
+        result["output"] = str(output)
+    except Exception as e:
+        logger.error("Failed to generate project %s: %s", project_dir, e)
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    # Worker processes end without running atexit hooks; write queued records now
+    flush_logging()
+    result["seconds"] = time.perf_counter() - started
+    result["timings"] = timings
+    if profiler is not None:
+        result["profile"] = profiler.report()
+    return result
+
+def _run_pool(project_dirs, args, jobs, cache_path, results, total):
+    """
+    Runs projects on one process pool, adding their results to results.
 
-            # Add the audio tracks to the audio section
-            audio = Audio(numOutputChannels=2, depth=16, samplerate=48000)
-            audio.add_track(atrack)
-            logger.info("Added audio tracks to audio media.")
+    Returns:
+        tuple: (projects that had started when a worker died, projects that had not),
+        both empty when the pool finished normally.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    broken = None
+    # A dict held by a manager process, not a pipe: workers never block on it
+    # however many projects start, and it survives a worker dying mid-write
+    with multiprocessing.Manager() as manager:
+        started = manager.dict()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker,
+                                 initargs=(cache_path, started)) as pool:
+            futures = {pool.submit(_generate_in_worker, project_dir, args): project_dir
+                       for project_dir in project_dirs}
+            for future in as_completed(futures):
+                project_dir = futures[future]
+                try:
+                    results[project_dir] = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died, e.g. killed for running out of memory, and took the pool with it
+                    broken = e
+                    continue
+                logger.info("[%s/%s] %s: %s", len(results), total, project_dir.name,
+                            results[project_dir]['status'])
+        if broken is None:
+            return [], []
+        in_flight = set(started.keys())
+
+    unfinished = [project_dir for project_dir in project_dirs if project_dir not in results]
+    return ([project_dir for project_dir in unfinished if str(project_dir) in in_flight],
+            [project_dir for project_dir in unfinished if str(project_dir) not in in_flight])
+
+def run_batch(project_dirs, args):
+    """
+    Generates many projects on a pool of worker processes, each writing its XML
+    file into its own project directory.
 
-            # Add audio to the sequence
-            sequence.add_audio(audio)
-            logger.info("Added audio media to sequence.")
+    If a worker process dies, the pool breaks and every unfinished project with
+    it. The projects that had not started are resubmitted to a fresh pool. Those
+    that were running are then retried one at a time, each in a pool of its own,
+    so only a project that kills its worker again is reported as failed.
 
-        # ---------------- VIDEO SECTION ----------------
-        # video = Video()
-
-        # # Create a video track targeted for video
-        # vtrack = Track(
-        #     MZ_TrackTargeted="1",
-        #     premiereTrackType="Mono",
-        #     outputchannelindex="1"
-        # )
-        # logger.info("Created video track.")
-
-        # # Scan footage directory for video files
-        # video_extensions = ['.mp4', '.mov', '.avi', '.mkv']
-        # video_files = list(footage_dir.glob('*'))
-        # video_files = [f for f in video_files if f.suffix.lower() in video_extensions]
-
-        # if not video_files:
-        #     logger.warning(f"No video files found in 'footage' directory: {footage_dir}")
-
-        # for video_file in video_files:
-        #     file_id = IDGenerator.generate_id("file")
-        #     clipitem_id = IDGenerator.generate_id("clipitem")
-
-        #     width, height = get_video_dimensions(video_file)
-
-        #     # Create File object for each video
-        #     file_obj = File(
-        #         id=file_id,
-        #         name=video_file.name,
-        #         pathurl=f"file://localhost/{video_file.as_posix()}",
-        #         samplerate=48000,   # Typically irrelevant for video, but provided
-        #         channelcount=2,
-        #         mediatype="video",
-        #         width=width,
-        #         height=height
-        #     )
-        #     logger.info(f"Created File object for video: {video_file.name}")
-
-        #     # Optionally, extract duration from video metadata
-        #     try:
-        #         probe = ffmpeg.probe(str(video_file))
-        #         video_stream = next(
-        #             (stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None
-        #         )
-        #         duration = int(float(probe['format']['duration']))
-        #         logger.debug(f"Extracted duration for video {video_file.name}: {duration} seconds")
-        #     except Exception as e:
-        #         logger.error(f"Failed to extract duration for video: {video_file.name}. Setting default duration.")
-        #         duration = 4526  # Default duration if extraction fails
-
-        #     # Create ClipItem for each video
-        #     clipitem = ClipItem(
-        #         id=clipitem_id,
-        #         premiereChannelType="stereo",
-        #         masterclipid=f"masterclip-{file_id}",
-        #         name=video_file.name,
-        #         enabled="TRUE",
-        #         duration=duration,
-        #         rate_timebase="30",
-        #         rate_ntsc="TRUE",
-        #         start="0",
-        #         end="449",
-        #         in_point="0",
-        #         out_point="449",
-        #         pproTicksIn="0",
-        #         pproTicksOut="3805574572800",
-        #         file=file_obj,
-        #         sourcetrack_mediatype="video",
-        #         sourcetrack_trackindex=1,
-        #         label2="Iris",
-        #         alphatype="none",
-        #         filters=[
-        #             Filter(
-        #                 name="Basic Motion",
-        #                 effectid="basic",
-        #                 effectcategory="motion",
-        #                 effecttype="motion",
-        #                 mediatype="video",
-        #                 pproBypass="false",
-        #                 parameters=[
-        #                     Parameter(parameterid="scale", name="Scale", valuemin="0", valuemax="1000", value="66.6667"),
-        #                     Parameter(parameterid="rotation", name="Rotation", valuemin="-8640", valuemax="8640", value="0"),
-        #                     Parameter(parameterid="center", name="Center", value=None),  # Will handle separately
-        #                     Parameter(parameterid="centerOffset", name="Anchor Point", value=None),
-        #                     Parameter(parameterid="antiflicker", name="Anti-flicker Filter", valuemin="0.0", valuemax="1.0", value="0")
-        #                 ]
-        #             )
-        #         ]
-        #     )
-        #     logger.info(f"Created ClipItem for video: {video_file.name}")
-
-        #     # Add the clipitem to the video track
-        #     vtrack.add_clipitem(clipitem)
-        #     logger.info(f"Added ClipItem to video track: {clipitem_id}")
-
-        # # Similarly, handle image files in footage directory
-        # image_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff']
-        # image_files = list(footage_dir.glob('*'))
-        # image_files = [f for f in image_files if f.suffix.lower() in image_extensions]
-
-        # if not image_files:
-        #     logger.warning(f"No image files found in 'footage' directory: {footage_dir}")
-
-
-        # for image_file in image_files:
-        #     file_id = IDGenerator.generate_id("file")
-        #     clipitem_id = IDGenerator.generate_id("clipitem")
-
-        #     width, height = get_video_dimensions(image_file)
-        #     # Create File object for each image
-        #     file_obj = File(
-        #         id=file_id,
-        #         name=image_file.name,
-        #         pathurl=f"file://localhost/{image_file.as_posix()}",
-        #         samplerate=48000,
-        #         channelcount=2,
-        #         mediatype="video",  # Images are treated as video media in editing software
-        #         width=width,
-        #         height=height
-        #     )
-        #     logger.info(f"Created File object for image: {image_file.name}")
-
-        #     try:
-        #         probe = ffmpeg.probe(str(video_file))
-        #         video_stream = next(
-        #             (stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None
-        #         )
-        #         duration = int(float(probe['format']['duration']))
-        #         logger.debug(f"Extracted duration for video {video_file.name}: {duration} seconds")
-        #     except Exception as e:
-        #         logger.error(f"Failed to extract duration for video: {video_file.name}. Setting default duration.")
-        #         duration = 4526  # Default duration if extraction fails
-
-
-        #     # Create ClipItem for each image
-        #     clipitem = ClipItem(
-        #         id=clipitem_id,
-        #         premiereChannelType="stereo",
-        #         masterclipid=f"masterclip-{file_id}",
-        #         name=image_file.name,
-        #         enabled="TRUE",
-        #         duration=duration,  # Optionally, set based on project requirements
-        #         rate_timebase="30",
-        #         rate_ntsc="TRUE",
-        #         start="449",
-        #         end="598",
-        #         in_point="107892",
-        #         out_point="108041",
-        #         pproTicksIn="914456685542400",
-        #         pproTicksOut="915719559955200",
-        #         file=file_obj,
-        #         sourcetrack_mediatype="video",
-        #         sourcetrack_trackindex=1,
-        #         label2="Lavender",
-        #         alphatype="straight",
-        #         filters=[
-        #             Filter(
-        #                 name="Basic Motion",
-        #                 effectid="basic",
-        #                 effectcategory="motion",
-        #                 effecttype="motion",
-        #                 mediatype="video",
-        #                 pproBypass="false",
-        #                 parameters=[
-        #                     Parameter(parameterid="scale", name="Scale", valuemin="0", valuemax="1000", value="140.625"),
-        #                     Parameter(parameterid="rotation", name="Rotation", valuemin="-8640", valuemax="8640", value="0"),
-        #                     Parameter(parameterid="center", name="Center", value=None),
-        #                     Parameter(parameterid="centerOffset", name="Anchor Point", value=None),
-        #                     Parameter(parameterid="antiflicker", name="Anti-flicker Filter", valuemin="0.0", valuemax="1.0", value="0")
-        #                 ]
-        #             )
-        #         ]
-        #     )
-        #     logger.info(f"Created ClipItem for image: {image_file.name}")
-
-        #     # Add the clipitem to the video track
-        #     vtrack.add_clipitem(clipitem)
-        #     logger.info(f"Added ClipItem to video track: {clipitem_id}")
-
-        # # Add the video track to the video section
-        # video.add_track(vtrack)
-        # logger.info("Added video track to video media.")
-
-        # # Add video to the sequence
-        # sequence.add_video(video)
-        # logger.info("Added video media to sequence.")
-
-        # ---------------- SCRIPT SECTION ----------------
-        # Process the script.docx file as needed
-        # For example, extract text or integrate with voiceover timings
-        # This part depends on your specific requirements
-        # Here's a placeholder for handling the script
-        # script_content = process_script(script_file, logger)
-
-        # You might want to integrate script_content into the project metadata or elsewhere
-        # For now, it's just extracted and logged
-        logger.info("Processed script content.")
-
-        # Serialize and Save XML
-        project.save_to_file(args.output)
-        logger.info(f"Project XML generated and saved successfully at {args.output}")
+    Returns:
+        list: One result dict per project, in the order given, with its status
+        ("ok" or "failed"), output path, error, and timings in seconds.
+    """
+    cache_path = shared_probe_cache_path(args)
+    if cache_path is not None and args.prune_probe_cache:
+        cache = ProbeCache(cache_path)
+        cache.prune()
+        cache.close()
+
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(project_dirs)))
+    logger.info("Generating %s projects with %s worker processes.", len(project_dirs), jobs)
+    results = {}
+    suspects = []
+    pending = list(project_dirs)
+    while pending:
+        in_flight, pending = _run_pool(pending, args, min(jobs, len(pending)), cache_path, results,
+                                       len(project_dirs))
+        if in_flight or pending:
+            logger.warning("A worker process died; resubmitting %s unfinished projects to a new pool.",
+                           len(in_flight) + len(pending))
+        if not in_flight:
+            # The pool broke before any project started; retry every one on its own
+            in_flight, pending = pending, []
+        suspects.extend(in_flight)
+    for project_dir in suspects:
+        in_flight, _ = _run_pool([project_dir], args, 1, cache_path, results, len(project_dirs))
+        if in_flight or project_dir not in results:
+            results[project_dir] = {"project": str(project_dir), "status": "failed", "output": None,
+                                    "error": "BrokenProcessPool: the worker process generating it died",
+                                    "seconds": None, "timings": {}}
+            logger.info("[%s/%s] %s: %s", len(results), len(project_dirs), project_dir.name, "failed")
+    return [results[project_dir] for project_dir in project_dirs]
+
+def write_summary(results, summary_path):
+    """
+    Writes the batch results as JSON, to stdout when summary_path is "-".
+    """
+    summary = {
+        "succeeded": sum(result["status"] == "ok" for result in results),
+        "failed": sum(result["status"] != "ok" for result in results),
+        "projects": results,
+    }
+    text = json.dumps(summary, indent=2)
+    if summary_path == "-":
+        print(text)
+    else:
+        Path(summary_path).write_text(text + "\n", encoding="utf-8")
+        logger.info("Batch summary written to %s", summary_path)
+
+def write_profiles(results, profile_path):
+    """
+    Moves the profiles out of the batch results into one JSON file keyed by
+    project, written to stdout when profile_path is "-".
+    """
+    profiles = {result["project"]: result.pop("profile", None) for result in results}
+    text = json.dumps(profiles, indent=2)
+    if profile_path == "-":
+        print(text)
+    else:
+        Path(profile_path).write_text(text + "\n", encoding="utf-8")
+        logger.info("Profiles written to %s", profile_path)
+
+def generate_profiled(project_dir, args, probe_cache=None, settings=None):
+    """
+    Generates a project into args.output, writing a StageProfiler report to
+    args.profile afterwards when --profile is given.
+    """
+    profiler = StageProfiler() if args.profile else None
+    with profiler or nullcontext():
+        generate_project(project_dir, args.output, args, probe_cache, settings=settings, profiler=profiler)
+    if profiler is not None:
+        profiler.write(args.profile)
+        logger.info("Profile written to %s", args.profile)
+
+def main():
+    args = parse_arguments()
+    # Command line options first, then [Logging] from the same snapshot the projects are built with
+    configure_logging(level=args.log_level, formatter=args.log_format, queue=args.log_queue,
+                      settings=project_settings(args))
+    project_dirs = expand_project_paths(args.project_path)
+    if not project_dirs:
+        logger.error("No project directories to generate.")
+        sys.exit(1)
+
+    if args.batch or len(project_dirs) > 1:
+        if args.watch:
+            logger.error("--watch regenerates a single project and cannot be combined with batch mode.")
+            sys.exit(1)
+        if Path(args.output).is_absolute():
+            logger.error("In batch mode --output must be a file name relative to each project directory.")
+            sys.exit(1)
+        results = run_batch(project_dirs, args)
+        if args.profile:
+            write_profiles(results, args.profile)
+        write_summary(results, args.summary)
+        failed = [result["project"] for result in results if result["status"] != "ok"]
+        if failed:
+            logger.error("%s of %s projects failed: %s", len(failed), len(results), ', '.join(failed))
+            sys.exit(1)
+        logger.info("Batch generation completed successfully.")
+        return
+
+    project_dir = project_dirs[0]
+    if args.watch:
+        try:
+            watch_project(project_dir, args)
+        except Exception as e:
+            logger.error("An error occurred: %s", e)
+            sys.exit(1)
+        return
+
+    try:
+        settings = project_settings(args, project_dir)
+        probe_cache = open_probe_cache(args, project_dir, settings)
+        try:
+            generate_profiled(project_dir, args, probe_cache, settings)
+        finally:
+            if probe_cache is not None:
+                probe_cache.close()
 
     except Exception as e:
-        logger.error(f"An error occurred: {e}")
+        logger.error("An error occurred: %s", e)
         sys.exit(1)
 
     logger.info("Video project generation completed successfully.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -13,6 +13,10 @@ setup(
     install_requires=[
         "lxml"
     ],
+    extras_require={
+        "columnar": ["numpy"],
+        "analysis": ["numpy"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,40 @@
+import importlib
+
+# Submodules are imported on first use of one of their names (PEP 562), so
+# importing the package does not import NumPy
+_EXPORTS = {
+    "AudioAnalysis": "analyzer",
+    "analyze_audio": "analyzer",
+    "find_silences": "analyzer",
+    "PCMSource": "sources",
+    "ArraySource": "sources",
+    "WavSource": "sources",
+    "FFmpegSource": "sources",
+    "SOURCE_TYPES": "sources",
+    "open_source": "sources",
+}
+
+__all__ = [
+    "AudioAnalysis",
+    "analyze_audio",
+    "find_silences",
+    "PCMSource",
+    "ArraySource",
+    "WavSource",
+    "FFmpegSource",
+    "SOURCE_TYPES",
+    "open_source",
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,209 @@
+import struct
+from pathlib import Path
+
+import numpy as np
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class PCMSource:
+    """
+    Base class of the decoded audio handed to analyze_audio().
+
+    A source has a samplerate and a channel count and yields its samples in
+    order as float32 arrays of shape (frames, channels) scaled to [-1, 1].
+    Any decoder can be plugged in by subclassing it and implementing chunks(),
+    and registered for a file suffix in SOURCE_TYPES.
+    """
+    samplerate = None
+    channels = None
+
+    def chunks(self, frames):
+        """
+        Yields the samples in chunks of at most the given number of frames.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArraySource(PCMSource):
+    """
+    Samples already in memory, e.g. from another decoder.
+    """
+
+    def __init__(self, samples, samplerate):
+        """
+        Args:
+            samples (array-like): Shape (frames,) for mono or (frames, channels).
+            samplerate (int): Frames per second.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        self.samples = samples.reshape(-1, 1) if samples.ndim == 1 else samples
+        self.samplerate = samplerate
+        self.channels = self.samples.shape[1]
+
+    def chunks(self, frames):
+        for start in range(0, len(self.samples), frames):
+            yield self.samples[start:start + frames]
+
+
+class WavSource(PCMSource):
+    """
+    A PCM or float WAV file, memory-mapped so only the chunk being converted
+    is ever read into memory.
+    """
+
+    def __init__(self, path):
+        """
+        Raises:
+            ValueError: If the file is not a WAV file with 8, 16, 24 or 32 bit
+                integer or 32 or 64 bit float samples.
+        """
+        self.path = Path(path)
+        self._format = None
+        with open(self.path, 'rb') as file:
+            header = file.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+                raise ValueError(f"Not a WAV file: {self.path.name}")
+            while True:
+                chunk = file.read(8)
+                if len(chunk) < 8:
+                    raise ValueError(f"WAV file without a data chunk: {self.path.name}")
+                chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+                if chunk_id == b'fmt ':
+                    fmt = file.read(chunk_size)
+                    tag, self.channels, self.samplerate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+                    if tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                        tag = struct.unpack('<H', fmt[24:26])[0]  # First two bytes of the subformat GUID
+                    self._format = (tag, bits, block_align)
+                    file.seek(chunk_size & 1, 1)
+                elif chunk_id == b'data':
+                    if self._format is None:
+                        raise ValueError(f"WAV file without a format chunk: {self.path.name}")
+                    self._offset = file.tell()
+                    # A size larger than the file means the recording was not finalized
+                    available = self.path.stat().st_size - self._offset
+                    self._size = min(chunk_size, available) if chunk_size else available
+                    break
+                else:
+                    file.seek(chunk_size + (chunk_size & 1), 1)
+
+        tag, bits, block_align = self._format
+        width = bits // 8
+        if block_align != width * self.channels:
+            raise ValueError(f"Unsupported WAV sample layout in {self.path.name}")
+        if tag == _WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+            dtype, self._scale = np.dtype(f'<f{width}'), 1.0
+        elif tag == _WAVE_FORMAT_PCM and bits in (8, 16, 32):
+            dtype, self._scale = (np.dtype('u1') if bits == 8 else np.dtype(f'<i{width}')), 2.0 ** (bits - 1)
+        elif tag == _WAVE_FORMAT_PCM and bits == 24:
+            dtype, self._scale = np.dtype('u1'), 2.0 ** 23
+        else:
+            raise ValueError(f"Unsupported WAV format {tag} with {bits} bit samples in {self.path.name}")
+        self.frames = self._size // block_align
+        self._bits = bits
+        self._data = None
+        if self.frames:
+            columns = self.channels * (3 if bits == 24 else 1)
+            self._data = np.memmap(self.path, dtype=dtype, mode='r', offset=self._offset,
+                                   shape=(self.frames, columns))
+
+    def chunks(self, frames):
+        if self._data is None:
+            return
+        for start in range(0, self.frames, frames):
+            raw = self._data[start:start + frames]
+            if self._bits == 24:
+                raw = raw.reshape(len(raw), self.channels, 3)
+                raw = (raw[..., 0].astype(np.int32) | (raw[..., 1].astype(np.int32) << 8)
+                       | (raw[..., 2].astype(np.int8).astype(np.int32) << 16))
+            elif self._bits == 8:
+                raw = raw.astype(np.int16) - 128  # 8 bit WAV is unsigned
+            chunk = raw.astype(np.float32)
+            if self._scale != 1.0:
+                chunk *= np.float32(1.0 / self._scale)
+            yield chunk
+
+    def close(self):
+        self._data = None
+
+
+class FFmpegSource(PCMSource):
+    """
+    Any file ffmpeg can decode, read as 32 bit float PCM from an ffmpeg pipe.
+    """
+
+    def __init__(self, path, samplerate=None, channels=None):
+        """
+        Args:
+            path (str or Path): The file.
+            samplerate (int, optional): Resample to this rate; probed when not given.
+            channels (int, optional): Mix to this many channels; probed when not given.
+        """
+        self.path = Path(path)
+        if samplerate is None or channels is None:
+            from xml_video_project_lib.probe import fast_probe
+
+            info = fast_probe(self.path)
+            samplerate = samplerate or info.samplerate
+            channels = channels or info.channels
+        if not samplerate or not channels:
+            raise ValueError(f"No audio stream found in {self.path.name}")
+        self.samplerate = samplerate
+        self.channels = channels
+        self._process = None
+
+    def chunks(self, frames):
+        import ffmpeg
+
+        self._process = (
+            ffmpeg.input(str(self.path))
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ac=self.channels, ar=self.samplerate)
+            .global_args('-loglevel', 'error', '-nostdin')
+            .run_async(pipe_stdout=True)
+        )
+        frame_bytes = 4 * self.channels
+        try:
+            while True:
+                data = self._process.stdout.read(frames * frame_bytes)
+                if not data:
+                    break
+                usable = len(data) - len(data) % frame_bytes
+                yield np.frombuffer(data[:usable], dtype='<f4').reshape(-1, self.channels)
+            if self._process.wait() != 0:
+                raise ffmpeg.Error('ffmpeg', None, None)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.stdout.close()
+            self._process.wait()
+            self._process = None
+
+
+# File suffix -> source type; every other file goes through FFmpegSource
+SOURCE_TYPES = {
+    '.wav': WavSource,
+    '.wave': WavSource,
+}
+
+
+def open_source(path) -> PCMSource:
+    """
+    Opens an audio file with the source registered for its suffix, or ffmpeg.
+    """
+    path = Path(path)
+    return SOURCE_TYPES.get(path.suffix.lower(), FFmpegSource)(path)
@@ -1,3 +1,12 @@
 from .config import config
 
-__all__ = ['config']
\ No newline at end of file
+
+def __getattr__(name):
+    # The snapshot module imports configparser, so it is only loaded when used
+    if name in ("ConfigSnapshot", "load_config", "DEFAULTS"):
+        from . import snapshot
+        return getattr(snapshot, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['config', 'ConfigSnapshot', 'load_config']
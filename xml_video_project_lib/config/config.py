@@ -1,27 +1,42 @@
-import configparser
 from pathlib import Path
 
 class Config:
     """
     Singleton class to handle configuration parameters.
+
+    The configuration file is read on first use rather than when the package is
+    imported, so short runs that never look at it pay nothing for it.
     """
     _instance = None
     _config = None
+    _config_file = None
 
     def __new__(cls, config_file='../config.ini'):
         if cls._instance is None:
             cls._instance = super(Config, cls).__new__(cls)
-            cls._config = configparser.ConfigParser()
-            cls._load_config(config_file)
+            cls._config_file = config_file
         return cls._instance
 
+    @classmethod
+    def snapshot(cls):
+        """
+        Returns the compiled ConfigSnapshot of the defaults and the global
+        config.ini, parsed once per process. Pass it, or a project's layered
+        snapshot from load_config(), to models that take a ``settings`` argument.
+        """
+        if cls._config is None:
+            cls._load_config(cls._config_file)
+        return cls._config
+
     @classmethod
     def _load_config(cls, config_file):
         config_path = Path(__file__).parent.parent / config_file
         if not config_path.exists():
             raise FileNotFoundError(f"Configuration file '{config_path}' not found.")
 
-        cls._config.read(config_path)
+        from xml_video_project_lib.config.snapshot import DEFAULTS, ConfigSnapshot
+
+        cls._config = ConfigSnapshot(DEFAULTS).layered(ConfigSnapshot.from_file(config_path))
 
     def get(self, section, option, fallback=None, type_cast=str):
         """
@@ -36,29 +51,13 @@ class Config:
         Returns:
             The configuration value cast to the specified type.
         """
-        try:
-            if type_cast == bool:
-                return self._config.getboolean(section, option, fallback=fallback)
-            elif type_cast == int:
-                return self._config.getint(section, option, fallback=fallback)
-            elif type_cast == float:
-                return self._config.getfloat(section, option, fallback=fallback)
-            else:
-                return self._config.get(section, option, fallback=fallback)
-        except (configparser.NoSectionError, configparser.NoOptionError) as e:
-            if fallback is not None:
-                return fallback
-            else:
-                raise e
-            
+        return self.snapshot().get(section, option, fallback, type_cast)
+
     def get_all(self, section, fallback={}):
-        try:
-            return self._config[section]
-        except (configparser.NoSectionError) as e:
-            if fallback is not None:
-                return fallback
-            else:
-                raise e
+        """
+        Returns the options of a section as a read-only dict.
+        """
+        return self.snapshot().get_all(section, fallback)
 
 # Instantiate the Config singleton
 config = Config()
\ No newline at end of file
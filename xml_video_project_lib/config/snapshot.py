@@ -0,0 +1,167 @@
+import configparser
+from pathlib import Path
+from types import MappingProxyType
+
+# Lowest layer: values the code falls back to when no config.ini sets them
+DEFAULTS = {
+    'Sequence Rate': {'rate_timebase': '30', 'rate_ntsc': 'TRUE'},
+    'Video': {'name': 'Apple ProRes 422', 'width': '1280', 'height': '720'},
+    'Audio': {'numoutputchannels': '2', 'depth': '16', 'samplerate': '48000'},
+    'Probe': {'max_workers': '0', 'cache_file': '.probe_cache.sqlite3'},
+    'Layout': {'still_hold_seconds': '5', 'seed': '', 'video_tracks': '1'},
+    'IDs': {'reproducible': 'FALSE'},
+    'Audio Analysis': {
+        'enabled': 'FALSE', 'window_seconds': '0.05', 'silence_threshold_db': '-45',
+        'min_silence_seconds': '0.4', 'target_loudness': '-16', 'cut_on_pauses': 'TRUE',
+    },
+}
+
+_MISSING = object()
+
+
+class ConfigSnapshot:
+    """
+    An immutable, compiled view of the configuration.
+
+    Sections are plain read-only dicts of already interpolated strings, so
+    models can share them (e.g. as XML attributes) without going back to
+    configparser. Typed lookups are converted once and remembered. Snapshots
+    are layered with layered(): defaults, the global config.ini, a project's
+    own config.ini and explicit overrides each produce a new snapshot, and
+    processes that build many projects reuse the layers they have in common.
+    """
+    __slots__ = ('_sections', '_typed')
+
+    def __init__(self, sections=None):
+        """
+        Args:
+            sections (dict, optional): Maps section names to {option: value} dicts.
+        """
+        self._sections = MappingProxyType({
+            name: MappingProxyType(dict(options)) for name, options in (sections or {}).items()
+        })
+        self._typed = {}  # (section, option, type) -> converted value
+
+    @classmethod
+    def from_file(cls, path) -> 'ConfigSnapshot':
+        """
+        Reads an INI file the way Config does: option names are lower-cased and
+        %(name)s references are interpolated.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        parser = configparser.ConfigParser()
+        if not parser.read(path):
+            raise FileNotFoundError(f"Configuration file '{path}' not found.")
+        return cls({name: dict(parser[name]) for name in parser.sections()})
+
+    def layered(self, layer) -> 'ConfigSnapshot':
+        """
+        Returns a new snapshot with the options of layer on top of these.
+
+        Args:
+            layer (ConfigSnapshot or dict): Options that win, e.g. {'Layout': {'seed': 7}}.
+                Values of a dict are converted to strings and option names lower-cased,
+                matching what is read from a file.
+        """
+        if isinstance(layer, ConfigSnapshot):
+            layer = layer._sections
+        else:
+            layer = {
+                name: {option.lower(): str(value) for option, value in options.items()}
+                for name, options in layer.items()
+            }
+        sections = {name: dict(options) for name, options in self._sections.items()}
+        for name, options in layer.items():
+            sections.setdefault(name, {}).update(options)
+        return ConfigSnapshot(sections)
+
+    def sections(self) -> list:
+        return list(self._sections)
+
+    def section(self, section, fallback=_MISSING):
+        """
+        Returns the options of a section as a read-only dict, shared by every caller.
+
+        Raises:
+            configparser.NoSectionError: If the section is missing and no fallback is given.
+        """
+        options = self._sections.get(section)
+        if options is None:
+            if fallback is _MISSING:
+                raise configparser.NoSectionError(section)
+            return fallback
+        return options
+
+    def get_all(self, section, fallback={}):
+        """
+        Same as section(), with the fallback behaviour of Config.get_all().
+        """
+        return self.section(section, MappingProxyType(fallback) if fallback is not None else _MISSING)
+
+    def get(self, section, option, fallback=None, type_cast=str):
+        """
+        Retrieves a configuration value, converted to type_cast once and then
+        served from memory. Accepts the same arguments as Config.get().
+
+        Args:
+            section (str): The section in the config file.
+            option (str): The option/key within the section.
+            fallback: The value to return if the option is not found.
+            type_cast (type): str, int, float or bool.
+
+        Raises:
+            ValueError: If the value cannot be converted.
+        """
+        key = (section, option, type_cast)
+        value = self._typed.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        options = self._sections.get(section)
+        text = None if options is None else options.get(option.lower())
+        if text is None:
+            return fallback
+
+        if type_cast == bool:
+            state = configparser.ConfigParser.BOOLEAN_STATES.get(text.lower())
+            if state is None:
+                raise ValueError(f"Not a boolean: {text}")
+            value = state
+        elif type_cast in (int, float):
+            value = type_cast(text)
+        else:
+            value = text
+        self._typed[key] = value
+        return value
+
+
+def load_config(project_dir=None, overrides=None, base=None) -> ConfigSnapshot:
+    """
+    Builds the configuration for one project.
+
+    Layers, lowest first: DEFAULTS and the global config.ini (the snapshot
+    behind the shared config object, parsed once per process), the project's
+    own config.ini if it has one, then explicit overrides.
+
+    Args:
+        project_dir (str or Path, optional): Directory that may hold a config.ini.
+        overrides (dict, optional): {section: {option: value}} applied last.
+        base (ConfigSnapshot, optional): Replaces the global layers.
+
+    Returns:
+        ConfigSnapshot: The snapshot itself when there is nothing to add.
+    """
+    if base is None:
+        from xml_video_project_lib.config.config import config
+
+        base = config.snapshot()
+    snapshot = base
+    if project_dir is not None:
+        project_file = Path(project_dir) / 'config.ini'
+        if project_file.is_file():
+            snapshot = snapshot.layered(ConfigSnapshot.from_file(project_file))
+    if overrides:
+        snapshot = snapshot.layered(overrides)
+    return snapshot
@@ -0,0 +1,10 @@
+from .timeline import FootageAsset, Placement, TimelineLayout, layout_footage, VIDEO, STILL
+
+__all__ = [
+    "FootageAsset",
+    "Placement",
+    "TimelineLayout",
+    "layout_footage",
+    "VIDEO",
+    "STILL",
+]
@@ -0,0 +1,146 @@
+import bisect
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from xml_video_project_lib.logging import logger
+from xml_video_project_lib.utils.rational_time import seconds_to_frames
+
+VIDEO = "video"
+STILL = "still"
+
+
+@dataclass(frozen=True)
+class FootageAsset:
+    """
+    One item of the footage pool: a video with a known length, or a still image.
+    """
+    path: Path
+    kind: str                     # VIDEO or STILL
+    frames: Optional[int] = None  # Length of a video at the sequence rate; None for stills
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    @classmethod
+    def from_media_info(cls, path, media_info, rate_timebase, rate_ntsc) -> Optional['FootageAsset']:
+        """
+        Classifies a probed file. Files with a picture and a duration are videos,
+        files with a picture and no duration are stills.
+
+        Returns:
+            FootageAsset or None: None for files without a picture (or unprobed ones).
+        """
+        if media_info is None or not media_info.has_video:
+            return None
+        if media_info.duration:
+            frames = seconds_to_frames(media_info.duration, rate_timebase, rate_ntsc)
+            if frames < 1:
+                return None
+            return cls(Path(path), VIDEO, frames, media_info.width, media_info.height)
+        return cls(Path(path), STILL, None, media_info.width, media_info.height)
+
+
+@dataclass(frozen=True)
+class Placement:
+    """
+    Where one use of an asset lands on the timeline, in frames at the sequence rate.
+    """
+    asset: FootageAsset
+    track: int       # 0-based video track index
+    start: int
+    end: int
+    in_point: int
+    out_point: int
+
+    @property
+    def frames(self) -> int:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class TimelineLayout:
+    """
+    The result of layout_footage().
+    """
+    placements: tuple
+    duration: int    # Sequence duration in frames
+    tracks: int      # Number of video tracks used
+
+
+def layout_footage(assets, total_frames=None, still_frames=150, seed=None, tracks=1, cut_points=None) -> TimelineLayout:
+    """
+    Places footage back to back so that it covers total_frames exactly.
+
+    Videos play from their first frame for their full length and stills are held
+    for still_frames. The clip that crosses the end is trimmed to it. When the pool
+    is used up before the end, it is played again in a new order from the same
+    random generator, so the result only depends on the pool and the seed. Clips
+    alternate between the given number of video tracks.
+
+    With cut_points, e.g. the pauses in the voiceover, a clip that reaches past
+    a cut point in its second half is ended at the last such cut point, so the
+    picture changes between sentences rather than in the middle of one.
+
+    Runs in O(n log n) for n assets plus O(1) per placed clip.
+
+    Args:
+        assets (iterable of FootageAsset): The footage pool.
+        total_frames (int, optional): Length to cover, e.g. the voiceover duration.
+            None lays out every asset once.
+        still_frames (int): How long each still is held.
+        seed (int, optional): Seed for the order of the pool; None keeps path order.
+        tracks (int): Number of video tracks to alternate between.
+        cut_points (iterable of int, optional): Frames where a cut is preferred.
+
+    Returns:
+        TimelineLayout: The placements and the resulting sequence duration.
+
+    Raises:
+        ValueError: If still_frames or tracks is not positive.
+    """
+    if still_frames < 1:
+        raise ValueError(f"Stills must be held for at least one frame, got {still_frames}")
+    if tracks < 1:
+        raise ValueError(f"Layout needs at least one video track, got {tracks}")
+
+    # Sorting first makes the order independent of how the directory was listed
+    pool = sorted(assets, key=lambda asset: asset.path.as_posix())
+    if not pool or total_frames == 0:
+        return TimelineLayout((), total_frames or 0, 0)
+    rng = random.Random(seed)
+    cuts = sorted(set(cut_points or ()))
+
+    def shuffled():
+        order = list(pool)
+        if seed is not None:
+            rng.shuffle(order)
+        return order
+
+    placements = []
+    position = 0
+    order = shuffled()
+    index = 0
+    while True:
+        if index == len(order):
+            if total_frames is None:
+                break
+            order = shuffled()
+            index = 0
+        asset = order[index]
+        index += 1
+
+        length = asset.frames if asset.kind == VIDEO else still_frames
+        if total_frames is not None:
+            length = min(length, total_frames - position)
+        if cuts:
+            # Last cut point inside the clip, if it leaves at least half of the clip
+            cut = bisect.bisect_left(cuts, position + length) - 1
+            if cut >= 0 and 2 * (cuts[cut] - position) >= length:
+                length = cuts[cut] - position
+        placements.append(Placement(asset, len(placements) % tracks, position, position + length, 0, length))
+        position += length
+        if position == total_frames:
+            break
+
+    logger.debug("Laid out %s clips from %s assets over %s frames", len(placements), len(pool), position)
+    return TimelineLayout(tuple(placements), position, min(tracks, len(placements)))
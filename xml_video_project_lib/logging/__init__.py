@@ -1,3 +1,23 @@
-from .logger import logger
+import importlib
 
-__all__ = ['logger']
\ No newline at end of file
+from .logger import logger, configure_logging, flush_logging, EventCounts
+
+# Imports the logging module, so only loaded on first use (PEP 562)
+_EXPORTS = {
+    'JSONFormatter': 'json_formatter',
+}
+
+__all__ = ['logger', 'configure_logging', 'flush_logging', 'EventCounts', 'JSONFormatter']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -1,8 +1,8 @@
-import logging
 import sys
-from pathlib import Path
 from xml_video_project_lib.config import config  # Import the config instance
 
+_DEBUG = 10  # logging.DEBUG, without importing logging
+
 class SingletonMeta(type):
     """
     A thread-safe implementation of Singleton.
@@ -18,33 +18,130 @@ class SingletonMeta(type):
 class Logger(metaclass=SingletonMeta):
     """
     Singleton Logger class to handle logging across the library.
+
+    Records are written to stdout as text, or as one JSON object per line with
+    formatter=json. With queue=true the calling thread only puts the record on
+    a queue; a background thread formats and writes it, so slow terminals and
+    pipes do not hold up the work being logged. Both are set in the [Logging]
+    section of config.ini or with configure().
     """
+    _exit_hooks = False  # Whether the atexit and fork hooks are registered
+
     def __init__(self):
+        import logging
+
         self.logger = logging.getLogger("xml_video_project_lib")
+        self._listener = None
+        self._options = None
+        self._settings = None  # The ConfigSnapshot given to configure(), if any
         if not self.logger.handlers:
             self._configure_logger()
 
-    def _configure_logger(self):
+    def _configure_logger(self, level=None, formatter=None, queue=None, settings=None):
         """
         Configures the logger with handlers and formatters.
+
+        Args:
+            level (str, optional): Level name, e.g. 'DEBUG'. Defaults to the settings.
+            formatter (str, optional): 'text' or 'json'. Defaults to the settings.
+            queue (bool, optional): Format and write records on a background thread.
+                Defaults to the settings.
+            settings (ConfigSnapshot, optional): The [Logging] options not given;
+                the global config.ini by default.
         """
+        import logging
+
+        settings = settings or config
+        if level is None:
+            level = settings.get('Logging', 'level', fallback='INFO')
+        if formatter is None:
+            formatter = settings.get('Logging', 'formatter', fallback='text')
+        if queue is None:
+            queue = settings.get('Logging', 'queue', fallback=False, type_cast=bool)
+        self._options = (level, formatter, queue)
+
         # Set the default logging level
-        log_level = config.get('Logging', 'level', fallback='INFO').upper()
-        self.logger.setLevel(getattr(logging, log_level, logging.INFO))
+        log_level = getattr(logging, level.upper(), logging.INFO)
+        self.logger.setLevel(log_level)
 
         # Create console handler
         ch = logging.StreamHandler(sys.stdout)
-        ch.setLevel(getattr(logging, log_level, logging.INFO))
+        ch.setLevel(log_level)
 
         # Create formatter
-        log_format = config.get('Logging', 'format', fallback='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        formatter = logging.Formatter(log_format)
+        if formatter.lower() == 'json':
+            from xml_video_project_lib.logging.json_formatter import JSONFormatter
 
-        # Add formatter to handlers
-        ch.setFormatter(formatter)
+            ch.setFormatter(JSONFormatter())
+        else:
+            log_format = settings.get('Logging', 'format', fallback='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            ch.setFormatter(logging.Formatter(log_format))
 
         # Add handlers to the logger
-        self.logger.addHandler(ch)
+        if queue:
+            self._start_queue(ch)
+        else:
+            self.logger.addHandler(ch)
+
+    def _start_queue(self, handler):
+        import atexit
+        import logging.handlers
+        import os
+        import queue
+
+        records = queue.SimpleQueue()
+        self.logger.addHandler(_queue_handler(records))
+        self._listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        self._listener.start()
+        if not Logger._exit_hooks:
+            atexit.register(Logger._flush_at_exit)
+            # A forked child inherits the queue but not the thread emptying it
+            os.register_at_fork(after_in_child=Logger._restart_in_child)
+            Logger._exit_hooks = True
+
+    def configure(self, level=None, formatter=None, queue=None, settings=None):
+        """
+        Replaces the handlers of the library logger, e.g. from command line options.
+        Options left as None keep their current value, or are read from the
+        [Logging] section of settings when a ConfigSnapshot is given.
+        """
+        if settings is not None:
+            self._settings = settings
+            current = (None, None, None)
+        else:
+            current = self._options or (None, None, None)
+        options = [current[i] if value is None else value for i, value in enumerate((level, formatter, queue))]
+        self._stop_listener()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        self._configure_logger(*options, settings=self._settings)
+
+    def flush(self):
+        """
+        Waits until every queued record has been written. Does nothing unless
+        queue mode is on.
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener.start()
+
+    def _stop_listener(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    @staticmethod
+    def _flush_at_exit():
+        instance = SingletonMeta._instances.get(Logger)
+        if instance is not None:
+            instance._stop_listener()
+
+    @staticmethod
+    def _restart_in_child():
+        instance = SingletonMeta._instances.get(Logger)
+        if instance is not None and instance._listener is not None:
+            instance._listener = None
+            instance.configure()
 
     def get_logger(self):
         """
@@ -52,6 +149,83 @@ class Logger(metaclass=SingletonMeta):
         """
         return self.logger
 
-# Instantiate the Logger singleton
-logger_instance = Logger()
-logger = logger_instance.get_logger()
\ No newline at end of file
+def _queue_handler(records):
+    """
+    Returns a QueueHandler that queues records as they are, so their message is
+    merged with its %-style arguments on the listener thread rather than by the
+    caller. The arguments must therefore not change after logging, which holds
+    for the strings and numbers the library logs.
+    """
+    import logging.handlers
+
+    class DeferredQueueHandler(logging.handlers.QueueHandler):
+        def prepare(self, record):
+            return record
+
+    return DeferredQueueHandler(records)
+
+class _DeferredLogger:
+    """
+    Stands in for the library logger until it is first used, so importing the
+    package neither imports the logging module nor reads config.ini.
+
+    Methods are looked up on the real logger once and then kept on the proxy,
+    so later calls cost the same as calling the logger directly.
+    """
+
+    def __getattr__(self, name):
+        value = getattr(Logger().get_logger(), name)
+        if callable(value):
+            setattr(self, name, value)
+        return value
+
+
+logger = _DeferredLogger()
+
+
+def configure_logging(level=None, formatter=None, queue=None, settings=None):
+    """
+    Reconfigures the library logger; see Logger.configure().
+
+    Args:
+        level (str, optional): Level name, e.g. 'DEBUG'.
+        formatter (str, optional): 'text' or 'json'.
+        queue (bool, optional): Format and write records on a background thread.
+        settings (ConfigSnapshot, optional): Read for the options not given.
+    """
+    Logger().configure(level, formatter, queue, settings)
+
+
+def flush_logging():
+    """
+    Waits until every queued log record has been written.
+    """
+    Logger().flush()
+
+
+class EventCounts:
+    """
+    Tallies events that happen once per element (a file created, a clip placed)
+    so that loops over thousands of elements log one summary line instead of a
+    line each. Each event is still logged on its own when DEBUG is enabled.
+    """
+    __slots__ = ('counts',)
+
+    def __init__(self):
+        self.counts = {}
+
+    def record(self, event, message=None, *args):
+        """
+        Counts one event.
+
+        Args:
+            event (str): What happened, in the plural, e.g. 'clips'.
+            message (str, optional): %-style message logged at DEBUG level.
+            *args: Arguments for message, only formatted when DEBUG is enabled.
+        """
+        self.counts[event] = self.counts.get(event, 0) + 1
+        if message is not None and logger.isEnabledFor(_DEBUG):
+            logger.debug(message, *args)
+
+    def __str__(self):
+        return ", ".join(f"{count} {event}" for event, count in self.counts.items()) or "nothing"
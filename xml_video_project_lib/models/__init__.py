@@ -1,15 +1,29 @@
+import importlib
+
 # # Expose core classes directly from the package
-from xml_video_project_lib.models.timecode import Timecode
-from xml_video_project_lib.models.file import File
-from xml_video_project_lib.models.clipitem import ClipItem
-from xml_video_project_lib.models.track import Track
-from xml_video_project_lib.models.audio import Audio
-from xml_video_project_lib.models.video import Video
-from xml_video_project_lib.models.media import Media
-from xml_video_project_lib.models.logging_info import LoggingInfo
-from xml_video_project_lib.models.project import Project
-from xml_video_project_lib.models.sequence import Sequence
-from xml_video_project_lib.models.additional import Filter, Parameter, Link
+# Each model module is imported on first use of one of its classes (PEP 562),
+# so importing the package, or a single model, does not load all of them.
+_EXPORTS = {
+    "Timecode": "timecode",
+    "File": "file",
+    "ClipItem": "clipitem",
+    "Track": "track",
+    "Audio": "audio",
+    "Video": "video",
+    "Media": "media",
+    "LoggingInfo": "logging_info",
+    "Project": "project",
+    "Sequence": "sequence",
+    "Filter": "additional",
+    "Parameter": "additional",
+    "Link": "additional",
+    "RawElement": "raw_element",
+    "ImportedProject": "imported_project",
+    "load_project": "imported_project",
+    # Needs NumPy, which is therefore only imported when ColumnarTrack is used
+    "ColumnarTrack": "columnar_track",
+    "ColumnarClipItem": "columnar_track",
+}
 
 # # Expose serializers
 # from .serializers.xml_serializer import XMLSerializer
@@ -40,5 +54,23 @@ __all__ = [
     "Timecode",
     "Filter",
     "Parameter",
-    "Link"
+    "Link",
+    "RawElement",
+    "ImportedProject",
+    "load_project",
+    # ColumnarTrack is importable by name but left out here, so that
+    # ``from xml_video_project_lib.models import *`` does not import NumPy
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -1,16 +1,29 @@
 from lxml import etree as ET
+from xml_video_project_lib.models.values import format_flag, to_flag, to_int
+from xml_video_project_lib.serializers.incremental import IncrementalElement
+from xml_video_project_lib.serializers.templates import TemplatedElement
+
+class Filter(IncrementalElement, TemplatedElement):
+    __slots__ = ('name', 'effectid', 'effectcategory', 'effecttype', 'mediatype', 'pproBypass', 'parameters')
+
+    CACHE_XML = True
+    TEMPLATE_FIELDS = ('name', 'effectid', 'effectcategory', 'effecttype', 'mediatype', 'pproBypass')
+    TEMPLATE_CHILDREN = ('parameters',)
 
-class Filter:
     def __init__(self, name, effectid, effectcategory, effecttype, mediatype, pproBypass, parameters):
         self.name = name
         self.effectid = effectid
         self.effectcategory = effectcategory
         self.effecttype = effecttype
         self.mediatype = mediatype
-        self.pproBypass = pproBypass
+        self.pproBypass = to_flag(pproBypass)
         self.parameters = parameters  # List of Parameter objects
 
-    def to_xml(self):
+    def template_values(self):
+        return (self.name, self.effectid, self.effectcategory, self.effecttype, self.mediatype,
+                format_flag(self.pproBypass, "true", "false"), self.parameters)
+
+    def to_xml(self, file_registry=None):
         filter_el = ET.Element('filter')
         effect_el = ET.SubElement(filter_el, 'effect')
         name_el = ET.SubElement(effect_el, 'name')
@@ -29,7 +42,7 @@ class Filter:
         mediatype_el.text = self.mediatype
 
         pproBypass_el = ET.SubElement(effect_el, 'pproBypass')
-        pproBypass_el.text = self.pproBypass
+        pproBypass_el.text = format_flag(self.pproBypass, "true", "false")
 
         for param in self.parameters:
             effect_el.append(param.to_xml())
@@ -37,7 +50,12 @@ class Filter:
         return filter_el
 
 
-class Parameter:
+class Parameter(IncrementalElement, TemplatedElement):
+    # valuemin/valuemax/value keep the caller's formatting ("0" and "66.6667" alike)
+    __slots__ = ('parameterid', 'name', 'valuemin', 'valuemax', 'value', 'authoringApp')
+
+    TEMPLATE_FIELDS = ('parameterid', 'name', 'valuemin', 'valuemax', 'value', 'authoringApp')
+
     def __init__(self, parameterid, name, valuemin=None, valuemax=None, value=None, authoringApp="PremierePro"):
         self.parameterid = parameterid
         self.name = name
@@ -46,7 +64,7 @@ class Parameter:
         self.value = value
         self.authoringApp = authoringApp
 
-    def to_xml(self):
+    def to_xml(self, file_registry=None):
         parameter_el = ET.Element('parameter', authoringApp=self.authoringApp)
         parameterid_el = ET.SubElement(parameter_el, 'parameterid')
         parameterid_el.text = self.parameterid
@@ -69,15 +87,19 @@ class Parameter:
         return parameter_el
 
 
-class Link:
+class Link(IncrementalElement, TemplatedElement):
+    __slots__ = ('linkclipref', 'mediatype', 'trackindex', 'clipindex', 'groupindex')
+
+    TEMPLATE_FIELDS = ('linkclipref', 'mediatype', 'trackindex', 'clipindex', 'groupindex')
+
     def __init__(self, linkclipref, mediatype, trackindex, clipindex, groupindex):
         self.linkclipref = linkclipref
         self.mediatype = mediatype
-        self.trackindex = trackindex
-        self.clipindex = clipindex
-        self.groupindex = groupindex
+        self.trackindex = to_int(trackindex)
+        self.clipindex = to_int(clipindex)
+        self.groupindex = to_int(groupindex)
 
-    def to_xml(self):
+    def to_xml(self, file_registry=None):
         link_el = ET.Element('link')
         linkclipref_el = ET.SubElement(link_el, 'linkclipref')
         linkclipref_el.text = self.linkclipref
@@ -1,14 +1,58 @@
 from lxml import etree as ET
+from xml_video_project_lib.config import config
 from xml_video_project_lib.models.base import XMElement
+from xml_video_project_lib.models.layout import append_children, arrange, iter_children, read_layout, write_children
+from xml_video_project_lib.serializers.incremental import IncrementalElement
 from xml_video_project_lib.models.track import Track
 
-class Audio(XMElement):
-    def __init__(self, numOutputChannels=2, depth=16, samplerate=48000):
+class Audio(IncrementalElement, XMElement):
+    def __init__(self, numOutputChannels=None, depth=None, samplerate=None, settings=None):
+        # Defaults come from the given ConfigSnapshot, or the global config.ini
+        settings = settings or config
+        if numOutputChannels is None:
+            numOutputChannels = settings.get('Audio', 'numoutputchannels', fallback=2, type_cast=int)
+        if depth is None:
+            depth = settings.get('Audio', 'depth', fallback=16, type_cast=int)
+        if samplerate is None:
+            samplerate = settings.get('Audio', 'samplerate', fallback=48000, type_cast=int)
         self.numOutputChannels = numOutputChannels
         self.depth = depth
         self.samplerate = samplerate
         self.outputs = []
         self.tracks = []
+        self.layout = None  # Child order of an audio block read from a document, see from_xml()
+        self.extra_elements = ()
+
+    @classmethod
+    def from_xml(cls, element, files=None, settings=None, raw=None):
+        """
+        Builds an Audio and its Tracks from a parsed <audio> element.
+
+        Only the tracks are modelled. numOutputChannels, the format, the outputs
+        and any other children are kept as RawElements and written back unchanged
+        in their original place, and the corresponding attributes are None or empty.
+
+        Args:
+            element (ET.Element): The <audio> element.
+            files (callable, optional): Resolves file references, see ClipItem.from_xml().
+            settings (ConfigSnapshot, optional): Passed on to the tracks.
+            raw (RawElement, optional): The same element read lazily, so the children
+                kept verbatim keep their original bytes.
+
+        Returns:
+            Audio: The materialized audio block.
+        """
+        audio = cls.__new__(cls)
+        audio.numOutputChannels = None
+        audio.depth = None
+        audio.samplerate = None
+        audio.outputs = []
+        audio.tracks = [
+            Track.from_xml(child, files, settings, source)
+            for child, source in iter_children(element, raw) if child.tag == 'track'
+        ]
+        audio.layout, audio.extra_elements = read_layout(element, lambda child: child.tag == 'track', raw)
+        return audio
 
     def add_output_group(self, index, numchannels, downmix, channel_index):
         self.outputs.append({
@@ -23,21 +67,52 @@ class Audio(XMElement):
     def add_track(self, track: Track):
         self.tracks.append(track)
 
-    def to_xml(self):
+    def _layout_children(self):
+        return arrange(self.layout, ('track',), {'track': self.tracks}, self.extra_elements)
+
+    def to_xml(self, file_registry=None):
         audio_el = ET.Element('audio')
+        if self.layout is not None:
+            append_children(audio_el, self._layout_children(), file_registry)
+            return audio_el
         numOutputChannels_el = ET.SubElement(audio_el, 'numOutputChannels')
         numOutputChannels_el.text = str(self.numOutputChannels)
 
         # format
-        format_el = ET.SubElement(audio_el, 'format')
+        audio_el.append(self._format_to_xml())
+
+        # outputs
+        audio_el.append(self._outputs_to_xml())
+
+        # tracks
+        for track in self.tracks:
+            audio_el.append(track.to_xml(file_registry))
+
+        return audio_el
+
+    def write_xml(self, writer):
+        if self.layout is not None:
+            write_children(writer, 'audio', None, self._layout_children())
+            return
+        writer.start('audio')
+        writer.leaf('numOutputChannels', self.numOutputChannels)
+        writer.element(self._format_to_xml())
+        writer.element(self._outputs_to_xml())
+        for track in self.tracks:
+            track.write_xml(writer)
+        writer.end()
+
+    def _format_to_xml(self):
+        format_el = ET.Element('format')
         sample_characteristics = ET.SubElement(format_el, 'samplecharacteristics')
         depth_el = ET.SubElement(sample_characteristics, 'depth')
         depth_el.text = str(self.depth)
         samplerate_el = ET.SubElement(sample_characteristics, 'samplerate')
         samplerate_el.text = str(self.samplerate)
+        return format_el
 
-        # outputs
-        outputs_el = ET.SubElement(audio_el, 'outputs')
+    def _outputs_to_xml(self):
+        outputs_el = ET.Element('outputs')
         for group in self.outputs:
             group_el = ET.SubElement(outputs_el, 'group')
             index_el = ET.SubElement(group_el, 'index')
@@ -49,9 +124,4 @@ class Audio(XMElement):
             channel_el = ET.SubElement(group_el, 'channel')
             channel_index_el = ET.SubElement(channel_el, 'index')
             channel_index_el.text = group['channel']['index']
-
-        # tracks
-        for track in self.tracks:
-            audio_el.append(track.to_xml())
-
-        return audio_el
\ No newline at end of file
+        return outputs_el
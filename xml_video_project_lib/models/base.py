@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from lxml import etree as ET
 
 class XMElement(ABC):
+    __slots__ = ()
+
     def __init__(self, **attributes):
         self.attributes = attributes
         self.children = []
@@ -10,5 +12,13 @@ class XMElement(ABC):
         self.children.append(child)
 
     @abstractmethod
-    def to_xml(self) -> ET.Element:
-        pass
\ No newline at end of file
+    def to_xml(self, file_registry=None) -> ET.Element:
+        pass
+
+    def write_xml(self, writer):
+        """
+        Streams this element through an XMLStreamWriter. Leaf-sized elements
+        fall back to building their subtree with to_xml(); containers override
+        this to write their children one at a time.
+        """
+        writer.element(self.to_xml())
@@ -1,104 +1,234 @@
 from lxml import etree as ET
 from xml_video_project_lib.models.base import XMElement
 from xml_video_project_lib.models.file import File
+from xml_video_project_lib.models.layout import (
+    append_children, arrange, compound, iter_children, leaf, read_layout, verbatim, write_children,
+)
+from xml_video_project_lib.models.values import format_flag, to_flag, to_int
+from xml_video_project_lib.serializers.incremental import IncrementalElement
+from xml_video_project_lib.serializers.templates import TemplatedElement
+from xml_video_project_lib.utils.rational_time import frames_to_ticks
+
+class ClipItem(IncrementalElement, TemplatedElement, XMElement):
+    __slots__ = (
+        'id', 'premiereChannelType', 'masterclipid', 'name', 'enabled', 'duration', 'rate_timebase',
+        'rate_ntsc', 'start', 'end', 'in_point', 'out_point', 'pproTicksIn', 'pproTicksOut', 'file',
+        'sourcetrack_mediatype', 'sourcetrack_trackindex', 'label2', 'alphatype', 'filters', 'links',
+        'extra_elements', 'layout',
+    )
+
+    CACHE_XML = True
+    TEMPLATE_FIELDS = (
+        'id', 'premiereChannelType', 'masterclipid', 'name', 'enabled', 'duration', 'rate_timebase',
+        'rate_ntsc', 'start', 'end', 'in_point', 'out_point', 'pproTicksIn', 'pproTicksOut',
+        'sourcetrack_mediatype', 'sourcetrack_trackindex', 'label2', 'alphatype',
+    )
+    TEMPLATE_CHILDREN = ('file', 'filters', 'links', 'extra_elements')
+
+    # Children written from the clip's fields, in the order a new clip is written in
+    CHILD_ORDER = (
+        'masterclipid', 'name', 'enabled', 'duration', 'rate', 'start', 'end', 'in', 'out', 'pproTicksIn',
+        'pproTicksOut', 'file', 'sourcetrack', 'alphatype', 'logginginfo', 'colorinfo', 'labels', 'filter', 'link',
+    )
+    # Children that from_xml() maps onto fields, with the leaves it reads from compound ones;
+    # everything else is kept verbatim
+    KNOWN_CHILDREN = {
+        'masterclipid': None, 'name': None, 'enabled': None, 'duration': None, 'rate': {'timebase', 'ntsc'},
+        'start': None, 'end': None, 'in': None, 'out': None, 'pproTicksIn': None, 'pproTicksOut': None,
+        'file': None, 'sourcetrack': {'mediatype', 'trackindex'}, 'alphatype': None, 'labels': {'label2'},
+        'filter': None, 'link': None,
+    }
 
-class ClipItem(XMElement):
     def __init__(self, id, premiereChannelType, masterclipid, name, enabled, duration, rate_timebase,
                  rate_ntsc, start, end, in_point, out_point, pproTicksIn, pproTicksOut, file: File,
-                 sourcetrack_mediatype, sourcetrack_trackindex, label2, alphatype="none", filters=None, links=None):
+                 sourcetrack_mediatype, sourcetrack_trackindex, label2, alphatype="none", filters=None, links=None,
+                 extra_elements=None):
         self.id = id
         self.premiereChannelType = premiereChannelType
         self.masterclipid = masterclipid
         self.name = name
-        self.enabled = enabled
-        self.duration = duration
-        self.rate_timebase = rate_timebase
-        self.rate_ntsc = rate_ntsc
-        self.start = start
-        self.end = end
-        self.in_point = in_point
-        self.out_point = out_point
-        self.pproTicksIn = pproTicksIn
-        self.pproTicksOut = pproTicksOut
+        # Numbers and booleans are kept typed and only formatted when serialized
+        self.enabled = to_flag(enabled)
+        self.duration = to_int(duration)
+        self.rate_timebase = to_int(rate_timebase)
+        self.rate_ntsc = to_flag(rate_ntsc)
+        self.start = to_int(start)
+        self.end = to_int(end)
+        self.in_point = to_int(in_point)
+        self.out_point = to_int(out_point)
+        self.pproTicksIn = to_int(pproTicksIn)
+        self.pproTicksOut = to_int(pproTicksOut)
         self.file = file
         self.sourcetrack_mediatype = sourcetrack_mediatype  # "audio" or "video"
-        self.sourcetrack_trackindex = sourcetrack_trackindex
+        self.sourcetrack_trackindex = to_int(sourcetrack_trackindex)
         self.label2 = label2
         self.alphatype = alphatype
         self.filters = filters if filters else []  # List of Filter objects
         self.links = links if links else []      # List of Link objects
-
-    def to_xml(self):
-        clipitem_el = ET.Element('clipitem', id=self.id, premiereChannelType=self.premiereChannelType)
-        masterclipid_el = ET.SubElement(clipitem_el, 'masterclipid')
-        masterclipid_el.text = self.masterclipid
-
-        name_el = ET.SubElement(clipitem_el, 'name')
-        name_el.text = self.name
-
-        enabled_el = ET.SubElement(clipitem_el, 'enabled')
-        enabled_el.text = self.enabled
-
-        duration_el = ET.SubElement(clipitem_el, 'duration')
-        duration_el.text = str(self.duration)
-
-        rate_el = ET.SubElement(clipitem_el, 'rate')
-        timebase_el = ET.SubElement(rate_el, 'timebase')
-        timebase_el.text = self.rate_timebase
-        ntsc_el = ET.SubElement(rate_el, 'ntsc')
-        ntsc_el.text = self.rate_ntsc
-
-        start_el = ET.SubElement(clipitem_el, 'start')
-        start_el.text = self.start
-        end_el = ET.SubElement(clipitem_el, 'end')
-        end_el.text = self.end
-        in_el = ET.SubElement(clipitem_el, 'in')
-        in_el.text = self.in_point
-        out_el = ET.SubElement(clipitem_el, 'out')
-        out_el.text = self.out_point
-
-        pproTicksIn_el = ET.SubElement(clipitem_el, 'pproTicksIn')
-        pproTicksIn_el.text = self.pproTicksIn
-        pproTicksOut_el = ET.SubElement(clipitem_el, 'pproTicksOut')
-        pproTicksOut_el.text = self.pproTicksOut
-
-        # Add File
-        clipitem_el.append(self.file.to_xml())
-
-        # sourcetrack
-        sourcetrack_el = ET.SubElement(clipitem_el, 'sourcetrack')
-        mediatype_el = ET.SubElement(sourcetrack_el, 'mediatype')
-        mediatype_el.text = self.sourcetrack_mediatype
-        trackindex_el = ET.SubElement(sourcetrack_el, 'trackindex')
-        trackindex_el.text = str(self.sourcetrack_trackindex)
-
-        # alphatype
-        alphatype_el = ET.SubElement(clipitem_el, 'alphatype')
-        alphatype_el.text = self.alphatype
-
-        # logginginfo
-        logginginfo_el = ET.SubElement(clipitem_el, 'logginginfo')
-        for field in ['description', 'scene', 'shottake', 'lognote', 'good', 'originalvideofilename', 'originalaudiofilename']:
-            el = ET.SubElement(logginginfo_el, field)
-            el.text = ""
-
-        # colorinfo
-        colorinfo_el = ET.SubElement(clipitem_el, 'colorinfo')
-        for lut in ['lut', 'lut1', 'asc_sop', 'asc_sat', 'lut2']:
-            el = ET.SubElement(colorinfo_el, lut)
-            el.text = ""
-
-        # labels
-        labels_el = ET.SubElement(clipitem_el, 'labels')
-        label2_el = ET.SubElement(labels_el, 'label2')
-        label2_el.text = self.label2
-
-        # filters
-        for filter_obj in self.filters:
-            clipitem_el.append(filter_obj.to_xml())
-
-        # links
-        for link_obj in self.links:
-            clipitem_el.append(link_obj.to_xml())
-
-        return clipitem_el
\ No newline at end of file
+        self.extra_elements = extra_elements if extra_elements else ()  # Unmodelled children, kept verbatim
+        self.layout = None  # Child order of a clip read from a document, see from_xml()
+        if self.pproTicksIn is None or self.pproTicksOut is None:
+            self.sync_ticks(only_missing=True)
+
+    def sync_ticks(self, only_missing=False):
+        """
+        Sets pproTicksIn/pproTicksOut from the in and out frames at the clip's rate,
+        so Premiere sees the same source range as the frame fields describe.
+
+        Args:
+            only_missing (bool): Leave tick values that are already set alone.
+        """
+        if self.rate_timebase is None:
+            return
+        if self.in_point is not None and not (only_missing and self.pproTicksIn is not None):
+            self.pproTicksIn = frames_to_ticks(self.in_point, self.rate_timebase, self.rate_ntsc)
+        if self.out_point is not None and not (only_missing and self.pproTicksOut is not None):
+            self.pproTicksOut = frames_to_ticks(self.out_point, self.rate_timebase, self.rate_ntsc)
+
+    @classmethod
+    def from_xml(cls, element, files=None, raw=None):
+        """
+        Builds a ClipItem from a parsed <clipitem> element.
+
+        The clip keeps the order of the element's children and writes back only
+        the fields the element had. Filters, links and any children the model does
+        not know, such as logginginfo, are kept as RawElements and written back
+        unchanged in their original place. Tick values missing from the element
+        are not derived.
+
+        Args:
+            element (ET.Element): The <clipitem> element.
+            files (callable, optional): Called with a file id, its <file> element and
+                the element's RawElement (or None); returns the shared File, so bare
+                <file id="..."/> references resolve to their definition.
+            raw (RawElement, optional): The same element read lazily, so the children
+                kept verbatim keep their original bytes.
+
+        Returns:
+            ClipItem: The materialized clip.
+        """
+        def modelled(child):
+            if child.tag not in cls.KNOWN_CHILDREN:
+                return False
+            leaves = cls.KNOWN_CHILDREN[child.tag]
+            return leaves is None or all(grandchild.tag in leaves and not len(grandchild) for grandchild in child)
+
+        layout, extras = read_layout(element, modelled, raw)
+        children, sources, filters, links = {}, {}, [], []
+        for child, source in iter_children(element, raw):
+            if child.tag == 'filter':
+                filters.append(verbatim(child, source))
+            elif child.tag == 'link':
+                links.append(verbatim(child, source))
+            elif modelled(child) and child.tag not in children:
+                children[child.tag] = child
+                sources[child.tag] = source
+
+        def text(tag, leaf=None):
+            found = children.get(tag)
+            if found is not None and leaf is not None:
+                found = found.find(leaf)
+            return found.text if found is not None else None
+
+        file = None
+        file_el = children.get('file')
+        if file_el is not None:
+            if files is not None:
+                file = files(file_el.get('id'), file_el, sources['file'])
+            else:
+                file = File.from_xml(file_el, sources['file'])
+
+        clipitem = cls(
+            id=element.get('id'),
+            premiereChannelType=element.get('premiereChannelType'),
+            masterclipid=text('masterclipid'),
+            name=text('name'),
+            enabled=text('enabled'),
+            duration=text('duration'),
+            rate_timebase=text('rate', 'timebase'),
+            rate_ntsc=text('rate', 'ntsc'),
+            start=text('start'),
+            end=text('end'),
+            in_point=text('in'),
+            out_point=text('out'),
+            pproTicksIn=text('pproTicksIn'),
+            pproTicksOut=text('pproTicksOut'),
+            file=file,
+            sourcetrack_mediatype=text('sourcetrack', 'mediatype'),
+            sourcetrack_trackindex=text('sourcetrack', 'trackindex'),
+            label2=text('labels', 'label2'),
+            alphatype=text('alphatype'),
+            filters=filters,
+            links=links,
+            extra_elements=extras,
+        )
+        clipitem.pproTicksIn = to_int(text('pproTicksIn'))
+        clipitem.pproTicksOut = to_int(text('pproTicksOut'))
+        clipitem.layout = layout
+        return clipitem
+
+    def has_template(self) -> bool:
+        return self.layout is None
+
+    def write_layout(self, writer):
+        attrib = {'id': self.id}
+        if self.premiereChannelType is not None:
+            attrib['premiereChannelType'] = self.premiereChannelType
+        write_children(writer, 'clipitem', attrib, self._layout_children())
+
+    def template_values(self):
+        return (self.id, self.premiereChannelType, self.masterclipid, self.name, format_flag(self.enabled),
+                self.duration, self.rate_timebase, format_flag(self.rate_ntsc), self.start, self.end,
+                self.in_point, self.out_point, self.pproTicksIn, self.pproTicksOut, self.sourcetrack_mediatype,
+                self.sourcetrack_trackindex, self.label2, self.alphatype,
+                self.file, self._written_filters(), self.links, self.extra_elements)
+
+    def _written_filters(self):
+        # The filters as serialized; subclasses may add derived ones
+        return self.filters
+
+    def to_xml(self, file_registry=None):
+        clipitem_el = ET.Element('clipitem', id=self.id)
+        if self.premiereChannelType is not None:
+            clipitem_el.set('premiereChannelType', self.premiereChannelType)
+        append_children(clipitem_el, self._layout_children(), file_registry)
+        return clipitem_el
+
+    def _layout_children(self):
+        """
+        Returns the children of the clip in the order they are written in; fields
+        that are None are left out. New clips also get the empty logginginfo and
+        colorinfo blocks Premiere writes; clips read from a document keep their own.
+        """
+        # Template prototypes are built without a layout
+        layout = getattr(self, 'layout', None)
+        new = layout is None
+        groups = {
+            'masterclipid': leaf('masterclipid', self.masterclipid),
+            'name': leaf('name', self.name),
+            'enabled': leaf('enabled', format_flag(self.enabled)),
+            'duration': leaf('duration', self.duration),
+            'rate': compound('rate', (('timebase', self.rate_timebase), ('ntsc', format_flag(self.rate_ntsc)))),
+            'start': leaf('start', self.start),
+            'end': leaf('end', self.end),
+            'in': leaf('in', self.in_point),
+            'out': leaf('out', self.out_point),
+            'pproTicksIn': leaf('pproTicksIn', self.pproTicksIn),
+            'pproTicksOut': leaf('pproTicksOut', self.pproTicksOut),
+            'file': [self.file] if self.file is not None else [],
+            'sourcetrack': compound('sourcetrack', (
+                ('mediatype', self.sourcetrack_mediatype), ('trackindex', self.sourcetrack_trackindex),
+            )),
+            'alphatype': leaf('alphatype', self.alphatype),
+            'logginginfo': compound('logginginfo', (
+                (field, "") for field in ['description', 'scene', 'shottake', 'lognote', 'good',
+                                          'originalvideofilename', 'originalaudiofilename']
+            )) if new else [],
+            'colorinfo': compound('colorinfo', (
+                (lut, "") for lut in ['lut', 'lut1', 'asc_sop', 'asc_sat', 'lut2']
+            )) if new else [],
+            'labels': compound('labels', (('label2', self.label2),)),
+            'filter': self._written_filters(),
+            'link': self.links,
+        }
+        return arrange(layout, self.CHILD_ORDER, groups, self.extra_elements)
@@ -0,0 +1,392 @@
+import numpy as np
+from xml_video_project_lib.config import config
+from xml_video_project_lib.models.additional import Filter, Parameter
+from xml_video_project_lib.models.clipitem import ClipItem
+from xml_video_project_lib.models.track import Track
+from xml_video_project_lib.models.values import to_int
+from xml_video_project_lib.serializers.incremental import TrackedList, mark_all_dirty
+from xml_video_project_lib.utils.rational_time import frames_to_ticks_array
+
+TIMING_FIELDS = ('start', 'end', 'in_point', 'out_point', 'pproTicksIn', 'pproTicksOut')
+INTEGER_COLUMNS = TIMING_FIELDS + ('duration', 'file_index')
+
+# Stored in the duration column for clips without a duration
+NO_DURATION = np.iinfo(np.int64).min
+
+
+class ClipColumns:
+    """
+    Growable NumPy columns holding the timing, ticks, duration, speed and file of
+    every clip of a ColumnarTrack.
+
+    Rows are appended and never reused, so a clip keeps its row for its whole life.
+    Clips removed from the track leave their row behind unused.
+
+    speed is the playback speed the track has applied to the clip, written as a
+    Time Remap filter when it is not 1. It is NaN for clips that came with a Time
+    Remap filter of their own, whose speed stays in that filter.
+    """
+
+    def __init__(self, capacity=64):
+        self.size = 0
+        for name in INTEGER_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+        self.speed = np.ones(capacity, dtype=np.float64)
+        self.files = []        # Distinct File objects, indexed by file_index
+        self._file_rows = {}   # id(File) -> index into files
+        self._remap_filters = {}  # (speed, mediatype) -> Time Remap filter shared by the clips at that speed
+
+    def append(self, timing, duration, file, speed=1.0) -> int:
+        """
+        Adds a row and returns its index.
+
+        Args:
+            timing (sequence of int): Values for TIMING_FIELDS, in order.
+            duration (int): The clip's duration, or None.
+            file (File): The clip's file.
+            speed (float): The speed applied by the track, NaN if the clip has its own Time Remap filter.
+        """
+        if self.size == len(self.start):
+            self._grow(2 * len(self.start))
+        row = self.size
+        for name, value in zip(TIMING_FIELDS, timing):
+            getattr(self, name)[row] = value
+        self.duration[row] = NO_DURATION if duration is None else duration
+        self.speed[row] = speed
+        self.file_index[row] = self.index_of(file)
+        self.size += 1
+        return row
+
+    def index_of(self, file) -> int:
+        """
+        Returns the index of a File in files, adding it on first use.
+        """
+        index = self._file_rows.get(id(file))
+        if index is None:
+            index = len(self.files)
+            self.files.append(file)
+            self._file_rows[id(file)] = index
+        return index
+
+    def remap_filter(self, speed, mediatype):
+        """
+        Returns the Time Remap filter for a speed factor, one object per speed and
+        media type shared by every clip written at that speed.
+        """
+        key = (float(speed), mediatype)
+        filter_ = self._remap_filters.get(key)
+        if filter_ is None:
+            filter_ = self._remap_filters[key] = time_remap_filter(100 * key[0], mediatype)
+        return filter_
+
+    def _grow(self, capacity):
+        for name in INTEGER_COLUMNS + ('speed',):
+            old = getattr(self, name)
+            column = np.ones(capacity, dtype=old.dtype)
+            column[:self.size] = old[:self.size]
+            setattr(self, name, column)
+
+
+def _timing_column(name):
+    def get(self):
+        return int(getattr(self._columns, name)[self._row])
+
+    def set(self, value):
+        value = to_int(value)
+        if value is None:
+            raise ValueError(f"Clips on a columnar track need a {name}")
+        getattr(self._columns, name)[self._row] = value
+
+    return property(get, set)
+
+
+def _get_duration(self):
+    duration = int(self._columns.duration[self._row])
+    return None if duration == NO_DURATION else duration
+
+
+def _set_duration(self, duration):
+    duration = to_int(duration)
+    self._columns.duration[self._row] = NO_DURATION if duration is None else duration
+
+
+def _get_file(self):
+    return self._columns.files[self._columns.file_index[self._row]]
+
+
+def _set_file(self, file):
+    self._columns.file_index[self._row] = self._columns.index_of(file)
+
+
+def time_remap_filter(speed, mediatype="video") -> Filter:
+    """
+    Returns the Time Remap filter Premiere writes for a constant speed change.
+
+    Args:
+        speed (float): Playback speed in percent, e.g. 200 plays twice as fast.
+        mediatype (str): 'video' or 'audio'.
+    """
+    return Filter(
+        name="Time Remap", effectid="timeremap", effectcategory="motion", effecttype="motion",
+        mediatype=mediatype, pproBypass="false", parameters=[
+            Parameter(parameterid="variablespeed", name="variablespeed", valuemin="0", valuemax="1", value="0"),
+            Parameter(parameterid="speed", name="speed", valuemin="-100000", valuemax="100000",
+                      value=f"{speed:.6g}"),
+            Parameter(parameterid="reverse", name="reverse", value="FALSE"),
+            Parameter(parameterid="frameblending", name="frameblending", value="FALSE"),
+        ],
+    )
+
+
+def _speed_parameter(clipitem):
+    # Filters read from a document are RawElements and have no effectid
+    for filter_ in clipitem.filters:
+        if getattr(filter_, 'effectid', None) == "timeremap":
+            for parameter in filter_.parameters:
+                if getattr(parameter, 'parameterid', None) == "speed":
+                    return parameter
+    return None
+
+
+class ColumnarClipItem(ClipItem):
+    """
+    A ClipItem whose start, end, in, out, ticks, duration and file live in its
+    track's columns.
+
+    It serializes, caches and tracks changes like any ClipItem; only the storage
+    of those fields differs. A speed set by ColumnarTrack.retime() is written as
+    a Time Remap filter after the clip's own filters. Created by
+    ColumnarTrack.add_clipitem().
+    """
+    __slots__ = ('_columns', '_row')
+
+    start = _timing_column('start')
+    end = _timing_column('end')
+    in_point = _timing_column('in_point')
+    out_point = _timing_column('out_point')
+    pproTicksIn = _timing_column('pproTicksIn')
+    pproTicksOut = _timing_column('pproTicksOut')
+    duration = property(_get_duration, _set_duration)
+    file = property(_get_file, _set_file)
+
+    def _written_filters(self):
+        speed = self._columns.speed[self._row]
+        if speed == 1 or np.isnan(speed):
+            return self.filters
+        return list(self.filters) + [self._columns.remap_filter(speed, self.sourcetrack_mediatype or "video")]
+
+    @classmethod
+    def _compile_template(cls, variant, none_fields, level, pretty_print):
+        # Same layout as a ClipItem, compiled on a prototype that has no columns
+        return ClipItem._compile_template(variant, none_fields, level, pretty_print)
+
+    @classmethod
+    def from_clipitem(cls, clipitem: ClipItem, columns: ClipColumns):
+        """
+        Copies a ClipItem into a new row of the given columns.
+
+        Raises:
+            ValueError: If the clip's start, end, in, out or ticks are missing.
+        """
+        timing = [getattr(clipitem, name) for name in TIMING_FIELDS]
+        if None in timing:
+            raise ValueError(
+                f"Clip '{clipitem.id}' needs a start, end, in, out and ticks to go on a columnar track"
+            )
+
+        speed = np.nan if _speed_parameter(clipitem) is not None else 1.0
+        view = cls.__new__(cls)
+        object.__setattr__(view, '_columns', columns)
+        object.__setattr__(view, '_row', columns.append(timing, clipitem.duration, clipitem.file, speed))
+        for name in ClipItem.__slots__:
+            if name in TIMING_FIELDS or name in ('duration', 'file'):
+                continue
+            value = getattr(clipitem, name)
+            # Child lists are re-tracked for the new owner
+            setattr(view, name, list(value) if isinstance(value, TrackedList) else value)
+        return view
+
+
+class ColumnarTrack(Track):
+    """
+    A Track that keeps its clips' timing in NumPy arrays so timeline-wide edits
+    run as array operations instead of Python loops over clip objects.
+
+    Clips must be added with add_clipitem(), which returns the ColumnarClipItem
+    now representing the clip. Requires NumPy.
+    """
+
+    def __init__(self, MZ_TrackTargeted, premiereTrackType, outputchannelindex, settings=None):
+        super().__init__(MZ_TrackTargeted, premiereTrackType, outputchannelindex, settings)
+        self.columns = ClipColumns()
+        object.__setattr__(self, '_rows', None)
+        object.__setattr__(self, '_settings', settings)  # Read by sync_ticks()
+
+    def add_clipitem(self, clipitem: ClipItem) -> ColumnarClipItem:
+        if not (isinstance(clipitem, ColumnarClipItem) and clipitem._columns is self.columns):
+            clipitem = ColumnarClipItem.from_clipitem(clipitem, self.columns)
+        self.clipitems.append(clipitem)
+        return clipitem
+
+    def mark_dirty(self):
+        # The clip list may have changed; recompute the rows on next use
+        object.__setattr__(self, '_rows', None)
+        super().mark_dirty()
+
+    def rows(self):
+        """
+        Returns the column rows of the clips, in track order.
+        """
+        if self._rows is None:
+            try:
+                rows = np.fromiter((clipitem._row for clipitem in self.clipitems), dtype=np.int64,
+                                   count=len(self.clipitems))
+            except AttributeError:
+                raise TypeError("Clips must be added to a ColumnarTrack with add_clipitem()") from None
+            object.__setattr__(self, '_rows', rows)
+        return self._rows
+
+    def _changed(self, positions):
+        mark_all_dirty([self.clipitems[position] for position in positions])
+
+    def shift_after(self, time, delta) -> int:
+        """
+        Moves every clip starting at or after the given time by delta frames,
+        e.g. to ripple the rest of the track after an insert.
+
+        Returns:
+            int: The number of clips moved.
+        """
+        rows = self.rows()
+        positions = np.flatnonzero(self.columns.start[rows] >= time)
+        moved = rows[positions]
+        self.columns.start[moved] += delta
+        self.columns.end[moved] += delta
+        self._changed(positions)
+        return len(positions)
+
+    def trim_all(self, head=0, tail=0):
+        """
+        Trims head frames off the beginning and tail frames off the end of every clip,
+        moving in/out by the same amount. Call sync_ticks() afterwards to update the ticks.
+
+        Raises:
+            ValueError: If a clip would end up shorter than one frame.
+        """
+        rows = self.rows()
+        columns = self.columns
+        too_short = (columns.end[rows] - tail) - (columns.start[rows] + head) < 1
+        if too_short.any():
+            clipitem = self.clipitems[int(np.argmax(too_short))]
+            raise ValueError(f"Trimming {head}+{tail} frames would leave clip '{clipitem.id}' empty")
+        columns.start[rows] += head
+        columns.in_point[rows] += head
+        columns.end[rows] -= tail
+        columns.out_point[rows] -= tail
+        self._changed(range(len(rows)))
+
+    def retime(self, factor, origin=0) -> int:
+        """
+        Changes the playback speed of the clips starting at or after origin, as
+        Premiere's Speed/Duration does with ripple: their distance from origin is
+        divided by factor, and so are their in/out, duration and ticks, which
+        XMEML counts in speed-adjusted frames. Clips before origin are left alone.
+
+        The speed goes into a column and is written as a Time Remap filter, so the
+        whole edit is a handful of array operations. Clips that came with a Time
+        Remap filter of their own have the speed in it multiplied instead.
+
+        Args:
+            factor (float): Playback speed, e.g. 2.0 plays twice as fast.
+            origin (int): Timeline frame that stays in place.
+
+        Returns:
+            int: The number of clips retimed.
+
+        Raises:
+            ValueError: If factor is not positive, or a clip's out point would come
+                before its in point; the track is left unchanged.
+        """
+        if factor <= 0:
+            raise ValueError(f"Speed factor must be positive, got {factor}")
+        rows = self.rows()
+        columns = self.columns
+        positions = np.flatnonzero(columns.start[rows] >= origin)
+        moved = rows[positions]
+
+        def scaled(values):
+            return np.rint(values / factor).astype(np.int64)
+
+        start = origin + scaled(columns.start[moved] - origin)
+        end = origin + scaled(columns.end[moved] - origin)
+        in_point = scaled(columns.in_point[moved])
+        # How much longer the source range is than the clip, usually 0; kept through the rounding
+        excess = (columns.out_point[moved] - columns.in_point[moved]) - (columns.end[moved] - columns.start[moved])
+        out_point = in_point + (end - start) + excess
+        backwards = out_point < in_point
+        if backwards.any():
+            clipitem = self.clipitems[positions[np.argmax(backwards)]]
+            raise ValueError(f"Retiming by {factor} would put the out point of clip '{clipitem.id}' before its in point")
+
+        columns.start[moved] = start
+        columns.end[moved] = end
+        columns.in_point[moved] = in_point
+        columns.out_point[moved] = out_point
+        for column in (columns.pproTicksIn, columns.pproTicksOut):
+            column[moved] = scaled(column[moved])
+        duration = columns.duration[moved]
+        known = duration != NO_DURATION
+        columns.duration[moved[known]] = scaled(duration[known])
+        # NaN marks clips whose speed lives in a Time Remap filter of their own
+        columns.speed[moved] *= factor
+        for position in positions[np.isnan(columns.speed[moved])]:
+            parameter = _speed_parameter(self.clipitems[position])
+            if parameter is not None:
+                parameter.value = f"{float(parameter.value) * factor:.6g}"
+        self._changed(positions)
+        return len(positions)
+
+    def sync_ticks(self, rate_timebase=None, rate_ntsc=None):
+        """
+        Recomputes pproTicksIn/pproTicksOut of every clip from its in and out frames,
+        for the whole track in one array operation.
+
+        Args:
+            rate_timebase (int, optional): Frame rate the clips' in/out are counted in.
+                Defaults to the sequence rate of the settings the track was created with.
+            rate_ntsc (bool or str, optional): Whether that rate is NTSC. Defaults to
+                the same settings.
+        """
+        settings = self._settings or config
+        if rate_timebase is None:
+            rate_timebase = settings.get('Sequence Rate', 'rate_timebase', type_cast=int)
+        if rate_ntsc is None:
+            rate_ntsc = settings.get('Sequence Rate', 'rate_ntsc')
+        rows = self.rows()
+        columns = self.columns
+        columns.pproTicksIn[rows] = frames_to_ticks_array(columns.in_point[rows], rate_timebase, rate_ntsc)
+        columns.pproTicksOut[rows] = frames_to_ticks_array(columns.out_point[rows], rate_timebase, rate_ntsc)
+        self._changed(range(len(rows)))
+
+    def overlaps(self):
+        """
+        Finds clips that start before an earlier clip on the track has ended.
+
+        Returns:
+            list: (earlier, later) ClipItem pairs in timeline order; the earlier clip
+            is the one reaching furthest into the later clip.
+        """
+        rows = self.rows()
+        if len(rows) < 2:
+            return []
+        order = np.argsort(self.columns.start[rows], kind='stable')
+        starts = self.columns.start[rows][order]
+        ends = self.columns.end[rows][order]
+        # Furthest end so far, and the clip it belongs to
+        reach = np.maximum.accumulate(ends)
+        holder = np.maximum.accumulate(np.where(ends == reach, np.arange(len(ends)), 0))
+        later = np.flatnonzero(starts[1:] < reach[:-1]) + 1
+        return [
+            (self.clipitems[order[holder[index - 1]]], self.clipitems[order[index]])
+            for index in later
+        ]
@@ -1,35 +1,137 @@
 from lxml import etree as ET
 from xml_video_project_lib.models.base import XMElement
+from xml_video_project_lib.models.layout import (
+    append_children, arrange, iter_children, leaf, read_layout, verbatim, write_children,
+)
+from xml_video_project_lib.models.values import to_int
+from xml_video_project_lib.serializers.incremental import IncrementalElement
+from xml_video_project_lib.serializers.templates import TemplatedElement
+from xml_video_project_lib.serializers.xml_writer import escape_attribute
 
-class File(XMElement):
-    def __init__(self, id, name, pathurl, samplerate, channelcount, mediatype="audio", width=None, height=None):
+class File(IncrementalElement, TemplatedElement, XMElement):
+    __slots__ = ('id', 'name', 'pathurl', 'samplerate', 'channelcount', 'mediatype', 'width', 'height',
+                 'extra_elements', 'layout', 'source_media')
+
+    CACHE_XML = True
+    TEMPLATE_FIELDS = ('id', 'name', 'pathurl', 'samplerate', 'channelcount', 'width', 'height')
+    TEMPLATE_CHILDREN = ('extra_elements',)
+
+    # Children written from the file's fields, in the order a new file is written in
+    CHILD_ORDER = ('name', 'pathurl', 'media')
+
+    def __init__(self, id, name, pathurl, samplerate, channelcount, mediatype="audio", width=None, height=None,
+                 extra_elements=None):
         self.id = id
         self.name = name
         self.pathurl = pathurl
-        self.samplerate = samplerate
-        self.channelcount = channelcount
+        self.samplerate = to_int(samplerate)
+        self.channelcount = to_int(channelcount)
         self.mediatype = mediatype  # "audio" or "video"
-        self.width = width
-        self.height = height
+        self.width = to_int(width)
+        self.height = to_int(height)
+        self.extra_elements = extra_elements if extra_elements else ()  # Unmodelled children, kept verbatim
+        self.layout = None  # Child order of a file read from a document, see from_xml()
+        self.source_media = None  # (media fields, <media> RawElement) of a file read from a document
+
+    @classmethod
+    def from_xml(cls, element, raw=None):
+        """
+        Builds a File from a parsed, complete <file> element.
+
+        The file keeps the order of the element's children. Its <media> block is
+        written back verbatim for as long as the media fields keep the values read
+        from it, and regenerated from them once one changes. Other children such as
+        rate, duration or timecode are kept verbatim in their original place.
+
+        Args:
+            element (ET.Element): The <file> element.
+            raw (RawElement, optional): The same element read lazily, so the children
+                kept verbatim keep their original bytes.
+
+        Returns:
+            File: The materialized file.
+        """
+        def text(path):
+            found = element.find(path)
+            return found.text if found is not None else None
+
+        mediatype = "video" if element.find('media/video') is not None else "audio"
+        layout, extras = read_layout(element, lambda child: child.tag in cls.CHILD_ORDER, raw)
+        file = cls(
+            id=element.get('id'),
+            name=text('name'),
+            pathurl=text('pathurl'),
+            samplerate=text('media/audio/samplecharacteristics/samplerate'),
+            channelcount=text('media/audio/channelcount'),
+            mediatype=mediatype,
+            width=text('media/video/samplecharacteristics/width'),
+            height=text('media/video/samplecharacteristics/height'),
+            extra_elements=extras,
+        )
+        file.layout = layout
+        for child, source in iter_children(element, raw):
+            if child.tag == 'media':
+                file.source_media = (file._media_fields(), verbatim(child, source))
+                break
+        return file
+
+    def _media_fields(self):
+        return (self.samplerate, self.channelcount, self.mediatype, self.width, self.height)
+
+    def has_template(self) -> bool:
+        return self.layout is None
+
+    def write_layout(self, writer):
+        write_children(writer, 'file', {'id': self.id}, self._layout_children())
+
+    def template_variant(self):
+        return (('mediatype', self.mediatype),)
+
+    def template_values(self):
+        # to_xml falls back to 1280x720 for any falsy dimension
+        return (self.id, self.name, self.pathurl, self.samplerate, self.channelcount,
+                self.width or None, self.height or None, self.extra_elements)
+
+    def render_fragment(self, level=0, pretty_print=True, file_registry=None, cache=False):
+        if file_registry is not None and not file_registry.register(self):
+            return f'<file id="{escape_attribute(self.id)}"/>'
+        return super().render_fragment(level, pretty_print, file_registry, cache)
+
+    def to_xml(self, file_registry=None):
+        # Later uses of an already written file are emitted as a bare reference
+        if file_registry is not None and not file_registry.register(self):
+            return ET.Element('file', id=self.id)
 
-    def to_xml(self):
         file_el = ET.Element('file', id=self.id)
-        name_el = ET.SubElement(file_el, 'name')
-        name_el.text = self.name
+        append_children(file_el, self._layout_children(), file_registry)
+        return file_el
 
-        pathurl_el = ET.SubElement(file_el, 'pathurl')
-        pathurl_el.text = self.pathurl
+    def _layout_children(self):
+        groups = {
+            'name': leaf('name', self.name),
+            'pathurl': leaf('pathurl', self.pathurl),
+            'media': [self._media_to_xml()],
+        }
+        # Template prototypes are built without a layout
+        return arrange(getattr(self, 'layout', None), self.CHILD_ORDER, groups, self.extra_elements)
 
-        media_el = ET.SubElement(file_el, 'media')
+    def _media_to_xml(self):
+        source_media = getattr(self, 'source_media', None)
+        if source_media is not None and source_media[0] == self._media_fields():
+            return source_media[1]
+
+        media_el = ET.Element('media')
         if self.mediatype == "audio":
             audio_el = ET.SubElement(media_el, 'audio')
             sample_characteristics = ET.SubElement(audio_el, 'samplecharacteristics')
             depth_el = ET.SubElement(sample_characteristics, 'depth')
             depth_el.text = "16"
-            samplerate_el = ET.SubElement(sample_characteristics, 'samplerate')
-            samplerate_el.text = str(self.samplerate)
-            channelcount_el = ET.SubElement(audio_el, 'channelcount')
-            channelcount_el.text = str(self.channelcount)
+            if self.samplerate is not None:
+                samplerate_el = ET.SubElement(sample_characteristics, 'samplerate')
+                samplerate_el.text = str(self.samplerate)
+            if self.channelcount is not None:
+                channelcount_el = ET.SubElement(audio_el, 'channelcount')
+                channelcount_el.text = str(self.channelcount)
         elif self.mediatype == "video":
             video_el = ET.SubElement(media_el, 'video')
             sample_characteristics = ET.SubElement(video_el, 'samplecharacteristics')
@@ -51,5 +153,4 @@ class File(XMElement):
             fielddominance_el.text = "none"
             colordepth_el = ET.SubElement(sample_characteristics, 'colordepth')
             colordepth_el.text = "24"
-
-        return file_el
\ No newline at end of file
+        return media_el
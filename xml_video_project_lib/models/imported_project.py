@@ -0,0 +1,156 @@
+from pathlib import Path
+from lxml import etree as ET
+from xml_video_project_lib.models.clipitem import ClipItem
+from xml_video_project_lib.models.file import File
+from xml_video_project_lib.models.project import Project
+from xml_video_project_lib.models.raw_element import RawElement
+from xml_video_project_lib.models.sequence import Sequence
+from xml_video_project_lib.models.track import Track
+from xml_video_project_lib.serializers import FileRegistry, XMLStreamWriter
+from xml_video_project_lib.serializers.xml_scanner import find_root_span, iter_child_spans, iter_full_file_definitions
+
+class ImportedProject(Project):
+    """
+    A Project read from an existing XMEML document.
+
+    The document stays a tree of RawElements over the original bytes. Elements are
+    only parsed into model objects when materialized, and everything that was not
+    touched is written back byte for byte, so editing one clip of a large project
+    costs about as much as that clip.
+    """
+
+    def __init__(self, source):
+        """
+        Args:
+            source (bytes): The complete XMEML document.
+        """
+        root_span = find_root_span(source)
+        self.source = source
+        self.prolog = bytes(source[:root_span.start])
+        self.epilog = bytes(source[root_span.end:])
+        self.root = RawElement(source, root_span, loader=self._load)
+        self.files = {}  # Materialized File objects by id
+        self._file_offsets = None  # Offsets of the complete file definitions by id, indexed on first use
+        self.version = self.root.get('version', "4")
+        self.doctype = "<!DOCTYPE xmeml>"
+
+    @property
+    def sequences(self):
+        """
+        The sequences directly under the xmeml root, raw or materialized.
+        """
+        return [
+            child for child in self.root.children
+            if isinstance(child, Sequence) or getattr(child, 'tag', None) == 'sequence'
+        ]
+
+    def add_sequence(self, sequence: Sequence):
+        self.root.append(sequence)
+
+    def iter(self, tag=None):
+        """
+        Yields the raw elements with the given tag anywhere in the document.
+        """
+        return self.root.iter(tag)
+
+    def find_by_id(self, tag, element_id):
+        """
+        Returns the first raw element with the given tag and id attribute, or None.
+        """
+        return next((element for element in self.iter(tag) if element.get('id') == element_id), None)
+
+    def _load(self, raw):
+        element = ET.fromstring(raw.data)
+        if raw.tag == 'clipitem':
+            return ClipItem.from_xml(element, files=self.file_by_id, raw=raw)
+        if raw.tag == 'file':
+            return self.file_by_id(raw.get('id'), element, raw)
+        if raw.tag == 'track':
+            return Track.from_xml(element, files=self.file_by_id, raw=raw)
+        if raw.tag == 'sequence':
+            return Sequence.from_xml(element, files=self.file_by_id, raw=raw)
+        return None
+
+    def file_by_id(self, file_id, element=None, raw=None):
+        """
+        Returns the File with the given id, materializing its complete definition
+        on first use. Every clip that uses the file shares the returned object.
+
+        Args:
+            file_id (str): The id of the file.
+            element (ET.Element, optional): A <file> element at hand; used directly
+                when it is the complete definition.
+            raw (RawElement, optional): The same element read lazily.
+
+        Raises:
+            KeyError: If the document does not define the file.
+        """
+        if file_id in self.files:
+            return self.files[file_id]
+        if element is not None and len(element):
+            return self.files.setdefault(file_id, File.from_xml(element, raw))
+        if self._file_offsets is None:
+            self._file_offsets = {}
+            for defined_id, offset in iter_full_file_definitions(self.source, 0, len(self.source)):
+                self._file_offsets.setdefault(defined_id, offset)
+        position = self._file_offsets.get(file_id)
+        if position is None:
+            raise KeyError(f"File '{file_id}' is not defined in the document")
+        span = next(iter_child_spans(self.source, position, len(self.source)))
+        element = ET.fromstring(bytes(self.source[span.start:span.end]))
+        return self.files.setdefault(file_id, File.from_xml(element, RawElement(self.source, span)))
+
+    def to_xml(self, share_files=True):
+        file_registry = FileRegistry(self.root.full_file_ids()) if share_files else None
+        return self.root.to_xml(file_registry)
+
+    def write(self, sink, share_files=True, pretty_print=True, workers=None, incremental=False):
+        """
+        Writes the document to a binary sink. An unmodified document is written
+        back exactly as it was read; otherwise only modified elements are
+        re-serialized and everything else is copied verbatim.
+
+        Args:
+            sink: A binary file-like object exposing ``write(bytes)``.
+            share_files (bool): Write materialized files as ``<file id="..."/>``
+                references when a complete definition is already in the output.
+            pretty_print (bool): Must be True; the verbatim parts keep their layout.
+            workers (int, optional): Ignored; imported documents are mostly copied
+                verbatim, which leaves nothing worth rendering concurrently.
+            incremental (bool): Keep the fragments of materialized clipitems for the
+                next incremental write, as Project.write() does.
+
+        Raises:
+            ValueError: If pretty_print is False.
+        """
+        if not pretty_print:
+            raise ValueError("Imported documents are written in their original layout; compact output is not supported")
+        if not self.root.dirty:
+            sink.write(self.prolog)
+            sink.write(self.root.data)
+            sink.write(self.epilog)
+            return
+
+        # Files defined inside verbatim subtrees are already in the output
+        file_registry = FileRegistry(self.root.full_file_ids()) if share_files else None
+        sink.write(self.prolog)
+        self.root.write_xml(XMLStreamWriter(sink, file_registry=file_registry, cache=incremental))
+        sink.write(self.epilog.lstrip())
+
+
+def load_project(source) -> ImportedProject:
+    """
+    Loads an XMEML document without parsing it into a tree.
+
+    Args:
+        source (str, Path or bytes): Path of the document, or its contents.
+
+    Returns:
+        ImportedProject: The lazily loaded project.
+
+    Raises:
+        ValueError: If the document has no root element or is not well-formed.
+    """
+    if isinstance(source, (str, Path)):
+        source = Path(source).read_bytes()
+    return ImportedProject(bytes(source))
@@ -0,0 +1,162 @@
+from lxml import etree as ET
+from xml_video_project_lib.models.raw_element import RawElement
+from xml_video_project_lib.models.values import to_text
+from xml_video_project_lib.serializers.xml_scanner import iter_child_spans
+
+
+def iter_children(element, raw=None):
+    """
+    Yields (child, source) for every child element of a parsed element. When raw,
+    the same element read lazily, is given, source is a RawElement over the
+    child's original bytes; otherwise it is None. Comments are skipped.
+    """
+    spans = None
+    if raw is not None:
+        spans = (
+            span for span in iter_child_spans(raw.source, raw.span.content_start, raw.span.content_end)
+            if span.tag is not None
+        )
+    for child in element:
+        if isinstance(child.tag, str):
+            yield child, RawElement(raw.source, next(spans)) if spans is not None else None
+
+
+def verbatim(child, source=None):
+    """
+    Returns a RawElement for a child from iter_children(): its original bytes
+    when known, or else the parsed child serialized again.
+    """
+    return source if source is not None else RawElement.from_element(child)
+
+
+def read_layout(element, modelled, raw=None):
+    """
+    Records the order of an element's children for a model read from it.
+
+    Args:
+        element (ET.Element): The element the model is read from.
+        modelled (callable): Called with each child element; True if the model
+            writes that child from its own fields.
+        raw (RawElement, optional): The same element read lazily, so the other
+            children keep their original bytes.
+
+    Returns:
+        tuple: (layout, extras): the tag of every modelled child and None for every
+        other one, in document order, and the other children as RawElements.
+    """
+    layout, extras = [], []
+    for child, source in iter_children(element, raw):
+        if modelled(child):
+            layout.append(child.tag)
+        else:
+            layout.append(None)
+            extras.append(verbatim(child, source))
+    return tuple(layout), extras
+
+
+def arrange(layout, order, groups, extras):
+    """
+    Returns the children of a model in the order they are written in.
+
+    A new element (no layout) is written in the given order, followed by its extras.
+    An element read from a document keeps its recorded order: each tag in the layout
+    takes the next child of its group, the last one of a tag also takes any children
+    added since, and each None takes the next extra. Groups the document did not
+    have go before the first recorded tag that follows them in order.
+
+    Args:
+        layout (tuple or None): The order recorded by read_layout().
+        order (tuple): Tags of the modelled children, in the order new elements are written in.
+        groups (dict): Tag -> children currently written for it; empty for absent fields.
+        extras (iterable): Unmodelled children, kept verbatim.
+
+    Returns:
+        list: leaves from leaf() and compound(), lxml elements and objects with a
+        to_xml()/write_xml() method.
+    """
+    if layout is None:
+        return [child for tag in order for child in groups[tag]] + list(extras)
+
+    pending = {tag: list(groups[tag]) for tag in order}
+    last = {tag: position for position, tag in enumerate(layout) if tag is not None}
+    rank = {tag: position for position, tag in enumerate(order)}
+    extras = list(extras)
+    extras.reverse()
+    missing = [tag for tag in order if tag not in last]
+    children = []
+    for position, tag in enumerate(layout):
+        if tag is None:
+            if extras:
+                children.append(extras.pop())
+            continue
+        while missing and rank[missing[0]] < rank[tag]:
+            children.extend(pending[missing.pop(0)])
+        items = pending[tag]
+        if items:
+            children.append(items.pop(0))
+        if last[tag] == position:
+            children.extend(items)
+            items.clear()
+    for tag in missing:
+        children.extend(pending[tag])
+    extras.reverse()
+    return children + extras
+
+
+def leaf(tag, text):
+    """
+    Returns a text-only child as a one-element group, or an empty group for None.
+    Leaves are (tag, text) pairs, so no lxml element is made for them unless the
+    children are appended to a tree.
+    """
+    if text is None:
+        return []
+    return [(tag, to_text(text))]
+
+
+def compound(tag, fields):
+    """
+    Returns an element of (tag, text) leaves as a one-element group, leaving out
+    None leaves, or an empty group when every one is None. The element is a
+    (tag, [leaves]) pair.
+    """
+    children = [child for name, text in fields for child in leaf(name, text)]
+    if not children:
+        return []
+    return [(tag, children)]
+
+
+def append_children(parent, children, file_registry=None):
+    """
+    Appends the children returned by arrange() to an lxml element.
+    """
+    for child in children:
+        if isinstance(child, tuple):
+            tag, content = child
+            element = ET.SubElement(parent, tag)
+            if isinstance(content, list):
+                append_children(element, content)
+            else:
+                element.text = content
+        elif ET.iselement(child):
+            parent.append(child)
+        else:
+            parent.append(child.to_xml(file_registry))
+
+
+def write_children(writer, tag, attrib, children):
+    """
+    Streams an element whose children were returned by arrange().
+    """
+    writer.start(tag, attrib)
+    for child in children:
+        if isinstance(child, tuple):
+            if isinstance(child[1], list):
+                write_children(writer, child[0], None, child[1])
+            else:
+                writer.leaf(*child)
+        elif ET.iselement(child):
+            writer.element(child)
+        else:
+            child.write_xml(writer)
+    writer.end()
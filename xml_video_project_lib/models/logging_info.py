@@ -1,7 +1,11 @@
 from lxml import etree as ET
 from xml_video_project_lib.models.base import XMElement
+from xml_video_project_lib.serializers.incremental import IncrementalElement
+
+class LoggingInfo(IncrementalElement, XMElement):
+    __slots__ = ('description', 'scene', 'shottake', 'lognote', 'good', 'originalvideofilename',
+                 'originalaudiofilename')
 
-class LoggingInfo(XMElement):
     def __init__(self):
         self.description = ""
         self.scene = ""
@@ -11,7 +15,7 @@ class LoggingInfo(XMElement):
         self.originalvideofilename = ""
         self.originalaudiofilename = ""
 
-    def to_xml(self):
+    def to_xml(self, file_registry=None):
         logginginfo_el = ET.Element('logginginfo')
         for field in ['description', 'scene', 'shottake', 'lognote', 'good', 'originalvideofilename', 'originalaudiofilename']:
             el = ET.SubElement(logginginfo_el, field)
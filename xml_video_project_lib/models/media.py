@@ -1,12 +1,40 @@
 from lxml import etree as ET
 from xml_video_project_lib.models.audio import Audio
 from xml_video_project_lib.models.base import XMElement
+from xml_video_project_lib.models.layout import append_children, arrange, iter_children, read_layout, write_children
+from xml_video_project_lib.serializers.incremental import IncrementalElement
 from xml_video_project_lib.models.video import Video
 
-class Media(XMElement):
+class Media(IncrementalElement, XMElement):
     def __init__(self):
         self.video = None
         self.audio = None
+        self.layout = None  # Child order of a media block read from a document, see from_xml()
+        self.extra_elements = ()
+
+    @classmethod
+    def from_xml(cls, element, files=None, settings=None, raw=None):
+        """
+        Builds a Media block and its Video and Audio from a parsed <media> element,
+        keeping the order of its children. See Sequence.from_xml() for the arguments.
+        """
+        media = cls()
+        for child, source in iter_children(element, raw):
+            if child.tag == 'video' and media.video is None:
+                media.video = Video.from_xml(child, files, settings, source)
+            elif child.tag == 'audio' and media.audio is None:
+                media.audio = Audio.from_xml(child, files, settings, source)
+        media.layout, media.extra_elements = read_layout(
+            element, lambda child: child.tag in ('video', 'audio'), raw
+        )
+        return media
+
+    def _layout_children(self):
+        groups = {
+            'video': [self.video] if self.video else [],
+            'audio': [self.audio] if self.audio else [],
+        }
+        return arrange(self.layout, ('video', 'audio'), groups, self.extra_elements)
 
     def add_video(self, video: Video):
         self.video = video
@@ -14,10 +42,24 @@ class Media(XMElement):
     def add_audio(self, audio: Audio):
         self.audio = audio
 
-    def to_xml(self):
+    def to_xml(self, file_registry=None):
         media_el = ET.Element('media')
+        if self.layout is not None:
+            append_children(media_el, self._layout_children(), file_registry)
+            return media_el
         if self.video:
-            media_el.append(self.video.to_xml())
+            media_el.append(self.video.to_xml(file_registry))
         if self.audio:
-            media_el.append(self.audio.to_xml())
+            media_el.append(self.audio.to_xml(file_registry))
         return media_el
+
+    def write_xml(self, writer):
+        if self.layout is not None:
+            write_children(writer, 'media', None, self._layout_children())
+            return
+        writer.start('media')
+        if self.video:
+            self.video.write_xml(writer)
+        if self.audio:
+            self.audio.write_xml(writer)
+        writer.end()
@@ -1,6 +1,81 @@
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
 from lxml import etree as ET
 from xml_video_project_lib.models.base import XMElement
 from xml_video_project_lib.models.sequence import Sequence
+from xml_video_project_lib.logging import logger
+from xml_video_project_lib.serializers import FileRegistry, XMLStreamWriter
+
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.xz': 'xz'}
+
+class _TimedSink:
+    """
+    Passes writes on to a file, adding up the time they take and the bytes written.
+    """
+    __slots__ = ('file', 'seconds', 'size')
+
+    def __init__(self, file):
+        self.file = file
+        self.seconds = 0.0
+        self.size = 0
+
+    def write(self, data):
+        started = time.perf_counter()
+        self.file.write(data)
+        self.seconds += time.perf_counter() - started
+        self.size += len(data)
+
+
+@contextmanager
+def _open_output(filename, atomic):
+    """
+    Opens filename for writing in binary mode. When atomic, a temporary file next
+    to it is written and renamed into place once the block completes.
+    """
+    if not atomic:
+        with open(filename, 'wb') as file:
+            yield file
+        return
+
+    path = Path(filename)
+    temp_path = path.with_name(f".{path.name}.{os.urandom(4).hex()}.tmp")
+    try:
+        with open(temp_path, 'xb') as file:
+            yield file
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def _compressed(file, compression):
+    """
+    Wraps a binary file in a gzip or xz compressor that is finished, but not
+    closed, with the block. Compressed output is reproducible: gzip headers
+    carry no timestamp or file name.
+
+    Raises:
+        ValueError: If compression is not None, 'gzip' or 'xz'.
+    """
+    if compression is None:
+        yield file
+        return
+    if compression == 'gzip':
+        import gzip
+
+        compressor = gzip.GzipFile(filename='', mode='wb', fileobj=file, mtime=0)
+    elif compression == 'xz':
+        import lzma
+
+        compressor = lzma.LZMAFile(file, 'wb')
+    else:
+        raise ValueError(f"Unknown compression '{compression}', expected 'gzip' or 'xz'")
+    with compressor:
+        yield compressor
+
 
 class Project(XMElement):
     def __init__(self, version="4", doctype="<!DOCTYPE xmeml>"):
@@ -11,34 +86,135 @@ class Project(XMElement):
     def add_sequence(self, sequence: Sequence):
         self.sequences.append(sequence)
 
-    def to_xml(self):
+    def validate(self) -> list:
+        """
+        Checks every track of every sequence for overlapping or inverted clips
+        before the project is handed to Premiere.
+
+        Returns:
+            list: Descriptions of the problems found, each prefixed with its sequence,
+            empty if there are none.
+        """
+        return [
+            f"Sequence '{sequence.name}': {problem}"
+            for sequence in self.sequences
+            for problem in sequence.validate()
+        ]
+
+    def to_xml(self, share_files=True):
+        """
+        Builds the document as an lxml tree.
+
+        Args:
+            share_files (bool): See write(). On by default, so a file used by
+                several clips is defined once and referenced afterwards; False gives
+                the earlier output with every file written out in full.
+        """
+        file_registry = FileRegistry() if share_files else None
         xmeml_el = ET.Element('xmeml', version=self.version)
         for sequence in self.sequences:
-            xmeml_el.append(sequence.to_xml())
+            xmeml_el.append(sequence.to_xml(file_registry))
         return xmeml_el
 
-    def save_to_file(self, filename):
-        # Create XML tree
-        xml_tree = self.to_xml()
+    def write_xml(self, writer):
+        writer.start('xmeml', {'version': self.version})
+        for sequence in self.sequences:
+            sequence.write_xml(writer)
+        writer.end()
 
-        # Convert to string with pretty print
-        xml_bytes = ET.tostring(xml_tree, pretty_print=True, encoding='UTF-8', xml_declaration=False)
+    def write(self, sink, share_files=True, pretty_print=True, workers=None, incremental=False):
+        """
+        Streams the complete XMEML document, including the XML declaration and
+        DOCTYPE, to a binary sink. Only one clip's subtree is materialized at a
+        time, so memory use does not grow with the number of clipitems.
 
-        # Insert DOCTYPE
-        xml_str = xml_bytes.decode('utf-8')
-        xml_declaration = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        # Remove existing XML declaration if present
-        if xml_str.startswith(xml_declaration):
-            xml_content = xml_str[len(xml_declaration):]
+        Args:
+            sink: A binary file-like object exposing ``write(bytes)``.
+            share_files (bool): Write each media file in full on its first use only
+                and as a ``<file id="..."/>`` reference afterwards, as Premiere does.
+                On by default, which changes the output of projects that use a file
+                in several clips: they used to repeat the full definition in every
+                clip. Pass False to get that output back.
+            pretty_print (bool): Indent the document; False writes it without
+                whitespace between elements, which is smaller and faster.
+            workers (int, optional): Render the sequences concurrently with this many
+                worker processes (threads on free-threaded builds), 0 for one per CPU.
+                The output is byte-identical to a serial write. Off by default (None
+                or 1 writes serially): it can only help on a multi-core machine with
+                several large sequences, and starting the workers and collecting their
+                output costs more than it saves on small projects. Measure with
+                benchmarks/parallel_serialization.py before turning it on.
+            incremental (bool): For a project saved repeatedly while it is edited:
+                every clipitem and filter keeps its rendered fragment, and those
+                unchanged since the previous incremental write are copied instead
+                of rendered again. The fragments stay in memory with the models
+                (about the size of the output); the default write keeps nothing.
+        """
+        writer = XMLStreamWriter(sink, pretty_print=pretty_print,
+                                 file_registry=FileRegistry() if share_files else None,
+                                 cache=incremental)
+        writer.write_prolog(self.doctype)
+        if workers is None or workers == 1 or len(self.sequences) < 2:
+            self.write_xml(writer)
         else:
-            xml_content = xml_str
+            self._write_xml_parallel(writer, workers)
+
+    def _write_xml_parallel(self, writer, workers):
+        from xml_video_project_lib.serializers.parallel import render_sequences
+
+        file_registry = writer.file_registry
+        writer.start('xmeml', {'version': self.version})
+        fragments = render_sequences(self.sequences, writer.level, writer.pretty_print,
+                                     file_registry is not None, workers)
+        for sequence, (data, files) in zip(self.sequences, fragments):
+            if file_registry is not None and not file_registry.accepts(files):
+                # Only if a sequence's files changed while it was rendered
+                sequence.write_xml(writer)
+                continue
+            if file_registry is not None:
+                file_registry.replay(files)
+            writer.splice(data)
+        writer.end()
 
-        final_xml = xml_declaration + self.doctype + '\n' + xml_content
+    def save_to_file(self, filename, share_files=True, atomic=False, profiler=None, pretty_print=True,
+                     compression=None, workers=None, incremental=False):
+        """
+        Streams the document straight to a file instead of building the full tree.
 
-        # Write to file
-        with open(filename, 'w', encoding='utf-8') as file:
-            file.write(final_xml)
+        Args:
+            filename (str, Path or binary file object): The file to write, or an open
+                binary sink such as a file, BytesIO or socket file, which is left open.
+            share_files (bool): See write(); on by default, so repeated files are
+                written as references.
+            atomic (bool): Write to a temporary file next to filename and rename it
+                into place, so anything watching the file never sees it half written.
+            profiler (StageProfiler, optional): Records the save as the 'save' stage,
+                the time spent writing to the file (and compressing) within it as
+                'save/io', and the uncompressed bytes as the 'bytes_written' counter.
+            pretty_print (bool): See write().
+            compression (str, optional): 'gzip' or 'xz'. By default taken from a
+                '.gz' or '.xz' file name suffix; sinks are written uncompressed.
+            workers (int, optional): See write().
+            incremental (bool): See write().
 
-        print(f"XML project file '{filename}' generated successfully.")
+        Raises:
+            ValueError: If atomic is set for a sink, or compression is unknown.
+        """
+        is_sink = hasattr(filename, 'write')
+        if is_sink and atomic:
+            raise ValueError("Atomic writes need a file name, not an open sink")
+        if compression is None and not is_sink:
+            compression = COMPRESSION_SUFFIXES.get(Path(filename).suffix.lower())
 
+        with profiler.stage('save') if profiler is not None else nullcontext():
+            with nullcontext(filename) if is_sink else _open_output(filename, atomic) as file:
+                with _compressed(file, compression) as stream:
+                    sink = stream if profiler is None else _TimedSink(stream)
+                    self.write(sink, share_files=share_files, pretty_print=pretty_print, workers=workers,
+                               incremental=incremental)
+            if profiler is not None:
+                profiler.add_time('io', sink.seconds)
+                profiler.count('bytes_written', sink.size)
 
+        target = getattr(filename, 'name', 'output stream') if is_sink else filename
+        logger.info("XML project file '%s' generated successfully.", target)
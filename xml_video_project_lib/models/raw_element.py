@@ -0,0 +1,183 @@
+from lxml import etree as ET
+from xml_video_project_lib.models.base import XMElement
+from xml_video_project_lib.serializers.xml_scanner import find_root_span, iter_child_spans, iter_full_file_ids
+
+class RawElement(XMElement):
+    """
+    An element kept as the exact bytes it was read from until something changes it.
+
+    Children are located lazily by scanning the element's byte span, and only the
+    children that are replaced, added or removed cause the element to be
+    re-serialized. Untouched elements are written back verbatim, which also
+    preserves elements the model classes know nothing about.
+    """
+
+    def __init__(self, source, span, parent=None, loader=None):
+        """
+        Args:
+            source (bytes): The document the element was read from.
+            span (ElementSpan): Byte offsets of the element within source.
+            parent (RawElement, optional): The enclosing element.
+            loader (callable, optional): Turns a RawElement into a model object;
+                used by materialize().
+        """
+        self.source = source
+        self.span = span
+        self.tag = span.tag
+        self.parent = parent
+        self.loader = loader
+        self.dirty = False
+        self._children = None
+
+    @classmethod
+    def from_bytes(cls, data, loader=None):
+        return cls(data, find_root_span(data), loader=loader)
+
+    @classmethod
+    def from_element(cls, element, loader=None):
+        return cls.from_bytes(ET.tostring(element, encoding='UTF-8', with_tail=False), loader=loader)
+
+    @property
+    def data(self) -> bytes:
+        """
+        The original bytes of the element.
+        """
+        return bytes(self.source[self.span.start:self.span.end])
+
+    @property
+    def attrib(self) -> dict:
+        if self.tag is None:
+            return {}
+        start_tag = bytes(self.source[self.span.start:self.span.content_start])
+        if self.span.content_start != self.span.end:
+            start_tag += b'</' + self.tag.encode() + b'>'
+        return dict(ET.fromstring(start_tag).attrib)
+
+    def get(self, key, default=None):
+        return self.attrib.get(key, default)
+
+    @property
+    def text(self):
+        """
+        The text content of a leaf element, or None.
+        """
+        if self.tag is None:
+            return None
+        return ET.fromstring(self.data).text
+
+    @property
+    def children(self) -> list:
+        """
+        The direct children, as RawElements until they are materialized or replaced.
+        Use append/insert/remove/replace to change them so the change is tracked.
+        """
+        if self._children is None:
+            self._children = [
+                RawElement(self.source, span, parent=self, loader=self.loader)
+                for span in iter_child_spans(self.source, self.span.content_start, self.span.content_end)
+            ]
+        return self._children
+
+    def find(self, tag):
+        """
+        Returns the first direct child with the given tag, or None.
+        """
+        return next((child for child in self.children if getattr(child, 'tag', None) == tag), None)
+
+    def iter(self, tag=None):
+        """
+        Yields the RawElement descendants with the given tag (or all of them), depth first.
+        Materialized model objects are not descended into.
+        """
+        for child in self.children:
+            if not isinstance(child, RawElement) or child.tag is None:
+                continue
+            if tag is None or child.tag == tag:
+                yield child
+            yield from child.iter(tag)
+
+    def append(self, child):
+        self.children.append(child)
+        self._adopt(child)
+
+    def insert(self, index, child):
+        self.children.insert(index, child)
+        self._adopt(child)
+
+    def remove(self, child):
+        self.children.remove(child)
+        self.mark_dirty()
+
+    def replace(self, old, new):
+        self.children[self.children.index(old)] = new
+        self._adopt(new)
+
+    def _adopt(self, child):
+        if isinstance(child, RawElement):
+            child.parent = self
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        """
+        Flags this element and its ancestors for re-serialization.
+        """
+        element = self
+        while element is not None and not element.dirty:
+            element.dirty = True
+            element = element.parent
+
+    def materialize(self):
+        """
+        Replaces this element in its parent with the equivalent model object.
+
+        Returns:
+            The model object, e.g. a ClipItem or File.
+
+        Raises:
+            ValueError: If no model class handles this element.
+        """
+        model = self.loader(self) if self.loader is not None else None
+        if model is None:
+            raise ValueError(f"No model class can materialize <{self.tag}>")
+        if self.parent is not None:
+            self.parent.replace(self, model)
+        return model
+
+    def full_file_ids(self):
+        """
+        Yields the ids of complete file definitions that will be written verbatim.
+        """
+        if not self.dirty:
+            yield from iter_full_file_ids(self.source, self.span.start, self.span.end)
+            return
+        for child in self.children:
+            if isinstance(child, RawElement):
+                yield from child.full_file_ids()
+
+    def to_xml(self, file_registry=None):
+        if not self.dirty:
+            if self.tag is None:
+                # Comments and processing instructions need an element to parse inside
+                return ET.fromstring(b'<raw>' + self.data + b'</raw>')[0]
+            return ET.fromstring(self.data)
+        element = ET.Element(self.tag, self.attrib)
+        for child in self.children:
+            element.append(child.to_xml(file_registry))
+        return element
+
+    def write_xml(self, writer):
+        if not self.dirty:
+            writer.raw(self.data)
+            return
+        writer.start(self.tag, self.attrib)
+        for child in self.children:
+            child.write_xml(writer)
+        writer.end()
+
+    def render_fragment(self, level=0, pretty_print=True, file_registry=None, cache=False):
+        if not self.dirty:
+            return self.data.decode('utf-8')
+        element = self.to_xml(file_registry)
+        if pretty_print:
+            ET.indent(element, level=level)
+        return ET.tostring(element, encoding='unicode')
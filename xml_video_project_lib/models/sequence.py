@@ -2,22 +2,39 @@ from lxml import etree as ET
 from xml_video_project_lib.config import config
 from xml_video_project_lib.models.base import XMElement
 from xml_video_project_lib.models import Media, Timecode, Audio, Video, LoggingInfo
+from xml_video_project_lib.models.layout import (
+    append_children, arrange, compound, iter_children, leaf, read_layout, verbatim, write_children,
+)
+from xml_video_project_lib.models.values import to_int
+from xml_video_project_lib.serializers.incremental import IncrementalElement
+
+class Sequence(IncrementalElement, XMElement):
+    # Children written from the sequence's fields, in the order a new sequence is written in
+    CHILD_ORDER = ('uuid', 'duration', 'rate', 'name', 'media', 'timecode', 'logginginfo')
 
-class Sequence(XMElement):
     def __init__(
             self, 
             id, 
             uuid,
             name, 
-            duration, 
-            rate_timebase=config.get('Sequence Rate', 'rate_timebase', type_cast=int),
-            rate_ntsc=config.get('Sequence Rate', 'rate_ntsc'),
-            attributes=config.get_all('Sequence Attributes')
+            duration=None, 
+            rate_timebase=None,
+            rate_ntsc=None,
+            attributes=None,
+            settings=None
         ):
+        # Defaults come from the given ConfigSnapshot, or the global config.ini
+        settings = settings or config
+        if rate_timebase is None:
+            rate_timebase = settings.get('Sequence Rate', 'rate_timebase', type_cast=int)
+        if rate_ntsc is None:
+            rate_ntsc = settings.get('Sequence Rate', 'rate_ntsc')
+        if attributes is None:
+            attributes = settings.get_all('Sequence Attributes')
         # attributes dict can contain additional keys like the TL.* and MZ.* attributes
         self.id = id
         self.uuid = uuid
-        self.duration = duration
+        self.duration = duration  # Frames; None derives it from the clips when written
         self.rate_timebase = rate_timebase
         self.rate_ntsc = rate_ntsc
         self.name = name
@@ -25,6 +42,57 @@ class Sequence(XMElement):
         self.timecode = Timecode(timebase=rate_timebase, ntsc=rate_ntsc)
         self.logginginfo = LoggingInfo()
         self.attributes = attributes
+        self.layout = None  # Child order of a sequence read from a document, see from_xml()
+        self.extra_elements = ()
+
+    @classmethod
+    def from_xml(cls, element, files=None, settings=None, raw=None):
+        """
+        Builds a Sequence, its tracks and their ClipItems from a parsed <sequence> element.
+
+        The sequence keeps its attributes and the order of its children. Its
+        timecode and logginginfo are kept as RawElements, as are children the
+        model does not know, such as labels, and all of them are written back
+        unchanged in their original place. See Media.from_xml() for the media.
+
+        Args:
+            element (ET.Element): The <sequence> element.
+            files (callable, optional): Resolves file references, see ClipItem.from_xml().
+            settings (ConfigSnapshot, optional): Passed on to the constructor and the tracks.
+            raw (RawElement, optional): The same element read lazily, so the children
+                kept verbatim keep their original bytes.
+
+        Returns:
+            Sequence: The materialized sequence.
+        """
+        def text(path):
+            found = element.find(path)
+            return found.text if found is not None else None
+
+        def modelled(child):
+            if child.tag == 'rate':
+                return all(grandchild.tag in ('timebase', 'ntsc') and not len(grandchild) for grandchild in child)
+            return child.tag in cls.CHILD_ORDER
+
+        attributes = {key: value for key, value in element.attrib.items() if key != 'id'}
+        layout, extras = read_layout(element, modelled, raw)
+        sequence = cls(element.get('id'), text('uuid'), text('name'), duration=to_int(text('duration')),
+                       attributes=attributes, settings=settings)
+        rate_el = element.find('rate')
+        rate_modelled = rate_el is not None and modelled(rate_el)
+        sequence.rate_timebase = to_int(text('rate/timebase')) if rate_modelled else None
+        sequence.rate_ntsc = text('rate/ntsc') if rate_modelled else None
+        sequence.media = sequence.timecode = sequence.logginginfo = None
+        for child, source in iter_children(element, raw):
+            if child.tag == 'media' and sequence.media is None:
+                sequence.media = Media.from_xml(child, files, settings, source)
+            elif child.tag == 'timecode' and sequence.timecode is None:
+                sequence.timecode = verbatim(child, source)
+            elif child.tag == 'logginginfo' and sequence.logginginfo is None:
+                sequence.logginginfo = verbatim(child, source)
+        sequence.layout = layout
+        sequence.extra_elements = extras
+        return sequence
 
     def add_video(self, video: Video):
         self.media.add_video(video)
@@ -32,26 +100,68 @@ class Sequence(XMElement):
     def add_audio(self, audio: Audio):
         self.media.add_audio(audio)
 
-    def to_xml(self):
+    def tracks(self) -> list:
+        """
+        Returns the video tracks followed by the audio tracks.
+        """
+        tracks = []
+        if self.media is None:
+            return tracks
+        if self.media.video:
+            tracks.extend(self.media.video.tracks)
+        if self.media.audio:
+            tracks.extend(self.media.audio.tracks)
+        return tracks
+
+    def content_duration(self) -> int:
+        """
+        Returns the frame the last clip of the sequence ends at.
+        """
+        return max((track.content_end() for track in self.tracks()), default=0)
+
+    def validate(self) -> list:
+        """
+        Checks every track of the sequence, see Track.validate().
+
+        Returns:
+            list: Descriptions of the problems found, empty if there are none.
+        """
+        return [problem for track in self.tracks() for problem in track.validate()]
+
+    def _duration_text(self):
+        return str(self.content_duration() if self.duration is None else self.duration)
+
+    def _layout_children(self):
+        groups = {
+            'uuid': leaf('uuid', self.uuid),
+            'duration': leaf('duration', self.duration),
+            'rate': compound('rate', (('timebase', self.rate_timebase), ('ntsc', self.rate_ntsc))),
+            'name': leaf('name', self.name),
+            'media': [self.media] if self.media is not None else [],
+            'timecode': [self.timecode] if self.timecode is not None else [],
+            'logginginfo': [self.logginginfo] if self.logginginfo is not None else [],
+        }
+        return arrange(self.layout, self.CHILD_ORDER, groups, self.extra_elements)
+
+    def to_xml(self, file_registry=None):
         sequence_el = ET.Element('sequence', id=self.id, **self.attributes)
+        if self.layout is not None:
+            append_children(sequence_el, self._layout_children(), file_registry)
+            return sequence_el
 
         uuid_el = ET.SubElement(sequence_el, 'uuid')
         uuid_el.text = str(self.uuid)
 
         duration_el = ET.SubElement(sequence_el, 'duration')
-        duration_el.text = str(self.duration)
+        duration_el.text = self._duration_text()
 
-        rate_el = ET.SubElement(sequence_el, 'rate')
-        timebase_el = ET.SubElement(rate_el, 'timebase')
-        timebase_el.text = str(self.rate_timebase)
-        ntsc_el = ET.SubElement(rate_el, 'ntsc')
-        ntsc_el.text = self.rate_ntsc
+        sequence_el.append(self._rate_to_xml())
 
         name_el = ET.SubElement(sequence_el, 'name')
         name_el.text = self.name
 
         # Media
-        sequence_el.append(self.media.to_xml())
+        sequence_el.append(self.media.to_xml(file_registry))
 
         # Timecode
         sequence_el.append(self.timecode.to_xml())
@@ -61,3 +171,24 @@ class Sequence(XMElement):
 
         return sequence_el
 
+    def write_xml(self, writer):
+        if self.layout is not None:
+            write_children(writer, 'sequence', {'id': self.id, **self.attributes}, self._layout_children())
+            return
+        writer.start('sequence', {'id': self.id, **self.attributes})
+        writer.leaf('uuid', str(self.uuid))
+        writer.leaf('duration', self._duration_text())
+        writer.element(self._rate_to_xml())
+        writer.leaf('name', self.name)
+        self.media.write_xml(writer)
+        self.timecode.write_xml(writer)
+        self.logginginfo.write_xml(writer)
+        writer.end()
+
+    def _rate_to_xml(self):
+        rate_el = ET.Element('rate')
+        timebase_el = ET.SubElement(rate_el, 'timebase')
+        timebase_el.text = str(self.rate_timebase)
+        ntsc_el = ET.SubElement(rate_el, 'ntsc')
+        ntsc_el.text = self.rate_ntsc
+        return rate_el
@@ -1,26 +1,40 @@
 from lxml import etree as ET
 from xml_video_project_lib.models.base import XMElement
+from xml_video_project_lib.models.values import format_flag, to_flag, to_int, to_text
+from xml_video_project_lib.serializers.incremental import IncrementalElement
+from xml_video_project_lib.utils.rational_time import frames_to_timecode
 
-class Timecode(XMElement):
-    def __init__(self, timebase=30, ntsc="TRUE", string="00;00;00;00", frame="0", displayformat="DF"):
-        self.timebase = timebase
-        self.ntsc = ntsc
-        self.string = string
-        self.frame = frame
-        self.displayformat = displayformat
+class Timecode(IncrementalElement, XMElement):
+    __slots__ = ('timebase', 'ntsc', 'string', 'frame', 'displayformat')
 
-    def to_xml(self):
+    def __init__(self, timebase=30, ntsc="TRUE", string=None, frame=0, displayformat=None):
+        self.timebase = to_int(timebase)
+        self.ntsc = to_flag(ntsc)
+        self.string = string  # None derives it from frame when serialized
+        self.frame = to_int(frame)
+        # Drop-frame only exists for NTSC rates, so that is the default for them only
+        self.displayformat = displayformat or ("DF" if self.ntsc else "NDF")
+
+    def format_string(self):
+        """
+        Formats frame as timecode; drop-frame ("00;00;00;00") when displayformat is DF
+        and the rate is an NTSC multiple of 30, non-drop ("00:00:00:00") otherwise.
+        """
+        drop_frame = self.displayformat == "DF" and bool(self.ntsc) and self.timebase % 30 == 0
+        return frames_to_timecode(self.frame or 0, self.timebase, drop_frame=drop_frame)
+
+    def to_xml(self, file_registry=None):
         timecode_el = ET.Element('timecode')
         rate_el = ET.SubElement(timecode_el, 'rate')
         timebase_el = ET.SubElement(rate_el, 'timebase')
         timebase_el.text = str(self.timebase)
         ntsc_el = ET.SubElement(rate_el, 'ntsc')
-        ntsc_el.text = self.ntsc
+        ntsc_el.text = format_flag(self.ntsc)
 
         string_el = ET.SubElement(timecode_el, 'string')
-        string_el.text = self.string
+        string_el.text = self.string if self.string is not None else self.format_string()
         frame_el = ET.SubElement(timecode_el, 'frame')
-        frame_el.text = self.frame
+        frame_el.text = to_text(self.frame)
         displayformat_el = ET.SubElement(timecode_el, 'displayformat')
         displayformat_el.text = self.displayformat
 
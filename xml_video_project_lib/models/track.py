@@ -2,31 +2,208 @@ from lxml import etree as ET
 from xml_video_project_lib.config import config
 from xml_video_project_lib.models.base import XMElement
 from xml_video_project_lib.models import ClipItem
+from xml_video_project_lib.models.layout import (
+    append_children, arrange, iter_children, leaf, read_layout, write_children,
+)
+from xml_video_project_lib.serializers.incremental import IncrementalElement
+from xml_video_project_lib.utils.interval_index import IntervalIndex
 
-class Track(XMElement):
+
+def _timing(clipitem):
+    # Clips without a fixed place (e.g. start/end of -1 next to a transition) are not indexed
+    start = getattr(clipitem, 'start', None)
+    end = getattr(clipitem, 'end', None)
+    if start is None or end is None or start < 0 or end < start:
+        return None
+    return start, end
+
+class Track(IncrementalElement, XMElement):
     def __init__(
             self, 
             MZ_TrackTargeted, 
             premiereTrackType,
-            outputchannelindex
+            outputchannelindex,
+            settings=None
         ):
-        self.attributes = config.get_all('Track Attributes')
+        # Shared read-only section of the config snapshot, not a copy per track
+        self.attributes = (settings or config).get_all('Track Attributes')
         self.MZ_TrackTargeted = MZ_TrackTargeted, 
         self.premiereTrackType = premiereTrackType,
         self.outputchannelindex = outputchannelindex
         self.clipitems = []  # List of ClipItems
+        self.layout = None  # Child order of a track read from a document, see from_xml()
+        self.extra_elements = ()  # Unmodelled children of a track read from a document, kept verbatim
+        object.__setattr__(self, '_time_index', None)  # Built on first use, dropped on any change
+
+    @classmethod
+    def from_xml(cls, element, files=None, settings=None, raw=None):
+        """
+        Builds a Track and its ClipItems from a parsed <track> element.
+
+        The track keeps its attributes and the order of its children. Children
+        other than clipitems and outputchannelindex, such as enabled, locked or
+        transitionitem, are kept as RawElements and written back unchanged in
+        their original place.
+
+        Args:
+            element (ET.Element): The <track> element.
+            files (callable, optional): Resolves file references, see ClipItem.from_xml().
+            settings (ConfigSnapshot, optional): Passed on to the constructor.
+            raw (RawElement, optional): The same element read lazily, so the children
+                kept verbatim keep their original bytes.
+
+        Returns:
+            Track: The materialized track.
+        """
+        attributes = dict(element.attrib)
+        outputchannelindex = element.find('outputchannelindex')
+        track = cls(
+            attributes.get('MZ.TrackTargeted'),
+            attributes.get('premiereTrackType'),
+            outputchannelindex.text if outputchannelindex is not None else None,
+            settings=settings,
+        )
+        track.attributes = attributes
+        for child, source in iter_children(element, raw):
+            if child.tag == 'clipitem':
+                track.add_clipitem(ClipItem.from_xml(child, files, source))
+        track.layout, track.extra_elements = read_layout(
+            element, lambda child: child.tag in ('clipitem', 'outputchannelindex'), raw
+        )
+        return track
 
     def add_clipitem(self, clipitem: ClipItem):
+        index = self._time_index
         self.clipitems.append(clipitem)
+        timing = _timing(clipitem)
+        if index is not None and timing is not None:
+            # Keep the index instead of rebuilding it for every clip appended
+            index.insert(*timing, clipitem)
+            object.__setattr__(self, '_time_index', index)
+
+    def remove_clipitem(self, clipitem: ClipItem):
+        """
+        Removes a clip from the track.
+
+        Raises:
+            ValueError: If the clip is not on the track.
+        """
+        index = self._time_index
+        for position, item in enumerate(self.clipitems):
+            if item is clipitem:
+                break
+        else:
+            raise ValueError(f"Clip '{getattr(clipitem, 'id', clipitem)}' is not on this track")
+        del self.clipitems[position]
+        timing = _timing(clipitem)
+        if index is not None and (timing is None or index.remove(timing[0], clipitem)):
+            object.__setattr__(self, '_time_index', index)
+
+    def _content_changed(self):
+        object.__setattr__(self, '_time_index', None)
+
+    def time_index(self) -> IntervalIndex:
+        """
+        Returns the clips sorted by start, for time queries. The index is kept up to
+        date by add_clipitem() and remove_clipitem() and rebuilt after any other change.
+        """
+        index = self._time_index
+        if index is None:
+            index = IntervalIndex(
+                (*timing, clipitem) for clipitem in self.clipitems
+                if (timing := _timing(clipitem)) is not None
+            )
+            object.__setattr__(self, '_time_index', index)
+        return index
 
-    def to_xml(self):
+    def clips_at(self, time) -> list:
+        """
+        Returns the clips playing at the given frame, in O(log n).
+        """
+        return self.time_index().at(time)
+
+    def clips_between(self, start, end) -> list:
+        """
+        Returns the clips overlapping the frames [start, end), e.g. to check
+        whether a new clip would collide with the ones already on the track.
+        """
+        return self.time_index().overlapping(start, end)
+
+    def content_end(self) -> int:
+        """
+        Returns the frame the last clip on the track ends at, 0 for an empty track.
+        """
+        return self.time_index().end
+
+    def overlaps(self):
+        """
+        Finds clips that start before an earlier clip on the track has ended.
+
+        Returns:
+            list: (earlier, later) ClipItem pairs in timeline order; the earlier clip
+            is the one reaching furthest into the later clip.
+        """
+        return self.time_index().overlaps()
+
+    def validate(self) -> list:
+        """
+        Checks the track for clips Premiere would reject or misplace.
+
+        Returns:
+            list: Descriptions of the problems found, empty if there are none.
+        """
+        problems = [
+            f"Clip '{clipitem.id}' ends at {clipitem.end}, before it starts at {clipitem.start}"
+            for clipitem in self.clipitems
+            if getattr(clipitem, 'start', None) is not None and getattr(clipitem, 'end', None) is not None
+            and 0 <= clipitem.end < clipitem.start
+        ]
+        problems.extend(
+            f"Clip '{later.id}' starts at {later.start}, before clip '{earlier.id}' ends at {earlier.end}"
+            for earlier, later in self.overlaps()
+        )
+        return problems
+
+    def ordered_clipitems(self):
+        """
+        Returns the clips in timeline order, the order they are written in. Tracks
+        with clips that have no fixed place keep the order the clips were added in.
+        """
+        index = self.time_index()
+        if len(index) == len(self.clipitems):
+            return index.items
+        return self.clipitems
+
+    def _layout_children(self):
+        groups = {
+            'clipitem': self.ordered_clipitems(),
+            'outputchannelindex': leaf('outputchannelindex', self.outputchannelindex),
+        }
+        return arrange(self.layout, ('clipitem', 'outputchannelindex'), groups, self.extra_elements)
+
+    def to_xml(self, file_registry=None):
         track_el = ET.Element('track', **self.attributes)
-        for clipitem in self.clipitems:
-            track_el.append(clipitem.to_xml())
+        if self.layout is not None:
+            append_children(track_el, self._layout_children(), file_registry)
+            return track_el
+        for clipitem in self.ordered_clipitems():
+            track_el.append(clipitem.to_xml(file_registry))
         enabled_el = ET.SubElement(track_el, 'enabled')
         enabled_el.text = "TRUE"
         locked_el = ET.SubElement(track_el, 'locked')
         locked_el.text = "FALSE"
         outputchannelindex_el = ET.SubElement(track_el, 'outputchannelindex')
         outputchannelindex_el.text = self.outputchannelindex
-        return track_el
\ No newline at end of file
+        return track_el
+
+    def write_xml(self, writer):
+        if self.layout is not None:
+            write_children(writer, 'track', self.attributes, self._layout_children())
+            return
+        writer.start('track', self.attributes)
+        for clipitem in self.ordered_clipitems():
+            clipitem.write_xml(writer)
+        writer.leaf('enabled', "TRUE")
+        writer.leaf('locked', "FALSE")
+        writer.leaf('outputchannelindex', self.outputchannelindex)
+        writer.end()
\ No newline at end of file
@@ -0,0 +1,51 @@
+def to_int(value):
+    """
+    Converts a field value given as an int or a numeric string to an int.
+
+    Args:
+        value (int, str or None): The value as passed to a model constructor.
+
+    Returns:
+        int or None: The integer, or None if the value is None.
+
+    Raises:
+        ValueError: If a string is not an integer literal.
+    """
+    if value is None or type(value) is int:
+        return value
+    return int(value)
+
+
+def to_flag(value):
+    """
+    Converts an XMEML boolean ("TRUE"/"FALSE", any case) or a bool to a bool.
+
+    Raises:
+        ValueError: If a string is neither true nor false.
+    """
+    if value is None or type(value) is bool:
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1"):
+        return True
+    if text in ("false", "0"):
+        return False
+    raise ValueError(f"Invalid boolean value: '{value}'")
+
+
+def format_flag(value, true="TRUE", false="FALSE"):
+    """
+    Formats a bool the way XMEML writes it. Strings and None pass through unchanged.
+    """
+    if value is True:
+        return true
+    if value is False:
+        return false
+    return value
+
+
+def to_text(value):
+    """
+    Returns the element text for a field value; None stays None so lxml writes ``<tag/>``.
+    """
+    return None if value is None else str(value)
@@ -2,37 +2,107 @@ from lxml import etree as ET
 from xml_video_project_lib.config import config
 from xml_video_project_lib.models import Track
 from xml_video_project_lib.models.base import XMElement
+from xml_video_project_lib.models.layout import append_children, arrange, iter_children, read_layout, write_children
+from xml_video_project_lib.serializers.incremental import IncrementalElement
 
-class Video(XMElement):
+class Video(IncrementalElement, XMElement):
     def __init__(
             self, 
-            name=config.get('Video', 'name'), 
-            width=config.get('Video', 'width', type_cast=int), 
-            height=config.get('Video', 'height', type_cast=int)
+            name=None, 
+            width=None, 
+            height=None,
+            settings=None
         ):
+        # Defaults come from the given ConfigSnapshot, or the global config.ini
+        settings = settings or config
+        if name is None:
+            name = settings.get('Video', 'name')
+        if width is None:
+            width = settings.get('Video', 'width', type_cast=int)
+        if height is None:
+            height = settings.get('Video', 'height', type_cast=int)
         self.name = name
         self.width = width
         self.height = height
         self.format_details = {}
         self.tracks = []
+        self.layout = None  # Child order of a video block read from a document, see from_xml()
+        self.extra_elements = ()
         self.set_format(
             {
-                "rate_timebase": config.get('Sequence Rate', "rate_timebase"),
-                "rate_ntsc": config.get('Sequence Rate', "rate_ntsc")
+                "rate_timebase": settings.get('Sequence Rate', "rate_timebase"),
+                "rate_ntsc": settings.get('Sequence Rate', "rate_ntsc")
             }
         )
 
+    @classmethod
+    def from_xml(cls, element, files=None, settings=None, raw=None):
+        """
+        Builds a Video and its Tracks from a parsed <video> element.
+
+        Only the tracks are modelled. The format and any other children are kept
+        as RawElements and written back unchanged in their original place, and
+        name, width and height are None.
+
+        Args:
+            element (ET.Element): The <video> element.
+            files (callable, optional): Resolves file references, see ClipItem.from_xml().
+            settings (ConfigSnapshot, optional): Passed on to the tracks.
+            raw (RawElement, optional): The same element read lazily, so the children
+                kept verbatim keep their original bytes.
+
+        Returns:
+            Video: The materialized video block.
+        """
+        video = cls.__new__(cls)
+        video.name = None
+        video.width = None
+        video.height = None
+        video.format_details = {}
+        video.tracks = [
+            Track.from_xml(child, files, settings, source)
+            for child, source in iter_children(element, raw) if child.tag == 'track'
+        ]
+        video.layout, video.extra_elements = read_layout(element, lambda child: child.tag == 'track', raw)
+        return video
+
     def set_format(self, sample_characteristics):
         self.format_details = sample_characteristics
 
     def add_track(self, track: Track):
         self.tracks.append(track)
 
-    def to_xml(self):
+    def _layout_children(self):
+        return arrange(self.layout, ('track',), {'track': self.tracks}, self.extra_elements)
+
+    def to_xml(self, file_registry=None):
         video_el = ET.Element('video')
+        if self.layout is not None:
+            append_children(video_el, self._layout_children(), file_registry)
+            return video_el
+
+        # format
+        video_el.append(self._format_to_xml())
+
+        # tracks
+        for track in self.tracks:
+            video_el.append(track.to_xml(file_registry))
+
+        return video_el
+
+    def write_xml(self, writer):
+        if self.layout is not None:
+            write_children(writer, 'video', None, self._layout_children())
+            return
+        writer.start('video')
+        writer.element(self._format_to_xml())
+        for track in self.tracks:
+            track.write_xml(writer)
+        writer.end()
 
+    def _format_to_xml(self):
         # format
-        format_el = ET.SubElement(video_el, 'format')
+        format_el = ET.Element('format')
         sample_characteristics_el = ET.SubElement(format_el, 'samplecharacteristics')
 
         # rate
@@ -90,8 +160,4 @@ class Video(XMElement):
         colordepth_el = ET.SubElement(sample_characteristics_el, 'colordepth')
         colordepth_el.text = "24"
 
-        # tracks
-        for track in self.tracks:
-            video_el.append(track.to_xml())
-
-        return video_el
+        return format_el
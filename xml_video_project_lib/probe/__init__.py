@@ -0,0 +1,36 @@
+import importlib
+
+# Submodules are imported on first use of one of their names (PEP 562), so
+# e.g. reading MediaInfo does not load SQLite or the thread pool
+_EXPORTS = {
+    "MediaInfo": "media_info",
+    "ProbeCache": "cache",
+    "probe_media": "prober",
+    "fast_probe": "prober",
+    "ffprobe": "prober",
+    "media_info_from_ffprobe": "prober",
+    "read_media_header": "headers",
+}
+
+__all__ = [
+    "MediaInfo",
+    "ProbeCache",
+    "probe_media",
+    "fast_probe",
+    "ffprobe",
+    "media_info_from_ffprobe",
+    "read_media_header",
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,161 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from xml_video_project_lib.logging import logger
+from xml_video_project_lib.probe.media_info import MediaInfo
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probe_cache (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    info TEXT NOT NULL,
+    probed_at REAL NOT NULL
+)
+"""
+
+
+def file_key(path):
+    """
+    Returns the cache key of a file: its resolved path, size and modification time.
+
+    Raises:
+        OSError: If the file cannot be stat'ed.
+    """
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    return str(resolved), stat.st_size, stat.st_mtime_ns
+
+
+class ProbeCache:
+    """
+    Persistent SQLite cache of probe results.
+
+    Entries are keyed on the resolved path, file size and ``st_mtime_ns``, so a
+    file that is replaced or modified misses automatically. The database runs
+    in WAL mode with a busy timeout, so several generation runs (or batch
+    workers) can share one cache file concurrently.
+    """
+
+    def __init__(self, db_path, timeout=30.0):
+        """
+        Args:
+            db_path (str or Path): Location of the SQLite database; created if missing.
+            timeout (float): Seconds to wait for a lock held by another process.
+        """
+        self.db_path = Path(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.db_path), timeout=timeout, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+
+    def lookup(self, paths):
+        """
+        Splits paths into cache hits and misses.
+
+        Args:
+            paths (iterable): Paths of the files to look up.
+
+        Returns:
+            tuple: (hits, misses), where hits maps each Path to its cached MediaInfo
+            and misses maps each Path to the key to store its fresh result under.
+            Files that cannot be stat'ed are counted as misses with a None key.
+        """
+        hits, misses = {}, {}
+        with self._lock:
+            for path in paths:
+                try:
+                    key = file_key(path)
+                except OSError:
+                    misses[path] = None
+                    continue
+                row = self._connection.execute(
+                    "SELECT info FROM probe_cache WHERE path = ? AND size = ? AND mtime_ns = ?", key
+                ).fetchone()
+                if row is None:
+                    misses[path] = key
+                else:
+                    hits[path] = MediaInfo.from_dict(json.loads(row[0]))
+            self.hits += len(hits)
+            self.misses += len(misses)
+        return hits, misses
+
+    def store(self, entries):
+        """
+        Stores fresh probe results in a single transaction.
+
+        Args:
+            entries (iterable): (key, MediaInfo) pairs, with keys as returned by lookup().
+                Pairs with a None key or None result are skipped.
+        """
+        now = time.time()
+        rows = [
+            (key[0], key[1], key[2], json.dumps(info.to_dict()), now)
+            for key, info in entries if key is not None and info is not None
+        ]
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO probe_cache (path, size, mtime_ns, info, probed_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def prune(self) -> int:
+        """
+        Removes entries whose file was deleted or has changed since it was probed.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT path, size, mtime_ns FROM probe_cache").fetchall()
+            stale = []
+            for path, size, mtime_ns in rows:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    stale.append((path,))
+                    continue
+                if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                    stale.append((path,))
+            with self._connection:
+                self._connection.executemany("DELETE FROM probe_cache WHERE path = ?", stale)
+        logger.info("Pruned %s stale entries from probe cache %s", len(stale), self.db_path)
+        return len(stale)
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM probe_cache")
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters accumulated by this instance.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
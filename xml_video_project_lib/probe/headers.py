@@ -0,0 +1,341 @@
+import struct
+from pathlib import Path
+
+from xml_video_project_lib.probe.media_info import MediaInfo
+
+# Bitrates in kbit/s indexed by [mpeg1][layer][bitrate_index]
+_MP3_BITRATES = {
+    True: {
+        1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+        2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+        3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    },
+    False: {
+        1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+        3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    },
+}
+_MP3_SAMPLERATES = (44100, 48000, 32000)
+_MP3_SYNC_SEARCH_BYTES = 64 * 1024
+
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_MP4_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+def read_png(file, path):
+    header = file.read(24)
+    if len(header) < 24 or header[:8] != b'\x89PNG\r\n\x1a\n' or header[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', header[16:24])
+    return MediaInfo(path=str(path), width=width, height=height)
+
+
+def read_jpeg(file, path):
+    if file.read(2) != b'\xff\xd8':
+        return None
+    while True:
+        byte = file.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+        marker = file.read(1)
+        while marker == b'\xff':  # Fill bytes
+            marker = file.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker == 0xD8 or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue  # Markers without a length field
+        if marker == 0xD9:
+            return None
+        length = struct.unpack('>H', file.read(2))[0]
+        if marker in _JPEG_SOF_MARKERS:
+            _, height, width = struct.unpack('>BHH', file.read(5))
+            return MediaInfo(path=str(path), width=width, height=height)
+        file.seek(length - 2, 1)
+
+
+def read_bmp(file, path):
+    header = file.read(26)
+    if len(header) < 26 or header[:2] != b'BM':
+        return None
+    dib_size = struct.unpack('<I', header[14:18])[0]
+    if dib_size == 12:  # BITMAPCOREHEADER
+        width, height = struct.unpack('<HH', header[18:22])
+    else:
+        width, height = struct.unpack('<ii', header[18:26])
+    return MediaInfo(path=str(path), width=abs(width), height=abs(height))
+
+
+def read_tiff(file, path):
+    header = file.read(8)
+    if header[:4] == b'II*\x00':
+        endian = '<'
+    elif header[:4] == b'MM\x00*':
+        endian = '>'
+    else:
+        return None  # BigTIFF and anything else go to ffprobe
+    file.seek(struct.unpack(endian + 'I', header[4:8])[0])
+    count = struct.unpack(endian + 'H', file.read(2))[0]
+    entries = file.read(count * 12)
+    dimensions = {}
+    for offset in range(0, len(entries) - 11, 12):
+        tag, field_type, _ = struct.unpack(endian + 'HHI', entries[offset:offset + 8])
+        if tag in (256, 257):
+            fmt = endian + ('H' if field_type == 3 else 'I')
+            dimensions[tag] = struct.unpack(fmt, entries[offset + 8:offset + 8 + struct.calcsize(fmt)])[0]
+    if 256 not in dimensions or 257 not in dimensions:
+        return None
+    return MediaInfo(path=str(path), width=dimensions[256], height=dimensions[257])
+
+
+def read_wav(file, path):
+    header = file.read(12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return None
+    channels = samplerate = byterate = None
+    while True:
+        chunk = file.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+        if chunk_id == b'fmt ':
+            fmt = file.read(chunk_size)
+            _, channels, samplerate, byterate = struct.unpack('<HHII', fmt[:12])
+            file.seek(chunk_size & 1, 1)
+        elif chunk_id == b'data':
+            if not byterate:
+                return None
+            return MediaInfo(
+                path=str(path), duration=chunk_size / byterate, samplerate=samplerate, channels=channels
+            )
+        else:
+            file.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def _mp3_frame_header(data, offset):
+    """
+    Decodes the MPEG audio frame header at offset, or returns None if it is not one.
+    """
+    if offset + 4 > len(data):
+        return None
+    header = struct.unpack('>I', data[offset:offset + 4])[0]
+    if header & 0xFFE00000 != 0xFFE00000:
+        return None
+    version = (header >> 19) & 3  # 0: MPEG 2.5, 2: MPEG 2, 3: MPEG 1
+    layer = 4 - ((header >> 17) & 3)
+    bitrate_index = (header >> 12) & 15
+    samplerate_index = (header >> 10) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or samplerate_index == 3:
+        return None
+    mpeg1 = version == 3
+    samplerate = _MP3_SAMPLERATES[samplerate_index] >> (0 if mpeg1 else 1 if version == 2 else 2)
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 2 or mpeg1:
+        samples_per_frame = 1152
+    else:
+        samples_per_frame = 576
+    return {
+        'mpeg1': mpeg1,
+        'layer': layer,
+        'bitrate': _MP3_BITRATES[mpeg1][layer][bitrate_index] * 1000,
+        'samplerate': samplerate,
+        'samples_per_frame': samples_per_frame,
+        'channels': 1 if (header >> 6) & 3 == 3 else 2,
+    }
+
+
+def read_mp3(file, path):
+    file_size = file.seek(0, 2)
+    file.seek(0)
+    audio_start = 0
+    id3 = file.read(10)
+    if id3[:3] == b'ID3' and len(id3) == 10:
+        size = (id3[6] << 21) | (id3[7] << 14) | (id3[8] << 7) | id3[9]
+        audio_start = 10 + size + (10 if id3[5] & 0x10 else 0)
+    file.seek(audio_start)
+    data = file.read(_MP3_SYNC_SEARCH_BYTES)
+
+    offset = data.find(b'\xff')
+    while offset != -1:
+        frame = _mp3_frame_header(data, offset)
+        if frame is not None:
+            break
+        offset = data.find(b'\xff', offset + 1)
+    else:
+        return None
+
+    # A Xing/Info (VBR) or VBRI header in the first frame gives the exact frame count
+    frames = None
+    if frame['mpeg1']:
+        side_info = 17 if frame['channels'] == 1 else 32
+    else:
+        side_info = 9 if frame['channels'] == 1 else 17
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b'Xing', b'Info') and len(data) >= xing + 12:
+        if struct.unpack('>I', data[xing + 4:xing + 8])[0] & 1:
+            frames = struct.unpack('>I', data[xing + 8:xing + 12])[0]
+    elif data[offset + 36:offset + 40] == b'VBRI' and len(data) >= offset + 54:
+        frames = struct.unpack('>I', data[offset + 50:offset + 54])[0]
+
+    if frames is not None:
+        duration = frames * frame['samples_per_frame'] / frame['samplerate']
+    else:
+        audio_bytes = file_size - audio_start - offset
+        if file_size >= 128:
+            file.seek(-128, 2)
+            if file.read(3) == b'TAG':  # ID3v1 trailer
+                audio_bytes -= 128
+        duration = audio_bytes * 8 / frame['bitrate']
+    return MediaInfo(path=str(path), duration=duration, samplerate=frame['samplerate'], channels=frame['channels'])
+
+
+def _iter_boxes(data, start=0, end=None):
+    """
+    Yields (type, payload_start, payload_end) for the ISO BMFF boxes in data[start:end].
+    """
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _find_moov(file):
+    """
+    Returns the bytes of the top-level moov box, seeking past everything else.
+    """
+    offset = 0
+    while True:
+        file.seek(offset)
+        header = file.read(16)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = file.seek(0, 2) - offset
+        if size < header_size:
+            return None
+        if box_type == b'moov':
+            file.seek(offset + header_size)
+            return file.read(size - header_size)
+        offset += size
+
+
+def _parse_trak(data, start, end):
+    track = {}
+    for box_type, box_start, box_end in _iter_boxes(data, start, end):
+        if box_type == b'tkhd':
+            version = data[box_start]
+            offset = box_start + (88 if version == 1 else 76)
+            width, height = struct.unpack('>II', data[offset:offset + 8])
+            track['width'], track['height'] = width >> 16, height >> 16
+        elif box_type in _MP4_CONTAINERS:
+            track.update(_parse_trak(data, box_start, box_end))
+        elif box_type == b'mdhd':
+            version = data[box_start]
+            if version == 1:
+                timescale, duration = struct.unpack('>IQ', data[box_start + 20:box_start + 32])
+            else:
+                timescale, duration = struct.unpack('>II', data[box_start + 12:box_start + 20])
+            track['timescale'], track['duration'] = timescale, duration
+        elif box_type == b'hdlr':
+            track['handler'] = data[box_start + 8:box_start + 12]
+        elif box_type == b'stts':
+            count = struct.unpack('>I', data[box_start + 4:box_start + 8])[0]
+            entries = struct.unpack(f'>{count * 2}I', data[box_start + 8:box_start + 8 + count * 8])
+            track['samples'] = sum(entries[0::2])
+        elif box_type == b'stsd':
+            # Audio sample entries carry the channel count and a 16.16 sample rate
+            entry = box_start + 8
+            track['channels'], = struct.unpack('>H', data[entry + 24:entry + 26])
+            track['samplerate'] = struct.unpack('>I', data[entry + 32:entry + 36])[0] >> 16
+    return track
+
+
+def read_mp4(file, path):
+    moov = _find_moov(file)
+    if moov is None:
+        return None
+    info = {'path': str(path)}
+    for box_type, start, end in _iter_boxes(moov):
+        if box_type == b'mvhd':
+            version = moov[start]
+            if version == 1:
+                timescale, duration = struct.unpack('>IQ', moov[start + 20:start + 32])
+            else:
+                timescale, duration = struct.unpack('>II', moov[start + 12:start + 20])
+            if timescale:
+                info['duration'] = duration / timescale
+        elif box_type == b'trak':
+            track = _parse_trak(moov, start, end)
+            handler = track.get('handler')
+            if handler == b'vide' and 'width' not in info and track.get('width'):
+                info['width'], info['height'] = track['width'], track['height']
+                if track.get('samples') and track.get('duration') and track.get('timescale'):
+                    info['fps'] = track['samples'] * track['timescale'] / track['duration']
+            elif handler == b'soun' and 'samplerate' not in info:
+                info['samplerate'] = track.get('samplerate') or track.get('timescale')
+                info['channels'] = track.get('channels')
+    if 'duration' not in info:
+        return None
+    return MediaInfo(**info)
+
+
+_READERS = {
+    '.png': read_png,
+    '.jpg': read_jpeg,
+    '.jpeg': read_jpeg,
+    '.bmp': read_bmp,
+    '.tif': read_tiff,
+    '.tiff': read_tiff,
+    '.wav': read_wav,
+    '.mp3': read_mp3,
+    '.mp4': read_mp4,
+    '.m4v': read_mp4,
+    '.m4a': read_mp4,
+    '.mov': read_mp4,
+}
+
+
+def read_media_header(path):
+    """
+    Reads metadata straight from the container header of common formats, without
+    spawning ffprobe: dimensions of PNG, JPEG, BMP and TIFF stills, duration, sample
+    rate and channels of WAV and MP3, and duration and dimensions of MP4/MOV.
+
+    Args:
+        path (str or Path): The media file.
+
+    Returns:
+        MediaInfo or None: None if the format is unsupported or the header could not
+        be decoded, in which case the caller should fall back to ffprobe.
+
+    Raises:
+        OSError: If the file cannot be opened.
+    """
+    path = Path(path)
+    reader = _READERS.get(path.suffix.lower())
+    if reader is None:
+        return None
+    with open(path, 'rb') as file:
+        try:
+            return reader(file, path)
+        except (struct.error, ValueError, IndexError):
+            return None
@@ -0,0 +1,31 @@
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Consolidated metadata for one media file, gathered by a single probe.
+    """
+    path: str
+    duration: Optional[float] = None  # Seconds
+    fps: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    samplerate: Optional[int] = None
+    channels: Optional[int] = None
+
+    @property
+    def has_video(self) -> bool:
+        return self.width is not None and self.height is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.samplerate is not None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MediaInfo':
+        return cls(**data)
@@ -0,0 +1,170 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from xml_video_project_lib.config import config
+from xml_video_project_lib.logging import logger
+from xml_video_project_lib.probe.headers import read_media_header
+from xml_video_project_lib.probe.media_info import MediaInfo
+
+
+def _parse_rate(rate):
+    """
+    Parses an ffprobe frame rate such as '30000/1001' into frames per second.
+    """
+    if not rate:
+        return None
+    numerator, _, denominator = str(rate).partition('/')
+    try:
+        numerator = float(numerator)
+        denominator = float(denominator) if denominator else 1.0
+    except ValueError:
+        return None
+    if numerator == 0 or denominator == 0:
+        return None
+    return numerator / denominator
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def media_info_from_ffprobe(path, probe: dict) -> MediaInfo:
+    """
+    Builds a MediaInfo record from the JSON returned by ffprobe.
+
+    Args:
+        path (str or Path): The probed file.
+        probe (dict): The parsed ffprobe output with 'format' and 'streams'.
+
+    Returns:
+        MediaInfo: The consolidated metadata.
+    """
+    streams = probe.get('streams', [])
+    video_stream = next((stream for stream in streams if stream.get('codec_type') == 'video'), None)
+    audio_stream = next((stream for stream in streams if stream.get('codec_type') == 'audio'), None)
+
+    duration = _parse_float(probe.get('format', {}).get('duration'))
+    if duration is None:
+        for stream in (video_stream, audio_stream):
+            if stream is not None and _parse_float(stream.get('duration')) is not None:
+                duration = _parse_float(stream.get('duration'))
+                break
+
+    info = {'path': str(path), 'duration': duration}
+    if video_stream is not None:
+        info['fps'] = _parse_rate(video_stream.get('avg_frame_rate')) or _parse_rate(video_stream.get('r_frame_rate'))
+        info['width'] = _parse_int(video_stream.get('width'))
+        info['height'] = _parse_int(video_stream.get('height'))
+    if audio_stream is not None:
+        info['samplerate'] = _parse_int(audio_stream.get('sample_rate'))
+        info['channels'] = _parse_int(audio_stream.get('channels'))
+    return MediaInfo(**info)
+
+
+def ffprobe(path) -> MediaInfo:
+    """
+    Probes a file with ffprobe through ffmpeg-python.
+
+    Args:
+        path (str or Path): The file to probe.
+
+    Returns:
+        MediaInfo: The consolidated metadata.
+
+    Raises:
+        ffmpeg.Error: If ffprobe fails to read the file.
+    """
+    import ffmpeg
+
+    return media_info_from_ffprobe(path, ffmpeg.probe(str(path)))
+
+
+def fast_probe(path) -> MediaInfo:
+    """
+    Reads metadata from the container header when the format is one we can parse
+    in pure Python, and only spawns ffprobe for everything else.
+
+    Args:
+        path (str or Path): The file to probe.
+
+    Returns:
+        MediaInfo: The consolidated metadata.
+    """
+    media_info = read_media_header(path)
+    if media_info is not None:
+        return media_info
+    return ffprobe(path)
+
+
+def default_max_workers(settings=None) -> int:
+    """
+    Returns the probe concurrency limit from the [Probe] section of the given
+    ConfigSnapshot (or the global config.ini), or a default based on the CPU
+    count. Probes spend their time waiting on ffprobe subprocesses, so the
+    default oversubscribes the cores.
+    """
+    max_workers = (settings or config).get('Probe', 'max_workers', fallback=0, type_cast=int)
+    return max_workers if max_workers > 0 else min(32, (os.cpu_count() or 1) * 2)
+
+
+def probe_media(paths, prober=fast_probe, max_workers=None, cache=None, settings=None) -> dict:
+    """
+    Probes media files concurrently, exactly once per distinct file.
+
+    Args:
+        paths (iterable): Paths of the files to probe.
+        prober (callable): Maps a Path to a MediaInfo. Defaults to fast_probe; tests
+            and alternative backends can pass their own.
+        max_workers (int, optional): Maximum number of concurrent probes; by default
+            see default_max_workers().
+        cache (ProbeCache, optional): Persistent cache consulted before probing;
+            fresh results are written back to it.
+        settings (ConfigSnapshot, optional): The configuration max_workers defaults from.
+
+    Returns:
+        dict: Maps each Path to its MediaInfo, or to None if probing failed.
+    """
+    unique_paths = list(dict.fromkeys(Path(path) for path in paths))
+    if not unique_paths:
+        return {}
+
+    results = {}
+    cache_keys = {}
+    if cache is not None:
+        results, cache_keys = cache.lookup(unique_paths)
+        pending = [path for path in unique_paths if path not in results]
+    else:
+        pending = unique_paths
+
+    if pending:
+        results.update(_probe_all(pending, prober, max_workers or default_max_workers(settings)))
+        if cache is not None:
+            cache.store((cache_keys.get(path), results[path]) for path in pending)
+
+    return {path: results[path] for path in unique_paths}
+
+
+def _probe_all(paths, prober, max_workers) -> dict:
+    def probe_one(path):
+        try:
+            return prober(path)
+        except Exception as e:
+            logger.error("Failed to probe media file %s: %s", path, e)
+            return None
+
+    if max_workers == 1 or len(paths) == 1:
+        return dict(zip(paths, map(probe_one, paths)))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return dict(zip(paths, executor.map(probe_one, paths)))
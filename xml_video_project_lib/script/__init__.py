@@ -0,0 +1,41 @@
+import importlib
+
+# lxml is only imported when a Word document is actually read (PEP 562)
+_EXPORTS = {
+    "ScriptBlock": "extractor",
+    "PARAGRAPH": "extractor",
+    "HEADING": "extractor",
+    "SCENE_BREAK": "extractor",
+    "SCRIPT_NAMES": "extractor",
+    "find_script": "extractor",
+    "iter_script": "extractor",
+    "iter_docx": "extractor",
+    "iter_text": "extractor",
+    "read_script": "extractor",
+}
+
+__all__ = [
+    "ScriptBlock",
+    "PARAGRAPH",
+    "HEADING",
+    "SCENE_BREAK",
+    "SCRIPT_NAMES",
+    "find_script",
+    "iter_script",
+    "iter_docx",
+    "iter_text",
+    "read_script",
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,186 @@
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+PARAGRAPH = 'paragraph'
+HEADING = 'heading'
+SCENE_BREAK = 'scene_break'
+
+SCRIPT_NAMES = ('script.docx', 'script.md', 'script.txt')
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P = _W + 'p'
+_W_T = _W + 't'
+_W_TAB = _W + 'tab'
+_W_BR = _W + 'br'
+_W_CR = _W + 'cr'
+_W_PSTYLE = _W + 'pStyle'
+_W_OUTLINE_LEVEL = _W + 'outlineLvl'
+_W_VAL = _W + 'val'
+_W_TYPE = _W + 'type'
+
+# A line of three or more of the same marker character, optionally spaced out:
+# '***', '* * *', '---', '###', '==='
+_SCENE_BREAK_LINE = re.compile(r'^\s*([*\-_#=~])(?:\s*\1){2,}\s*$')
+_MARKDOWN_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_HEADING_STYLE = re.compile(r'^heading\s*(\d)$', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ScriptBlock:
+    """
+    One block of a script: a paragraph, a heading or a scene break.
+    """
+    kind: str
+    text: str = ''
+    level: Optional[int] = None  # Heading level, 0 for the title
+
+
+def find_script(project_dir) -> Optional[Path]:
+    """
+    Returns the project's script, the first of SCRIPT_NAMES that exists, or None.
+    """
+    for name in SCRIPT_NAMES:
+        path = Path(project_dir) / name
+        if path.is_file():
+            return path
+    return None
+
+
+def iter_script(path) -> Iterator[ScriptBlock]:
+    """
+    Yields the blocks of a .docx, .md or .txt script in document order.
+
+    Documents are streamed, so memory use does not grow with their length.
+
+    Args:
+        path (str or Path): The script.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.docx':
+        return iter_docx(path)
+    if suffix in ('.md', '.markdown'):
+        return iter_text(path, markdown=True)
+    if suffix == '.txt':
+        return iter_text(path)
+    raise ValueError(f"Unsupported script type '{path.suffix}': {path.name}")
+
+
+def read_script(path) -> str:
+    """
+    Returns the text of a script, one paragraph or heading per line.
+    """
+    return '\n'.join(block.text for block in iter_script(path) if block.kind != SCENE_BREAK)
+
+
+def iter_docx(path) -> Iterator[ScriptBlock]:
+    """
+    Yields the paragraphs, headings and scene breaks of a Word document.
+
+    word/document.xml is parsed straight from the archive with iterparse and
+    every paragraph is discarded once yielded. Paragraphs in tables are
+    included. A scene break is a page break or a paragraph of marker characters
+    only, such as '***'. A heading is a paragraph styled Title or Heading N, or
+    one with an outline level.
+
+    Raises:
+        zipfile.BadZipFile: If path is not a Word document.
+        KeyError: If the archive has no word/document.xml.
+        lxml.etree.XMLSyntaxError: If the document XML is malformed.
+    """
+    import zipfile
+    from lxml import etree as ET
+
+    with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as document:
+        for _, paragraph in ET.iterparse(document, events=('end',), tag=_W_P,
+                                         resolve_entities=False, no_network=True):
+            level = _heading_level(paragraph)
+            segments = ['']
+            for node in paragraph.iter(_W_T, _W_TAB, _W_BR, _W_CR):
+                tag = node.tag
+                if tag == _W_T:
+                    segments[-1] += node.text or ''
+                elif tag == _W_TAB:
+                    segments[-1] += '\t'
+                elif tag == _W_BR and node.get(_W_TYPE) == 'page':
+                    segments.append(None)  # Page break, then the text after it
+                    segments.append('')
+                else:
+                    segments[-1] += '\n'
+
+            for segment in segments:
+                if segment is None:
+                    yield ScriptBlock(SCENE_BREAK)
+                elif _SCENE_BREAK_LINE.match(segment):
+                    yield ScriptBlock(SCENE_BREAK, segment.strip())
+                elif level is not None and segment.strip():
+                    yield ScriptBlock(HEADING, segment, level)
+                elif segment or len(segments) == 1:
+                    yield ScriptBlock(PARAGRAPH, segment)
+
+            # Drop the paragraph and whatever came before it in its parent
+            paragraph.clear(keep_tail=True)
+            parent = paragraph.getparent()
+            if parent is not None:
+                while paragraph.getprevious() is not None:
+                    del parent[0]
+
+
+def _heading_level(paragraph) -> Optional[int]:
+    properties = paragraph.find(_W + 'pPr')
+    if properties is None:
+        return None
+    style = properties.find(_W_PSTYLE)
+    if style is not None:
+        name = style.get(_W_VAL, '')
+        if name.lower() == 'title':
+            return 0
+        match = _HEADING_STYLE.match(name)
+        if match:
+            return int(match.group(1))
+    outline = properties.find(_W_OUTLINE_LEVEL)
+    if outline is not None and outline.get(_W_VAL, '').isdigit():
+        level = int(outline.get(_W_VAL)) + 1
+        return level if level <= 9 else None  # 9 is "body text"
+    return None
+
+
+def iter_text(path, markdown=False) -> Iterator[ScriptBlock]:
+    """
+    Yields the blocks of a plain text or Markdown script, read line by line.
+
+    Paragraphs are separated by blank lines and their lines joined with spaces.
+    A line of marker characters only, such as '***', is a scene break. In
+    Markdown, '#' lines and lines underlined with '===' or '---' are headings.
+    """
+    lines = []
+    with open(path, encoding='utf-8-sig') as file:
+        for line in file:
+            line = line.strip()
+            if markdown:
+                if lines and line and set(line) in ({'='}, {'-'}):
+                    yield ScriptBlock(HEADING, ' '.join(lines), 1 if line[0] == '=' else 2)
+                    lines = []
+                    continue
+                heading = _MARKDOWN_HEADING.match(line)
+                if heading and heading.group(2):
+                    if lines:
+                        yield ScriptBlock(PARAGRAPH, ' '.join(lines))
+                        lines = []
+                    yield ScriptBlock(HEADING, heading.group(2), len(heading.group(1)))
+                    continue
+            if not line or _SCENE_BREAK_LINE.match(line):
+                if lines:
+                    yield ScriptBlock(PARAGRAPH, ' '.join(lines))
+                    lines = []
+                if line:
+                    yield ScriptBlock(SCENE_BREAK, line)
+                continue
+            lines.append(line)
+    if lines:
+        yield ScriptBlock(PARAGRAPH, ' '.join(lines))
@@ -0,0 +1,17 @@
+from .xml_writer import XMLStreamWriter, escape_text, escape_attribute
+from .templates import FragmentTemplate, TemplatedElement
+from .file_registry import FileRegistry
+from .incremental import IncrementalElement, TrackedList, count_elements, mark_all_dirty
+
+__all__ = [
+    "XMLStreamWriter",
+    "FragmentTemplate",
+    "TemplatedElement",
+    "FileRegistry",
+    "IncrementalElement",
+    "TrackedList",
+    "count_elements",
+    "mark_all_dirty",
+    "escape_text",
+    "escape_attribute",
+]
@@ -0,0 +1,80 @@
+class FileUse:
+    """
+    The files a piece of output wrote in full and the ones it only referenced.
+    """
+    __slots__ = ('defined', 'referenced')
+
+    def __init__(self):
+        self.defined = set()
+        self.referenced = set()
+
+
+class FileRegistry:
+    """
+    Tracks which media files have already been written in full during one serialization pass.
+
+    XMEML lets every use of a file after the first be written as a bare
+    ``<file id="..."/>`` reference, so a file shared by many clipitems only
+    carries its name, pathurl and media description once per project.
+    """
+
+    def __init__(self, written_ids=()):
+        """
+        Args:
+            written_ids (iterable): IDs of files already written earlier in the document.
+        """
+        self._written_ids = set(written_ids)
+        self._recordings = []
+
+    def register(self, file) -> bool:
+        """
+        Records a use of the given file.
+
+        Args:
+            file (File): The file about to be serialized.
+
+        Returns:
+            bool: True if this is the first use and the file must be written in full.
+        """
+        first_use = file.id not in self._written_ids
+        if first_use:
+            self._written_ids.add(file.id)
+        for use in self._recordings:
+            (use.defined if first_use else use.referenced).add(file.id)
+        return first_use
+
+    def start_recording(self) -> FileUse:
+        """
+        Starts collecting the files registered until stop_recording(), so cached
+        output can later be checked against and replayed into another pass.
+        """
+        use = FileUse()
+        self._recordings.append(use)
+        return use
+
+    def stop_recording(self, use):
+        self._recordings.remove(use)
+        use.referenced -= use.defined
+
+    def accepts(self, use) -> bool:
+        """
+        Whether output recorded as ``use`` is still correct at this point of the
+        document: the files it defines are not written yet and the ones it
+        references are.
+        """
+        return use.defined.isdisjoint(self._written_ids) and use.referenced <= self._written_ids
+
+    def replay(self, use):
+        """
+        Registers the files of reused output as if it had been rendered again.
+        """
+        self._written_ids |= use.defined
+        for recording in self._recordings:
+            recording.defined |= use.defined
+            recording.referenced |= use.referenced
+
+    def __contains__(self, file_id):
+        return file_id in self._written_ids
+
+    def __len__(self):
+        return len(self._written_ids)
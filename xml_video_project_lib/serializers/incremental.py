@@ -0,0 +1,242 @@
+import contextlib
+
+# Elements created per class name while count_elements() is active
+_created = None
+
+
+class _CachedOutput:
+    """
+    The serialized form of an element from the last pass that rendered it.
+    """
+    __slots__ = ('key', 'data', 'files')
+
+    def __init__(self, key, data, files):
+        self.key = key      # (level, pretty_print, shares files) the data was rendered for
+        self.data = data    # str fragment
+        self.files = files  # FileUse recorded while rendering, or None without a registry
+
+
+class TrackedList(list):
+    """
+    A list of child elements that marks its owner dirty whenever it changes.
+    """
+    __slots__ = ('owner',)
+
+    def __init__(self, owner, items=()):
+        super().__init__(items)
+        self.owner = owner
+        for item in self:
+            _adopt(owner, item)
+
+    def _changed(self, items=()):
+        for item in items:
+            _adopt(self.owner, item)
+        self.owner.mark_dirty()
+
+    def append(self, item):
+        super().append(item)
+        self._changed((item,))
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        self._changed(items)
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._changed((item,))
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed(value if isinstance(index, slice) else (value,))
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self._changed()
+        return self
+
+
+def _adopt(parent, child):
+    if isinstance(child, IncrementalElement):
+        # Most elements have a single parent; a set is only built for shared ones
+        parents = child._xml_parents
+        if parents is None:
+            object.__setattr__(child, '_xml_parents', parent)
+        elif type(parents) is set:
+            parents.add(parent)
+        elif parents is not parent:
+            object.__setattr__(child, '_xml_parents', {parents, parent})
+
+
+class IncrementalElement:
+    """
+    Mixin that tracks changes to a model so unchanged subtrees are not serialized twice.
+
+    Assigning a public attribute or changing a child list marks the element dirty,
+    and the flag travels up to every parent (a File shared by many clipitems dirties
+    all of them). Templated leaf classes that set CACHE_XML keep the fragment of an
+    incremental save (render_fragment(cache=True)) and reuse it on the next one
+    while they stay clean. Streamed containers are never cached, so a default save
+    holds one clip at a time and keeps nothing once it is done.
+
+    Only attribute assignment and list mutation are tracked. Dicts changed in place
+    (attributes, format details) must be reassigned, or mark_dirty() called.
+    """
+
+    __slots__ = ('_xml_cache', '_xml_parents')
+
+    CACHE_XML = False
+
+    # Optional method called whenever the element or anything inside it changes,
+    # for classes that keep other state derived from their children
+    _content_changed = None
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls)
+        object.__setattr__(self, '_xml_cache', None)
+        object.__setattr__(self, '_xml_parents', None)  # The parent, or a set of them when shared
+        if _created is not None:
+            _created[cls.__name__] = _created.get(cls.__name__, 0) + 1
+        return self
+
+    def __setattr__(self, name, value):
+        if type(value) is list:
+            value = TrackedList(self, value)
+        elif isinstance(value, IncrementalElement):
+            _adopt(self, value)
+        object.__setattr__(self, name, value)
+        # Nothing to invalidate while the element is being built
+        if self._xml_parents is not None or self._xml_cache is not None:
+            self.mark_dirty()
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the element has to be serialized again on the next save.
+        """
+        return self._xml_cache is None
+
+    def mark_dirty(self):
+        """
+        Drops the cached output of this element and of everything that contains it.
+        """
+        mark_all_dirty((self,))
+
+    def _cached_output(self, key, file_registry):
+        cache = self._xml_cache
+        if cache is None or cache.key != key:
+            return None
+        if file_registry is not None:
+            if not file_registry.accepts(cache.files):
+                return None
+            file_registry.replay(cache.files)
+        return cache.data
+
+    def _store_output(self, key, data, files):
+        object.__setattr__(self, '_xml_cache', _CachedOutput(key, data, files))
+
+    def render_fragment(self, level=0, pretty_print=True, file_registry=None, cache=False):
+        if not (cache and self.CACHE_XML):
+            return super().render_fragment(level, pretty_print, file_registry, cache)
+        key = (level, pretty_print, file_registry is not None)
+        data = self._cached_output(key, file_registry)
+        if data is not None:
+            return data
+        files = file_registry.start_recording() if file_registry is not None else None
+        try:
+            data = super().render_fragment(level, pretty_print, file_registry, cache)
+        finally:
+            if files is not None:
+                file_registry.stop_recording(files)
+        self._store_output(key, data, files)
+        return data
+
+
+def mark_all_dirty(elements):
+    """
+    Marks many elements dirty at once, visiting their common ancestors only once.
+    Used by bulk edits that change a whole track's clips in one go.
+    """
+    seen = set()
+    pending = list(elements)
+    while pending:
+        element = pending.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        if element._xml_cache is not None:
+            object.__setattr__(element, '_xml_cache', None)
+        if element._content_changed is not None:
+            element._content_changed()
+        parents = element._xml_parents
+        if type(parents) is set:
+            pending.extend(parents)
+        elif parents is not None:
+            pending.append(parents)
+
+
+@contextlib.contextmanager
+def count_elements():
+    """
+    Counts the elements created inside the block, by class name. Blocks may be
+    nested; the outer one also counts what the inner one saw.
+
+    Yields:
+        dict: {class name: count}, filled in as elements are created.
+    """
+    global _created
+    outer = _created
+    counts = {}
+    _created = counts
+    try:
+        yield counts
+    finally:
+        _created = outer
+        if outer is not None:
+            for name, count in counts.items():
+                outer[name] = outer.get(name, 0) + count
+
+
+@contextlib.contextmanager
+def uncounted():
+    """
+    Leaves the elements created inside the block, e.g. template prototypes, out
+    of any count_elements() block.
+    """
+    global _created
+    outer = _created
+    _created = None
+    try:
+        yield
+    finally:
+        _created = outer
+
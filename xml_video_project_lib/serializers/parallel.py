@@ -0,0 +1,114 @@
+"""
+Renders the sequences of a project concurrently for Project.write(workers=...).
+
+Each sequence is rendered on its own with a FileRegistry seeded with the
+files used by the sequences before it, which is what a serial pass would have
+registered by then. The fragments come back with the files they defined and
+referenced, so the caller can check each against the real registry and splice
+it into the document, keeping the output byte-identical to a serial write.
+"""
+import os
+import sys
+
+from xml_video_project_lib.serializers.file_registry import FileRegistry
+from xml_video_project_lib.serializers.xml_writer import XMLStreamWriter
+
+# The sequences being rendered, inherited by forked worker processes so the
+# models themselves never have to be pickled
+_forked_sequences = None
+
+
+class _Parts:
+    __slots__ = ('parts', 'write')
+
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
+
+
+def sequence_file_ids(sequence) -> set:
+    """
+    Returns the IDs of the files used by the clips of a sequence.
+    """
+    return {
+        clipitem.file.id
+        for track in sequence.tracks()
+        for clipitem in track.clipitems
+        if clipitem.file is not None
+    }
+
+
+def render_sequence(sequence, level, pretty_print, written_ids=None):
+    """
+    Renders one sequence as it would be written at the given nesting level.
+
+    Args:
+        sequence (Sequence): The sequence.
+        level (int): Its nesting level in the document.
+        pretty_print (bool): Whether to indent.
+        written_ids (set, optional): Files already written earlier in the document;
+            None renders without file sharing.
+
+    Returns:
+        tuple: (bytes, FileUse of the files defined and referenced, or None without sharing)
+    """
+    file_registry = FileRegistry(written_ids) if written_ids is not None else None
+    sink = _Parts()
+    writer = XMLStreamWriter(sink, pretty_print=pretty_print, file_registry=file_registry, level=level)
+    use = file_registry.start_recording() if file_registry is not None else None
+    sequence.write_xml(writer)
+    if use is not None:
+        file_registry.stop_recording(use)
+    return b"".join(sink.parts), use
+
+
+def _render_forked(index, level, pretty_print, written_ids):
+    return render_sequence(_forked_sequences[index], level, pretty_print, written_ids)
+
+
+def _free_threaded() -> bool:
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def render_sequences(sequences, level, pretty_print, share_files, workers):
+    """
+    Renders sequences concurrently: in forked processes where fork is available,
+    in threads on free-threaded builds or where it is not.
+
+    Args:
+        sequences (list): The sequences, in document order.
+        level (int): Their nesting level.
+        pretty_print (bool): Whether to indent.
+        share_files (bool): Render with file sharing, seeding each sequence's
+            registry with the files used by the sequences before it.
+        workers (int): Number of worker processes or threads; 0 uses one per CPU.
+
+    Returns:
+        list: render_sequence() results, in the order of sequences.
+    """
+    global _forked_sequences
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    import multiprocessing
+
+    seeds = []
+    written = set()
+    for sequence in sequences:
+        seeds.append(frozenset(written) if share_files else None)
+        if share_files:
+            written |= sequence_file_ids(sequence)
+
+    workers = min(workers or os.cpu_count() or 1, len(sequences))
+    indices = range(len(sequences))
+    levels = [level] * len(sequences)
+    pretty = [pretty_print] * len(sequences)
+    if _free_threaded() or 'fork' not in multiprocessing.get_all_start_methods():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(render_sequence, sequences, levels, pretty, seeds))
+
+    _forked_sequences = sequences
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            return list(pool.map(_render_forked, indices, levels, pretty, seeds))
+    finally:
+        _forked_sequences = None
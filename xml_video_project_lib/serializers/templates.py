@@ -0,0 +1,243 @@
+import io
+import re
+import threading
+from operator import attrgetter, itemgetter
+from lxml import etree as ET
+from xml_video_project_lib.serializers.incremental import uncounted
+from xml_video_project_lib.serializers.xml_writer import INDENT, XMLStreamWriter, escape_text, escape_attribute
+
+_SLOT_TAG = 'xvpl-slot'
+_SLOT_PATTERN = re.compile(r'(\n *)?<' + _SLOT_TAG + r' name="(\w+)"/>|\{\{(\w+)\}\}')
+_NEEDS_ESCAPE = re.compile('[&<>"\r\n\t]')
+
+TEXT = 0
+ATTRIBUTE = 1
+CHILDREN = 2
+
+
+class _ChildSlot:
+    """
+    Stand-in for a nested model object (or a list of them) while a layout is compiled.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __iter__(self):
+        yield self
+
+    def to_xml(self, file_registry=None):
+        return ET.Element(_SLOT_TAG, name=self.name)
+
+
+class FragmentTemplate:
+    """
+    A model layout serialized once into constant text with slots for its variable fields.
+
+    Text and attribute slots are escaped on render; children slots splice in the
+    fragments of nested templated elements at their own indentation level.
+    """
+
+    def __init__(self, parts, slots):
+        self.parts = parts  # Constant text around the slots; len(parts) == len(slots) + 1
+        self.slots = slots  # (name, kind, separator, level) tuples
+        self._format = None
+        self._scalars = None
+        self._kinds = None
+        self._children = None
+
+    @classmethod
+    def compile(cls, element, level=0, pretty_print=True):
+        """
+        Compiles a layout element whose variable text and attributes hold ``{{name}}``
+        markers and whose nested elements are ``xvpl-slot`` placeholders.
+
+        Args:
+            element (ET.Element): The layout produced by a prototype's to_xml().
+            level (int): Nesting level the fragment will be written at.
+            pretty_print (bool): Whether the fragment is indented.
+
+        Returns:
+            FragmentTemplate: The compiled template.
+        """
+        if pretty_print:
+            ET.indent(element, space=INDENT, level=level)
+        source = ET.tostring(element, encoding='unicode')
+
+        parts, slots = [], []
+        position = 0
+        for match in _SLOT_PATTERN.finditer(source):
+            parts.append(source[position:match.start()])
+            position = match.end()
+            if match.group(2):
+                separator = match.group(1) or ""
+                child_level = (len(separator) - 1) // len(INDENT) if separator else 0
+                slots.append((match.group(2), CHILDREN, separator, child_level))
+            else:
+                head = source[:match.start()]
+                kind = ATTRIBUTE if head.rfind('<') > head.rfind('>') else TEXT
+                slots.append((match.group(3), kind, None, None))
+        parts.append(source[position:])
+        return cls(parts, slots)
+
+    def bind(self, names):
+        """
+        Resolves slot names to positions in the value tuples passed to render().
+
+        Args:
+            names (tuple): Field names in the order render() receives their values.
+        """
+        index = {name: position for position, name in enumerate(names)}
+        scalars = [slot for slot in self.slots if slot[1] != CHILDREN]
+        children = [slot for slot in self.slots if slot[1] == CHILDREN]
+
+        # Scalar slots are numbered first so one str.format call can fill every slot
+        numbers = {id(slot): number for number, slot in enumerate(scalars + children)}
+        escaped_parts = [part.replace("{", "{{").replace("}", "}}") for part in self.parts]
+        pieces = [escaped_parts[0]]
+        for slot, part in zip(self.slots, escaped_parts[1:]):
+            pieces.append("{%d}" % numbers[id(slot)])
+            pieces.append(part)
+        self._format = "".join(pieces)
+
+        positions = [index[name] for name, _, _, _ in scalars]
+        if len(positions) == 1:
+            position = positions[0]
+            self._scalars = lambda values: (values[position],)
+        else:
+            self._scalars = itemgetter(*positions) if positions else (lambda values: ())
+        self._kinds = [kind for _, kind, _, _ in scalars]
+        self._children = [(index[name], separator, level) for name, _, separator, level in children]
+        return self
+
+    def render(self, values, pretty_print=True, file_registry=None, cache=False):
+        """
+        Fills the template with field values and nested elements.
+
+        Args:
+            values (tuple): Field values and nested elements, ordered as given to bind().
+            pretty_print (bool): Passed on to nested elements.
+            file_registry (FileRegistry, optional): Passed on to nested elements.
+            cache (bool): Passed on to nested elements.
+
+        Returns:
+            str: The serialized fragment, without leading indentation or trailing newline.
+        """
+        texts = list(map(str, self._scalars(values)))
+        # Most values need no escaping; check them all at once before escaping one by one
+        if _NEEDS_ESCAPE.search("".join(texts)):
+            texts = [
+                escape_attribute(text) if kind == ATTRIBUTE else escape_text(text)
+                for text, kind in zip(texts, self._kinds)
+            ]
+        for position, separator, level in self._children:
+            value = values[position]
+            children = value if isinstance(value, (list, tuple)) else (value,)
+            texts.append("".join([
+                separator + child.render_fragment(level, pretty_print, file_registry, cache)
+                for child in children if child is not None
+            ]))
+        return self._format.format(*texts)
+
+
+class TemplatedElement:
+    """
+    Mixin for models that serialize through compiled fragment templates.
+
+    Subclasses list the attributes that vary per instance in TEMPLATE_FIELDS and
+    the attributes holding nested templated elements in TEMPLATE_CHILDREN. The
+    layout itself is taken from the class's own to_xml(), run once on a prototype.
+    """
+
+    __slots__ = ()
+
+    TEMPLATE_FIELDS = ()
+    TEMPLATE_CHILDREN = ()
+
+    _templates = {}
+    _templates_lock = threading.Lock()
+
+    def template_variant(self):
+        """
+        Returns attribute values that change the shape of the layout rather than
+        just its text, e.g. the media type of a File.
+        """
+        return ()
+
+    def has_template(self) -> bool:
+        """
+        Whether the element is laid out the way its class writes new elements, so
+        a compiled template can render it. Elements read from a document that keep
+        their own child order return False and are streamed by write_layout().
+        """
+        return True
+
+    def write_layout(self, writer):
+        """
+        Streams an element that has no template, see has_template().
+        """
+        raise NotImplementedError
+
+    def template_values(self):
+        """
+        Returns the values of TEMPLATE_FIELDS followed by TEMPLATE_CHILDREN, in order.
+        """
+        cls = type(self)
+        getter = cls.__dict__.get('_template_getter')
+        if getter is None:
+            names = cls.TEMPLATE_FIELDS + cls.TEMPLATE_CHILDREN
+            getter = attrgetter(*names) if len(names) > 1 else (lambda obj: (attrgetter(*names)(obj),))
+            cls._template_getter = getter
+        return getter(self)
+
+    @classmethod
+    def _compile_template(cls, variant, none_fields, level, pretty_print):
+        with uncounted():
+            prototype = cls.__new__(cls)
+            for name in cls.TEMPLATE_FIELDS:
+                setattr(prototype, name, None if name in none_fields else f"{{{{{name}}}}}")
+            for name in cls.TEMPLATE_CHILDREN:
+                setattr(prototype, name, _ChildSlot(name))
+            for name, value in variant:
+                setattr(prototype, name, value)
+            template = FragmentTemplate.compile(prototype.to_xml(), level=level, pretty_print=pretty_print)
+        return template.bind(cls.TEMPLATE_FIELDS + cls.TEMPLATE_CHILDREN)
+
+    def render_fragment(self, level=0, pretty_print=True, file_registry=None, cache=False):
+        """
+        Serializes this element through its compiled template.
+
+        Args:
+            level (int): Nesting level the fragment is written at.
+            pretty_print (bool): Whether the fragment is indented.
+            file_registry (FileRegistry, optional): Tracks files already written in full.
+            cache (bool): Reuse and keep the fragments of clean elements that cache
+                their output (see IncrementalElement).
+
+        Returns:
+            str: The serialized element, without leading indentation or trailing newline.
+        """
+        if not self.has_template():
+            sink = io.BytesIO()
+            self.write_layout(XMLStreamWriter(sink, pretty_print, file_registry, level=level, cache=cache))
+            text = sink.getvalue().decode('utf-8')
+            # The writer indents the element and ends it with a newline
+            return text[len(INDENT) * level:-1] if pretty_print else text
+        values = self.template_values()
+        # None fields change the layout (lxml writes them as <tag/>), so they are part of the key
+        none_fields = ()
+        if None in values:
+            none_fields = tuple(name for name, value in zip(self.TEMPLATE_FIELDS, values) if value is None)
+        variant = self.template_variant()
+        key = (type(self), variant, none_fields, level, pretty_print)
+        template = TemplatedElement._templates.get(key)
+        if template is None:
+            with TemplatedElement._templates_lock:
+                template = TemplatedElement._templates.get(key)
+                if template is None:
+                    template = self._compile_template(variant, none_fields, level, pretty_print)
+                    TemplatedElement._templates[key] = template
+        return template.render(values, pretty_print, file_registry, cache)
+
+    def write_xml(self, writer):
+        writer.fragment(self.render_fragment(writer.level, writer.pretty_print, writer.file_registry, writer.cache))
@@ -0,0 +1,134 @@
+import re
+
+_TOKEN = re.compile(rb'''
+    <!--.*?-->
+  | <!\[CDATA\[.*?\]\]>
+  | <\?.*?\?>
+  | <!DOCTYPE(?:[^>\[]|\[.*?\])*>
+  | <(?P<close>/)?(?P<tag>[^\s/>!?]+)(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*(?P<empty>/)?>
+''', re.S | re.X)
+
+# Comments, CDATA and PIs are matched so a <file> inside them is skipped
+_FULL_FILE_DEFINITION = re.compile(rb'''
+    <!--.*?-->
+  | <!\[CDATA\[.*?\]\]>
+  | <\?.*?\?>
+  | <file(?P<attributes>(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*)\s*>
+''', re.S | re.X)
+
+_ID_ATTRIBUTE = re.compile(rb'''\sid\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+
+_ENTITIES = re.compile(r'&(?:#x([0-9a-fA-F]+)|#([0-9]+)|(amp|lt|gt|quot|apos));')
+_NAMED_ENTITIES = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+
+
+class ElementSpan:
+    """
+    Byte offsets of one element (or comment, PI or CDATA section) inside a document.
+
+    ``content_start``/``content_end`` delimit what lies between the start and end
+    tags; they are equal for self-closing elements. ``tag`` is None for nodes that
+    are not elements.
+    """
+    __slots__ = ('tag', 'start', 'end', 'content_start', 'content_end')
+
+    def __init__(self, tag, start, end, content_start, content_end):
+        self.tag = tag
+        self.start = start
+        self.end = end
+        self.content_start = content_start
+        self.content_end = content_end
+
+
+def iter_child_spans(source, start, end):
+    """
+    Yields the spans of the direct children found in source[start:end].
+
+    Only tags are tokenized; the bytes in between are skipped, so scanning costs a
+    single regex pass over the range and nothing is parsed into a tree.
+
+    Args:
+        source (bytes or mmap): The whole document.
+        start (int): Offset where the parent's content starts.
+        end (int): Offset where the parent's content ends.
+
+    Raises:
+        ValueError: If the range is not well-formed.
+    """
+    depth = 0
+    child_start = content_start = None
+    tag = None
+    for match in _TOKEN.finditer(source, start, end):
+        name = match.group('tag')
+        if name is None:
+            if depth == 0:
+                yield ElementSpan(None, match.start(), match.end(), match.end(), match.end())
+            continue
+        if match.group('close'):
+            depth -= 1
+            if depth < 0:
+                raise ValueError(f"Unexpected closing tag </{name.decode()}> at byte {match.start()}")
+            if depth == 0:
+                yield ElementSpan(tag, child_start, match.end(), content_start, match.start())
+        elif match.group('empty'):
+            if depth == 0:
+                yield ElementSpan(name.decode(), match.start(), match.end(), match.end(), match.end())
+        else:
+            if depth == 0:
+                tag = name.decode()
+                child_start, content_start = match.start(), match.end()
+            depth += 1
+    if depth != 0:
+        raise ValueError(f"Unclosed element <{tag}> at byte {child_start}")
+
+
+def find_root_span(source):
+    """
+    Returns the span of the document element, skipping the prolog.
+
+    Raises:
+        ValueError: If the document has no root element.
+    """
+    for span in iter_child_spans(source, 0, len(source)):
+        if span.tag is not None:
+            return span
+    raise ValueError("Document has no root element")
+
+
+def _unescape(text):
+    return _ENTITIES.sub(
+        lambda match: chr(int(match.group(1), 16)) if match.group(1)
+        else chr(int(match.group(2))) if match.group(2)
+        else _NAMED_ENTITIES[match.group(3)],
+        text,
+    )
+
+
+def iter_full_file_definitions(source, start, end):
+    """
+    Yields (id, offset) for every complete ``<file id="...">`` definition in
+    source[start:end], in document order.
+
+    Bare ``<file id="..."/>`` references, files without an id and anything inside
+    comments, CDATA sections or processing instructions are skipped. The id may
+    be quoted either way and stand among other attributes; it is returned with
+    its entity and character references resolved, as a parser would read it.
+    """
+    for match in _FULL_FILE_DEFINITION.finditer(source, start, end):
+        attributes = match.group('attributes')
+        if attributes is None:
+            continue
+        id_match = _ID_ATTRIBUTE.search(attributes)
+        if id_match is None:
+            continue
+        file_id = id_match.group(1) if id_match.group(1) is not None else id_match.group(2)
+        yield _unescape(file_id.decode()), match.start()
+
+
+def iter_full_file_ids(source, start, end):
+    """
+    Yields the ids of complete ``<file id="...">`` definitions in source[start:end],
+    ignoring bare ``<file id="..."/>`` references.
+    """
+    for file_id, _ in iter_full_file_definitions(source, start, end):
+        yield file_id
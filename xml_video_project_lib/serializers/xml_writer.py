@@ -0,0 +1,156 @@
+from lxml import etree as ET
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+INDENT = "  "
+
+
+def escape_text(value) -> str:
+    """
+    Escapes a value for use as element text, matching libxml2's serializer.
+    """
+    value = str(value)
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    if '\r' in value:
+        value = value.replace('\r', '&#13;')
+    return value
+
+
+def escape_attribute(value) -> str:
+    """
+    Escapes a value for use inside a double-quoted attribute, matching libxml2's serializer.
+    """
+    value = escape_text(value)
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    if '\n' in value:
+        value = value.replace('\n', '&#10;')
+    if '\t' in value:
+        value = value.replace('\t', '&#9;')
+    return value
+
+
+class XMLStreamWriter:
+    """
+    Incremental XMEML writer that emits elements straight to a binary sink.
+
+    The output is byte-identical to ``ET.tostring(tree, pretty_print=True)`` of the
+    equivalent lxml tree, but only the element currently being written is held in memory.
+    Container elements are opened with ``start``/``end``; self-contained subtrees can be
+    written with ``element`` (an lxml element) or ``leaf`` (a text-only element).
+    """
+
+    def __init__(self, sink, pretty_print=True, file_registry=None, level=0, cache=False):
+        """
+        Args:
+            sink: A binary file-like object exposing ``write(bytes)``.
+            pretty_print (bool): Whether to emit newlines and indentation.
+            file_registry (FileRegistry, optional): Shared across the document so each
+                media file is written in full once and referenced by id afterwards.
+            level (int): Nesting level to start at, for writing part of a document.
+            cache (bool): Let clean elements reuse the fragments kept from the previous
+                cached write and keep the new ones (see IncrementalElement).
+        """
+        self.sink = sink
+        self.file_registry = file_registry
+        self.indent = INDENT if pretty_print else ""
+        self.newline = "\n" if pretty_print else ""
+        self.pretty_print = pretty_print
+        self.level = level
+        self.cache = cache
+        self._stack = []
+        self._pending = None  # Start tag written without its closing '>' yet
+
+    def write_prolog(self, doctype):
+        """
+        Writes the XML declaration and DOCTYPE line that precede the root element.
+        """
+        self.sink.write(XML_DECLARATION)
+        self.sink.write(f"{doctype}\n".encode('utf-8'))
+
+    def _write(self, text):
+        self.sink.write(text.encode('utf-8'))
+
+    def _flush_pending(self):
+        if self._pending is not None:
+            self._write(self._pending + ">" + self.newline)
+            self._pending = None
+
+    @staticmethod
+    def _format_start(tag, attrib):
+        if not attrib:
+            return f"<{tag}"
+        attrs = "".join(f' {key}="{escape_attribute(value)}"' for key, value in attrib.items())
+        return f"<{tag}{attrs}"
+
+    def start(self, tag, attrib=None):
+        """
+        Opens a container element. Its start tag is written lazily so that a
+        container without children is emitted as ``<tag/>``.
+        """
+        self._flush_pending()
+        self._pending = self.indent * self.level + self._format_start(tag, attrib)
+        self._stack.append(tag)
+        self.level += 1
+
+    def end(self):
+        """
+        Closes the most recently opened container element.
+        """
+        tag = self._stack.pop()
+        self.level -= 1
+        if self._pending is not None:
+            self._write(self._pending + "/>" + self.newline)
+            self._pending = None
+        else:
+            self._write(f"{self.indent * self.level}</{tag}>{self.newline}")
+
+    def leaf(self, tag, text=None, attrib=None):
+        """
+        Writes an element that carries only text. ``None`` yields ``<tag/>``,
+        an empty string yields ``<tag></tag>``, as lxml does.
+        """
+        self._flush_pending()
+        start = self.indent * self.level + self._format_start(tag, attrib)
+        if text is None:
+            self._write(f"{start}/>{self.newline}")
+        else:
+            self._write(f"{start}>{escape_text(text)}</{tag}>{self.newline}")
+
+    def element(self, element):
+        """
+        Writes a complete lxml element subtree at the current nesting level.
+        """
+        self._flush_pending()
+        if self.pretty_print:
+            ET.indent(element, space=self.indent, level=self.level)
+            self._write(self.indent * self.level)
+        self.sink.write(ET.tostring(element, encoding='UTF-8'))
+        self._write(self.newline)
+
+    def raw(self, data):
+        """
+        Writes the original bytes of an element verbatim at the current nesting level.
+        """
+        self._flush_pending()
+        self._write(self.indent * self.level)
+        self.sink.write(data)
+        self._write(self.newline)
+
+    def fragment(self, text):
+        """
+        Writes an already serialized element (see FragmentTemplate) at the current nesting level.
+        """
+        self._flush_pending()
+        self._write(self.indent * self.level + text + self.newline)
+
+    def splice(self, data):
+        """
+        Writes output rendered separately for the same nesting level, unchanged.
+        """
+        self._flush_pending()
+        self.sink.write(data)
@@ -1,3 +1,49 @@
-from .id_generator import IDGenerator
+import importlib
 
-__all__ = ["IDGenerator"]
\ No newline at end of file
+# Submodules are imported on first use of one of their names (PEP 562)
+_EXPORTS = {
+    "IDGenerator": "id_generator",
+    "IDAllocator": "id_generator",
+    "IntervalIndex": "interval_index",
+    "StageProfiler": "profiler",
+    **dict.fromkeys((
+        "TICKS_PER_SECOND",
+        "frame_rate",
+        "seconds_to_frames",
+        "frames_to_seconds",
+        "seconds_to_ticks",
+        "frames_to_ticks",
+        "ticks_to_frames",
+        "frames_to_timecode",
+        "timecode_to_frames",
+    ), "rational_time"),
+}
+
+__all__ = [
+    "IDGenerator",
+    "IDAllocator",
+    "IntervalIndex",
+    "StageProfiler",
+    "TICKS_PER_SECOND",
+    "frame_rate",
+    "seconds_to_frames",
+    "frames_to_seconds",
+    "seconds_to_ticks",
+    "frames_to_ticks",
+    "ticks_to_frames",
+    "frames_to_timecode",
+    "timecode_to_frames",
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,206 @@
+"""
+Change notification for project directories: inotify on Linux, mtime polling elsewhere.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from xml_video_project_lib.logging import logger
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+               | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+class FileWatcher:
+    """
+    Reports changes to a set of directories (any file directly inside them) and files.
+    """
+
+    def __init__(self, paths):
+        """
+        Args:
+            paths (iterable): Directories and files to watch.
+        """
+        self.directories = set()
+        self.files = set()
+        for path in map(Path, paths):
+            (self.directories if path.is_dir() else self.files).add(path.resolve())
+
+    def poll(self, timeout=None) -> set:
+        """
+        Waits up to timeout seconds (None waits forever) for changes.
+
+        Returns:
+            set: Paths that were created, modified, replaced or deleted; empty on timeout.
+        """
+        raise NotImplementedError
+
+    def batches(self, debounce=0.2):
+        """
+        Yields the paths changed by each burst of activity, once no further change
+        has been seen for debounce seconds, e.g. after a large file finished copying.
+        """
+        while True:
+            changed = self.poll()
+            while True:
+                more = self.poll(debounce)
+                if not more:
+                    break
+                changed |= more
+            yield changed
+
+    def _watches(self, path) -> bool:
+        return path.parent in self.directories or path in self.files
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Watches with Linux inotify, so changes are reported as soon as they happen
+    without scanning. Files are watched through their directory, which also sees
+    editors that save by writing a new file and renaming it over the old one.
+
+    Raises:
+        OSError: If inotify is not available.
+    """
+
+    def __init__(self, paths):
+        super().__init__(paths)
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or libc_name is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories_by_wd = {}
+        for directory in self.directories | {path.parent for path in self.files}:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"Cannot watch {directory}")
+            self._directories_by_wd[wd] = directory
+
+    def poll(self, timeout=None) -> set:
+        changed = set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not changed:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not select.select([self._fd], [], [], remaining)[0]:
+                break
+            changed = self._read_events()
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        return changed
+
+    def _read_events(self) -> set:
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            directory = self._directories_by_wd.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            if self._watches(path) or (not name and mask & (IN_DELETE_SELF | IN_MOVE_SELF)):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(FileWatcher):
+    """
+    Watches by comparing the size and modification time of every watched file
+    every interval seconds. Works everywhere, at the cost of some latency.
+    """
+
+    def __init__(self, paths, interval=0.25):
+        super().__init__(paths)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict:
+        snapshot = {}
+        candidates = list(self.files)
+        for directory in self.directories:
+            try:
+                candidates.extend(entry for entry in directory.iterdir())
+            except OSError:
+                continue
+        for path in candidates:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout=None) -> set:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            pause = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(0.0, pause))
+
+
+def create_watcher(paths, interval=0.25) -> FileWatcher:
+    """
+    Returns an InotifyWatcher where inotify is available and a PollingWatcher otherwise.
+
+    Args:
+        paths (iterable): Directories and files to watch.
+        interval (float): Seconds between scans when polling.
+    """
+    paths = list(paths)
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError) as e:
+        logger.info("inotify unavailable (%s), polling for changes every %ss", e, interval)
+        return PollingWatcher(paths, interval)
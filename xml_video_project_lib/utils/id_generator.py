@@ -1,4 +1,7 @@
-import uuid
+import hashlib
+import itertools
+import threading
+
 from xml_video_project_lib.logging import logger
 
 class IDGenerator:
@@ -33,11 +36,13 @@ class IDGenerator:
         """
         prefix = IDGenerator.PREFIXES.get(element_type.lower())
         if not prefix:
-            logger.error(f"Unknown element type for ID generation: '{element_type}'")
+            logger.error("Unknown element type for ID generation: '%s'", element_type)
             raise ValueError(f"Unknown element type for ID generation: '{element_type}'")
         
+        import uuid
+
         unique_id = f"{prefix}-{uuid.uuid4()}"
-        logger.debug(f"Generated ID '{unique_id}' for element type '{element_type}'")
+        logger.debug("Generated ID '%s' for element type '%s'", unique_id, element_type)
         return unique_id
 
     @staticmethod
@@ -57,9 +62,92 @@ class IDGenerator:
         """
         prefix = IDGenerator.PREFIXES.get(element_type.lower())
         if not prefix:
-            logger.error(f"Unknown element type for sequential ID generation: '{element_type}'")
+            logger.error("Unknown element type for sequential ID generation: '%s'", element_type)
             raise ValueError(f"Unknown element type for sequential ID generation: '{element_type}'")
         
         sequential_id = f"{prefix}-{counter}"
-        logger.debug(f"Generated Sequential ID '{sequential_id}' for element type '{element_type}'")
+        logger.debug("Generated Sequential ID '%s' for element type '%s'", sequential_id, element_type)
         return sequential_id
+
+
+class IDAllocator:
+    """
+    Hands out the IDs of one project.
+
+    By default every element type has its own counter, so IDs are short and
+    sequential ('clipitem-1', 'clipitem-2', ...) and cost a dict lookup and a
+    string format each. In reproducible mode an ID can instead be derived from
+    a key describing the element, such as a file's path or a clip's track and
+    position, so the same inputs give the same IDs and UUIDs on every run and
+    machine, and an element keeps its ID when others are added around it.
+
+    Safe to share between threads: counters are itertools.count objects, which
+    advance atomically, and derived IDs are checked for repeats under a lock.
+    """
+
+    def __init__(self, reproducible=False, namespace=""):
+        """
+        Args:
+            reproducible (bool): Derive IDs and UUIDs from the keys passed to allocate() and uuid().
+            namespace (str): Mixed into derived IDs and UUIDs, e.g. the project name, so
+                identical elements of different projects do not share a UUID.
+        """
+        self.reproducible = reproducible
+        self.namespace = namespace
+        self._counters = {}  # element type -> (prefix, itertools.count)
+        self._issued = set()  # Derived IDs handed out so far
+        self._lock = threading.Lock()
+
+    def _counter(self, element_type):
+        counter = self._counters.get(element_type)
+        if counter is None:
+            prefix = IDGenerator.PREFIXES.get(element_type.lower())
+            if not prefix:
+                raise ValueError(f"Unknown element type for ID generation: '{element_type}'")
+            with self._lock:
+                counter = self._counters.setdefault(element_type, (prefix, itertools.count(1)))
+        return counter
+
+    def _key_text(self, key):
+        return "\x1f".join(map(str, (self.namespace,) + key))
+
+    def allocate(self, element_type, *key) -> str:
+        """
+        Returns a new ID for an element.
+
+        Args:
+            element_type (str): The type of the element (e.g., 'sequence', 'file', 'clipitem').
+            *key: Values identifying the element, used in reproducible mode. Without
+                a key the next sequential ID is returned in either mode.
+
+        Returns:
+            str: e.g. 'clipitem-12', or 'clipitem-5f0c1e2a9b7d4c3e' when derived from a key.
+                A derived ID that was already handed out gets a numbered suffix.
+
+        Raises:
+            ValueError: If the element_type is not recognized.
+        """
+        prefix, counter = self._counter(element_type)
+        if not (self.reproducible and key):
+            return f"{prefix}-{next(counter)}"
+
+        base = f"{prefix}-{hashlib.blake2b(self._key_text(key).encode('utf-8'), digest_size=8).hexdigest()}"
+        with self._lock:
+            unique_id = base
+            for repeat in itertools.count(2):
+                if unique_id not in self._issued:
+                    break
+                unique_id = f"{base}-{repeat}"
+            self._issued.add(unique_id)
+        return unique_id
+
+    def uuid(self, *key) -> str:
+        """
+        Returns a UUID, e.g. for a Sequence: random, or in reproducible mode a
+        name-based (version 5) UUID of the namespace and key.
+        """
+        import uuid
+
+        if not self.reproducible:
+            return str(uuid.uuid4())
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, self._key_text(key)))
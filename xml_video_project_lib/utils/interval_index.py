@@ -0,0 +1,108 @@
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """
+    Half-open [start, end) intervals kept sorted by start, together with the
+    running maximum of their ends.
+
+    Because the running maximum never decreases, the first interval that can
+    still reach a given time is found with a bisect as well, so point and range
+    lookups take O(log n + k) for k results on tracks without overlaps.
+    Intervals with equal starts keep the order they were added in.
+    """
+    __slots__ = ('starts', 'ends', 'reach', 'items')
+
+    def __init__(self, entries=()):
+        """
+        Args:
+            entries (iterable): (start, end, item) tuples, in any order.
+        """
+        entries = sorted(entries, key=lambda entry: entry[0])
+        self.starts = [entry[0] for entry in entries]
+        self.ends = [entry[1] for entry in entries]
+        self.items = [entry[2] for entry in entries]
+        self.reach = []  # reach[i] is the largest end among the first i + 1 intervals
+        furthest = None
+        for end in self.ends:
+            furthest = end if furthest is None or end > furthest else furthest
+            self.reach.append(furthest)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def end(self) -> int:
+        """
+        The largest end of all intervals, 0 when there are none.
+        """
+        return self.reach[-1] if self.reach else 0
+
+    def insert(self, start, end, item):
+        """
+        Adds an interval after any with the same start. O(log n) when intervals
+        are added in time order, which is how tracks are usually built.
+        """
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.items.insert(position, item)
+        previous = self.reach[position - 1] if position else end
+        self.reach.insert(position, max(previous, end))
+        for later in range(position + 1, len(self.reach)):
+            if self.reach[later] >= end:
+                break
+            self.reach[later] = end
+
+    def remove(self, start, item) -> bool:
+        """
+        Removes an item that was added with the given start.
+
+        Returns:
+            bool: False if the item is not in the index under that start.
+        """
+        for position in range(bisect_left(self.starts, start), bisect_right(self.starts, start)):
+            if self.items[position] is item:
+                break
+        else:
+            return False
+        del self.starts[position], self.ends[position], self.items[position], self.reach[position]
+        # Later running maxima can only shrink; stop as soon as one is unaffected
+        for later in range(position, len(self.reach)):
+            furthest = self.ends[later] if later == 0 else max(self.reach[later - 1], self.ends[later])
+            if furthest == self.reach[later]:
+                break
+            self.reach[later] = furthest
+        return True
+
+    def at(self, time) -> list:
+        """
+        Returns the items whose interval contains the given time, in start order.
+        """
+        return self.overlapping(time, time + 1)
+
+    def overlapping(self, start, end) -> list:
+        """
+        Returns the items whose interval intersects [start, end), in start order.
+        """
+        first = bisect_right(self.reach, start)  # Earlier intervals all end by start
+        last = bisect_left(self.starts, end)     # Later intervals all start at or after end
+        ends = self.ends
+        return [self.items[position] for position in range(first, last) if ends[position] > start]
+
+    def overlaps(self) -> list:
+        """
+        Finds intervals that start before an earlier one has ended, in one pass.
+
+        Returns:
+            list: (earlier, later) item pairs; the earlier item is the one reaching
+            furthest into the later one.
+        """
+        pairs = []
+        holder = 0
+        for position in range(1, len(self.items)):
+            if self.starts[position] < self.reach[position - 1]:
+                pairs.append((self.items[holder], self.items[position]))
+            if self.ends[position] > self.ends[holder]:
+                holder = position
+        return pairs
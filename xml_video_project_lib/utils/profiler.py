@@ -0,0 +1,185 @@
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class _Stage:
+    __slots__ = ('calls', 'wall', 'cpu', 'peak')
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = None  # Largest extra traced memory in bytes, None when not tracing
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time and peak memory per stage of a generation run,
+    together with the number of model elements created and any other counters.
+
+    Stages are opened with stage() and may be nested; a nested stage is reported
+    under its path, e.g. 'save/io'. Running a stage again adds to its totals.
+    Peak memory is measured with tracemalloc, which slows allocations down, so it
+    is only traced between start() and stop() and only when trace_memory is set.
+
+    Usage:
+        profiler = StageProfiler()
+        with profiler:
+            generate_project(project_dir, output, args, profiler=profiler)
+        profiler.write('profile.json')
+    """
+
+    def __init__(self, trace_memory=True, count_elements=True):
+        """
+        Args:
+            trace_memory (bool): Trace allocations to report peak memory per stage.
+            count_elements (bool): Count the model elements created while started.
+        """
+        self.trace_memory = trace_memory
+        self.count_elements = count_elements
+        self.stages = {}    # Path -> _Stage, in the order stages were first entered
+        self.counters = {}
+        self.elements = {}  # Class name -> elements created
+        self._path = []
+        self._peaks = []    # Peak so far of every open stage, innermost last
+        self._tracing = False
+        self._counting = None
+        self._started = None
+
+    def start(self):
+        """
+        Starts tracing memory and counting elements. Stages can be timed without
+        calling start(), but then report no memory or elements.
+        """
+        if self.trace_memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+        if self.count_elements:
+            from xml_video_project_lib.serializers.incremental import count_elements
+
+            self._counting = count_elements()
+            self.elements = self._counting.__enter__()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        if self._started is not None:
+            wall, cpu = self._started
+            self.counters['total_wall_seconds'] = time.perf_counter() - wall
+            self.counters['total_cpu_seconds'] = time.process_time() - cpu
+            self._started = None
+        if self._counting is not None:
+            self._counting.__exit__(None, None, None)
+            self._counting = None
+        if self._tracing:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the block as the named stage.
+        """
+        tracing = self._is_tracing()
+        if tracing:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                # reset_peak() below would lose the enclosing stage's peak so far
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append(current)
+            baseline = current
+        self._path.append(name)
+        stage = self._stage('/'.join(self._path))
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._path.pop()
+            stage.calls += 1
+            stage.wall += wall
+            stage.cpu += cpu
+            if tracing:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                stage.peak = max(stage.peak or 0, peak - baseline)
+
+    def add_time(self, name, seconds):
+        """
+        Adds time measured elsewhere as a stage inside the current one, e.g. the
+        time spent in write() calls while serializing.
+        """
+        stage = self._stage('/'.join(self._path + [name]))
+        stage.calls += 1
+        stage.wall += seconds
+
+    def count(self, name, amount=1):
+        """
+        Adds amount to a counter, e.g. the media files probed or bytes written.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def wall_times(self) -> dict:
+        """
+        Returns {stage path: wall seconds}.
+        """
+        return {path: stage.wall for path, stage in self.stages.items()}
+
+    def report(self) -> dict:
+        """
+        Returns the measurements as a JSON-serializable dict.
+        """
+        return {
+            'stages': [
+                {
+                    'stage': path,
+                    'calls': stage.calls,
+                    'wall_seconds': stage.wall,
+                    'cpu_seconds': stage.cpu,
+                    'peak_memory_bytes': stage.peak,
+                }
+                for path, stage in self.stages.items()
+            ],
+            'elements': dict(sorted(self.elements.items())),
+            'counters': dict(self.counters),
+        }
+
+    def write(self, path):
+        """
+        Writes report() as JSON to path, or to stdout when path is "-".
+        """
+        text = json.dumps(self.report(), indent=2)
+        if str(path) == '-':
+            print(text)
+        else:
+            Path(path).write_text(text + "\n", encoding="utf-8")
+
+    def _stage(self, path):
+        stage = self.stages.get(path)
+        if stage is None:
+            stage = self.stages[path] = _Stage()
+        return stage
+
+    def _is_tracing(self) -> bool:
+        if not self.trace_memory or self._started is None:
+            return False
+        import tracemalloc
+
+        return tracemalloc.is_tracing()
@@ -0,0 +1,210 @@
+"""
+Exact conversions between seconds, frames, Premiere ticks and SMPTE timecode.
+
+All scalar conversions go through fractions.Fraction, so NTSC rates such as
+30000/1001 never accumulate float error. The *_array variants convert whole
+columns at once with NumPy integer arithmetic and give the same results.
+"""
+from fractions import Fraction
+
+# Premiere Pro's internal time unit, used by pproTicksIn/pproTicksOut
+TICKS_PER_SECOND = 254016000000
+
+
+def frame_rate(timebase, ntsc) -> Fraction:
+    """
+    Returns the exact frame rate for an XMEML timebase, e.g. 30000/1001 for 30 NTSC.
+
+    Args:
+        timebase (int or str): The nominal frame rate, e.g. 30.
+        ntsc (bool or str): Whether the rate is slowed down by 1000/1001 ("TRUE"/"FALSE" accepted).
+    """
+    rate = Fraction(int(timebase))
+    if _is_ntsc(ntsc):
+        rate *= Fraction(1000, 1001)
+    return rate
+
+
+def _is_ntsc(ntsc) -> bool:
+    if isinstance(ntsc, str):
+        return ntsc.strip().upper() == "TRUE"
+    return bool(ntsc)
+
+
+def _round(value: Fraction) -> int:
+    # Half away from zero, so that e.g. 0.5 frames is not rounded to the even frame
+    return int(value + Fraction(1, 2)) if value >= 0 else -int(-value + Fraction(1, 2))
+
+
+def seconds_to_frames(seconds, timebase, ntsc) -> int:
+    """
+    Converts a duration or position in seconds to the nearest whole frame.
+
+    Args:
+        seconds (int, float, str or Fraction): Seconds; floats are taken at their exact value.
+        timebase (int or str): The nominal frame rate.
+        ntsc (bool or str): Whether the rate is NTSC.
+    """
+    return _round(Fraction(seconds) * frame_rate(timebase, ntsc))
+
+
+def frames_to_seconds(frames, timebase, ntsc) -> Fraction:
+    """
+    Returns the exact time in seconds of a frame count.
+    """
+    return Fraction(int(frames)) / frame_rate(timebase, ntsc)
+
+
+def seconds_to_ticks(seconds) -> int:
+    """
+    Converts seconds to the nearest Premiere tick.
+    """
+    return _round(Fraction(seconds) * TICKS_PER_SECOND)
+
+
+def ticks_per_frame(timebase, ntsc) -> Fraction:
+    """
+    Returns the length of one frame in ticks; an integer for every rate Premiere offers.
+    """
+    return TICKS_PER_SECOND / frame_rate(timebase, ntsc)
+
+
+def frames_to_ticks(frames, timebase, ntsc) -> int:
+    """
+    Converts a frame count to Premiere ticks, e.g. 30 frames at 29.97 fps to 254270016000.
+    """
+    return _round(int(frames) * ticks_per_frame(timebase, ntsc))
+
+
+def ticks_to_frames(ticks, timebase, ntsc) -> int:
+    """
+    Converts Premiere ticks to the nearest whole frame.
+    """
+    return _round(int(ticks) / ticks_per_frame(timebase, ntsc))
+
+
+def _drop_frame_counts(timebase):
+    timebase = int(timebase)
+    if timebase % 30:
+        raise ValueError(f"Drop-frame timecode needs a timebase of 30 or 60, got {timebase}")
+    dropped = timebase // 15  # Frame numbers skipped at the start of most minutes
+    return dropped, timebase * 60 - dropped, timebase * 600 - 9 * dropped
+
+
+def frames_to_timecode(frames, timebase, drop_frame=False) -> str:
+    """
+    Formats a frame count as SMPTE timecode.
+
+    Drop-frame timecode skips frame numbers 0 and 1 (0-3 at 60 fps) at the start of
+    every minute except each tenth, and uses ';' separators as Premiere writes it.
+
+    Args:
+        frames (int): Frames from zero.
+        timebase (int or str): The nominal frame rate, e.g. 30 for 29.97.
+        drop_frame (bool): Whether to write drop-frame timecode.
+
+    Returns:
+        str: The timecode, e.g. "00;01;00;02" or "00:01:00:00".
+
+    Raises:
+        ValueError: If frames is negative, or drop_frame is requested for a timebase
+            that is not a multiple of 30.
+    """
+    frames = int(frames)
+    if frames < 0:
+        raise ValueError(f"Cannot format negative frame count {frames} as timecode")
+    timebase = int(timebase)
+    separator = ":"
+    if drop_frame:
+        dropped, per_minute, per_ten_minutes = _drop_frame_counts(timebase)
+        tens, remainder = divmod(frames, per_ten_minutes)
+        frames += 9 * dropped * tens
+        if remainder > dropped:
+            frames += dropped * ((remainder - dropped) // per_minute)
+        separator = ";"
+    seconds, frame = divmod(frames, timebase)
+    minutes, second = divmod(seconds, 60)
+    hours, minute = divmod(minutes, 60)
+    return f"{hours:02d}{separator}{minute:02d}{separator}{second:02d}{separator}{frame:02d}"
+
+
+def timecode_to_frames(timecode, timebase, drop_frame=None) -> int:
+    """
+    Parses SMPTE timecode into a frame count.
+
+    Args:
+        timecode (str): "HH:MM:SS:FF", or with ';' separators for drop-frame.
+        timebase (int or str): The nominal frame rate.
+        drop_frame (bool, optional): Overrides the drop-frame detection from the separators.
+
+    Raises:
+        ValueError: If the timecode is malformed.
+    """
+    parts = timecode.replace(";", ":").replace(".", ":").split(":")
+    if len(parts) != 4 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"Invalid timecode: '{timecode}'")
+    if drop_frame is None:
+        drop_frame = ";" in timecode or "." in timecode
+    hours, minutes, seconds, frame = map(int, parts)
+    timebase = int(timebase)
+    total = ((hours * 60 + minutes) * 60 + seconds) * timebase + frame
+    if drop_frame:
+        dropped = _drop_frame_counts(timebase)[0]
+        total_minutes = hours * 60 + minutes
+        total -= dropped * (total_minutes - total_minutes // 10)
+    return total
+
+
+def frames_to_ticks_array(frames, timebase, ntsc):
+    """
+    Converts an array of frame counts to Premiere ticks with exact integer arithmetic.
+
+    Args:
+        frames (array-like of int): Frame counts.
+        timebase (int or str): The nominal frame rate.
+        ntsc (bool or str): Whether the rate is NTSC.
+
+    Returns:
+        numpy.ndarray: int64 ticks, equal to frames_to_ticks() element by element.
+    """
+    import numpy as np
+
+    frames = np.asarray(frames, dtype=np.int64)
+    step = ticks_per_frame(timebase, ntsc)
+    whole, remainder = divmod(step.numerator, step.denominator)
+    ticks = frames * whole
+    if remainder:
+        # Exact rounding of frames * remainder / denominator, half away from zero
+        scaled = 2 * frames * remainder
+        ticks += np.sign(scaled) * ((np.abs(scaled) + step.denominator) // (2 * step.denominator))
+    return ticks
+
+
+def ticks_to_frames_array(ticks, timebase, ntsc):
+    """
+    Converts an array of Premiere ticks to the nearest whole frames.
+
+    Returns:
+        numpy.ndarray: int64 frame counts, equal to ticks_to_frames() element by element.
+    """
+    import numpy as np
+
+    ticks = np.asarray(ticks, dtype=np.int64)
+    step = ticks_per_frame(timebase, ntsc)
+    # frames = ticks * denominator / numerator, rounded half away from zero
+    scaled = 2 * np.abs(ticks) * step.denominator
+    return np.sign(ticks) * ((scaled + step.numerator) // (2 * step.numerator))
+
+
+def seconds_to_frames_array(seconds, timebase, ntsc):
+    """
+    Converts an array of durations in seconds (e.g. probe results) to the nearest whole frames.
+
+    Returns:
+        numpy.ndarray: int64 frame counts.
+    """
+    import numpy as np
+
+    rate = frame_rate(timebase, ntsc)
+    scaled = np.asarray(seconds, dtype=np.float64) * rate.numerator / rate.denominator
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)